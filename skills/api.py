@@ -9,10 +9,13 @@ Usage:
     print(result.answer)
 """
 
+import os
 import sys
+import atexit
 import asyncio
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator, Tuple
 from dataclasses import dataclass
 import json
 
@@ -26,6 +29,7 @@ from core.context import get_context_manager, ContextType
 from core.hallucination import get_hallucination_preventer
 from core.thinking import get_thinking_engine
 from core.tools import get_tool_validator
+from core.tracing import span
 from orchestrator.orchestrator import UnifiedOrchestrator
 
 
@@ -59,6 +63,60 @@ class QueryResult:
         return json.dumps(self.to_dict(), indent=2)
 
 
+class BackgroundLoop:
+    """
+    Event loop running forever in a daemon thread.
+    
+    The sync API submits coroutines here instead of creating a loop per
+    call with ``asyncio.run``, which also fails when the caller is
+    already inside a running loop (Jupyter, async web servers).
+    """
+    
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+        self._lock = threading.Lock()
+    
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            # A forked child inherits the loop object but not its thread
+            if self.loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name='enterprise-rag-loop', daemon=True
+                )
+                thread.start()
+                self.loop, self._thread, self._pid = loop, thread, os.getpid()
+            return self.loop
+    
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the loop and wait for its result."""
+        loop = self._ensure_started()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Sync API called from its own event loop; await the async method")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+    
+    def stop(self) -> None:
+        with self._lock:
+            if self.loop is not None and self._pid == os.getpid():
+                self.loop.call_soon_threadsafe(self.loop.stop)
+                self._thread.join(timeout=5)
+                if not self.loop.is_running():
+                    self.loop.close()
+            self.loop = self._thread = None
+
+
+_background_loop = BackgroundLoop()
+atexit.register(_background_loop.stop)
+
+
+def run_sync(coro, timeout: Optional[float] = None):
+    """Run a coroutine from sync code on the shared background loop."""
+    return _background_loop.run(coro, timeout)
+
+
 class EnterpriseRAG:
     """
     Simple API for Enterprise RAG System.
@@ -74,6 +132,9 @@ class EnterpriseRAG:
         # Batch queries
         results = rag.batch_query(["Query 1", "Query 2"])
         
+        # From async code
+        result = await rag.aquery("Fix the lint error")
+        
         # Get patterns
         pattern = rag.get_pattern("lazy_init")
     """
@@ -115,7 +176,17 @@ class EnterpriseRAG:
             QueryResult with answer and metadata
         """
         
-        return asyncio.run(self._async_query(query, context, min_confidence))
+        return run_sync(self.aquery(query, context, min_confidence))
+    
+    async def aquery(
+        self,
+        query: str,
+        context: Optional[Dict] = None,
+        min_confidence: float = 0.60
+    ) -> QueryResult:
+        """Async variant of ``query`` for callers with their own event loop."""
+        
+        return await self._async_query(query, context, min_confidence)
     
     async def _async_query(
         self,
@@ -124,34 +195,18 @@ class EnterpriseRAG:
         min_confidence: float
     ) -> QueryResult:
         
-        import time
-        start = time.time()
-        
-        # Check cache
-        cache_key = self.cache.generate_key(query, context or {})
-        cached = self.cache.get(cache_key)
-        if cached:
-            return QueryResult(
-                query=query,
-                answer=cached.get('output'),
-                confidence=cached.get('confidence', 1.0),
-                skill_used=cached.get('skill_used', 'cache'),
-                model_used='cache',
-                cost=0.0,
-                duration_ms=int((time.time() - start) * 1000),
-                cache_hit=True,
-                hallucination_level='high'
-            )
-        
-        # Execute
-        result = await self.orchestrator.execute(
-            query, 
-            context or {}, 
-            min_confidence
-        )
-        
-        # Build response
-        response = QueryResult(
+        # The orchestrator owns the only cache entry for a request (keyed by
+        # request_fingerprint); the response is a projection of its result
+        with span('rag.query', query=query) as trace:
+            result = await self.orchestrator.execute(query, context or {}, min_confidence)
+            response = self._response(query, result)
+            trace.set(cache_hit=response.cache_hit, skill=response.skill_used)
+            return response
+    
+    @staticmethod
+    def _response(query: str, result) -> QueryResult:
+        """Project an orchestrator ExecutionResult onto a QueryResult."""
+        return QueryResult(
             query=query,
             answer=result.output,
             confidence=result.confidence,
@@ -162,11 +217,6 @@ class EnterpriseRAG:
             cache_hit=result.cache_hit,
             hallucination_level='high' if result.confidence > 0.85 else 'medium'
         )
-        
-        # Cache result
-        self.cache.set(cache_key, response.to_dict(), ttl=3600)
-        
-        return response
     
     def batch_query(
         self,
@@ -184,7 +234,16 @@ class EnterpriseRAG:
             List of QueryResults
         """
         
-        return asyncio.run(self._async_batch(queries, context))
+        return run_sync(self.abatch_query(queries, context))
+    
+    async def abatch_query(
+        self,
+        queries: List[str],
+        context: Optional[Dict] = None
+    ) -> List[QueryResult]:
+        """Async variant of ``batch_query``."""
+        
+        return await self._async_batch(queries, context)
     
     async def _async_batch(
         self,
@@ -192,8 +251,26 @@ class EnterpriseRAG:
         context: Optional[Dict]
     ) -> List[QueryResult]:
         
-        tasks = [self._async_query(q, context, 0.60) for q in queries]
-        return await asyncio.gather(*tasks)
+        results: List[Optional[QueryResult]] = [None] * len(queries)
+        async for index, result in self.stream_batch(queries, context):
+            results[index] = result
+        return results
+    
+    async def stream_batch(
+        self,
+        queries: List[str],
+        context: Optional[Dict] = None
+    ) -> AsyncIterator[Tuple[int, QueryResult]]:
+        """Yield ``(index, QueryResult)`` pairs as batch queries complete."""
+        
+        # The orchestrator does one bulk cache read and batched writes, and
+        # runs misses at config.max_concurrent
+        async for item in self.orchestrator.execute_many(
+            [(q, context or {}) for q in queries],
+            concurrency=self.config.max_concurrent,
+            min_confidence=0.60
+        ):
+            yield item.index, self._response(queries[item.index], item.result)
     
     def get_pattern(self, pattern_id: str) -> Optional[Dict]:
         """
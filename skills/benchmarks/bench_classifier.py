@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: shared QueryClassifier vs the previous per-call classifiers.
+
+The baseline reproduces the code paths the classifier replaced:
+ProgrammaticThinking._classify_query / _extract_entities /
+_identify_required_skills and UnifiedOrchestrator._classify_intent.
+
+Run: python skills/benchmarks/bench_classifier.py
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.classifier import QueryClassifier
+
+
+QUERIES = [
+    "Fix the lint error in Component.tsx",
+    "Generate a React component for the pricing page",
+    "Create a PDF document from the report",
+    "Search the docs for react-hooks/exhaustive-deps",
+    "Design a glassmorphism card with CSS",
+    "Retrieve the patterns for hydration mismatch in Layout.jsx",
+    "Write an Excel summary of the quarterly numbers",
+    "Why is my build slow?",
+]
+
+
+def baseline(query: str):
+    """Previous implementation: four independent passes."""
+    query_lower = query.lower()
+
+    if any(w in query_lower for w in ['lint', 'error', 'fix', 'bug']):
+        query_type = 'lint_fix'
+    elif any(w in query_lower for w in ['generate', 'create', 'write']):
+        query_type = 'generate'
+    elif any(w in query_lower for w in ['document', 'pdf', 'word', 'excel']):
+        query_type = 'document'
+    elif any(w in query_lower for w in ['search', 'find', 'query']):
+        query_type = 'search'
+    else:
+        query_type = 'general'
+
+    entities = re.findall(r'[\w\-]+\.[tj]sx?', query)
+    entities.extend(re.findall(r'react-hooks/[\w-]+', query))
+
+    query_lower = query.lower()
+    skills = []
+    if 'lint' in query_lower:
+        skills.append('lint-fixer')
+    if 'react' in query_lower:
+        skills.append('react-patterns')
+    if 'document' in query_lower:
+        skills.append('docx')
+    if 'generate' in query_lower:
+        skills.append('LLM')
+
+    intent_lower = query.lower()
+    patterns = {
+        'lint': r'(lint|eslint|error|fix|bug)',
+        'document': r'(document|pdf|word|excel)',
+        'generate': r'(generate|create|build|make)',
+        'design': r'(design|style|ui|css)',
+        'rag': r'(query|search|retrieve|find)',
+    }
+    intent = 'general'
+    for ptype, pattern in patterns.items():
+        if re.search(pattern, intent_lower):
+            intent = ptype
+            break
+
+    return query_type, entities, skills, intent
+
+
+def bench(fn, queries, rounds: int) -> float:
+    """Microseconds per query."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for q in queries:
+            fn(q)
+    return (time.perf_counter() - start) / (rounds * len(queries)) * 1e6
+
+
+def main(rounds: int = 2000):
+    classifier = QueryClassifier()
+
+    # Results must agree before timings mean anything
+    for q in QUERIES:
+        c = classifier.classify(q)
+        expected = baseline(q)
+        actual = (c.query_type, list(c.entities), list(c.skills), c.intent)
+        assert actual == expected, (q, actual, expected)
+
+    # Cold: unique queries defeat the per-query cache
+    unique = [f"{q} #{i}" for i in range(rounds // 10) for q in QUERIES]
+    cold_classifier = QueryClassifier(cache_size=0)
+
+    print(f"{'case':<28}{'baseline us':>14}{'classifier us':>16}")
+    print(f"{'repeated queries (cached)':<28}"
+          f"{bench(baseline, QUERIES, rounds):>14.2f}"
+          f"{bench(classifier.classify, QUERIES, rounds):>16.2f}")
+    print(f"{'unique queries (uncached)':<28}"
+          f"{bench(baseline, unique, 1):>14.2f}"
+          f"{bench(cold_classifier.classify, unique, 1):>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark: stable_hash vs the previous json.dumps + sha256[:16] keys.
+
+The baseline reproduces request_fingerprint / SkillCache.generate_key
+before they moved to core.hashing.
+
+Run: python skills/benchmarks/bench_hashing.py
+"""
+
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.hashing import stable_hash
+
+
+QUERY = "Fix the lint error in Component.tsx"
+
+CONTEXTS = {
+    'empty context': {},
+    'small context': {'file': 'src/Component.tsx', 'line': 42, 'rule': 'no-unused-vars'},
+    'large context': {
+        f'key{i}': {'path': f'src/module{i}.ts', 'lines': list(range(20)), 'ok': i % 2 == 0}
+        for i in range(200)
+    },
+    '1MB text blob': {'source': 'const x = 1;\n' * 80000},
+}
+
+
+def baseline(query, context):
+    """Previous implementation: sort-keyed JSON, truncated sha256."""
+    data = f"{query}:{json.dumps(context or {}, sort_keys=True)}"
+    return hashlib.sha256(data.encode()).hexdigest()[:16]
+
+
+def bench(fn, context, rounds: int) -> float:
+    """Microseconds per key."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(QUERY, context)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main(rounds: int = 2000):
+    # Keys must be stable across dict order before timings mean anything
+    for context in CONTEXTS.values():
+        reordered = dict(reversed(list(context.items())))
+        assert stable_hash(QUERY, context) == stable_hash(QUERY, reordered)
+        assert baseline(QUERY, context) == baseline(QUERY, reordered)
+
+    print(f"{'case':<18}{'baseline us':>14}{'stable_hash us':>16}")
+    for name, context in CONTEXTS.items():
+        n = max(20, rounds // max(1, len(json.dumps(context)) // 1000))
+        print(f"{name:<18}"
+              f"{bench(baseline, context, n):>14.2f}"
+              f"{bench(stable_hash, context, n):>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
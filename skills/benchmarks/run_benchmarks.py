@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the core RAG pipeline.
+
+Cases:
+    cache.set_get             SkillCache set+get, 1-16 threads
+    registry.match_trigger    30 / 300 / 3000 triggers
+    context.get_relevant      ContextChain with 100 - 10k entries
+    hallucination.check       1KB - 1MB outputs
+    rag.batch_query           EnterpriseRAG end to end, cold and warm cache
+
+Each case is timed ``--repeat`` times after a warmup and reported as
+microseconds per operation (median and min). Results are written as JSON
+so runs can be compared across commits; with ``--baseline`` any case
+whose median is slower than the baseline by more than its threshold is
+reported and the exit status is 1.
+
+Run:
+    python skills/benchmarks/run_benchmarks.py --output bench.json
+    python skills/benchmarks/run_benchmarks.py --baseline bench.json
+    python skills/benchmarks/run_benchmarks.py --quick --filter cache
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+SKILLS_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(SKILLS_DIR))
+
+import core.cache as cache_module
+from core.cache import SkillCache
+from core.context import ContextChain, ContextEntry, ContextType
+from core.hallucination import HallucinationPreventer
+from core.registry import SkillRegistry
+
+# Allowed slowdown of the median vs the baseline before a case fails
+DEFAULT_THRESHOLD = 0.25
+
+WORDS = (
+    "lint error component react hook state effect render build module "
+    "import export type interface async await cache query pattern test "
+    "deploy config route schema token stream batch worker index"
+).split()
+
+
+@dataclass
+class Case:
+    """One benchmark: ``fn()`` performs ``ops`` operations."""
+    name: str
+    fn: Callable[[], object]
+    ops: int
+    params: Dict = field(default_factory=dict)
+    threshold: float = DEFAULT_THRESHOLD
+
+
+def _text(n_bytes: int, seed: int = 0) -> str:
+    """Deterministic prose-like text of about ``n_bytes``."""
+    sentences = [
+        "The component renders the list and memoizes the handler.",
+        "I think this might be the cause, but I'm not sure.",
+        "According to the docs, React 18 batches state updates by default.",
+        "```js\nconst value = useMemo(() => compute(a, b), [a, b]);\n```",
+        "Studies show that caching reduces latency by 90% in most cases.",
+        "Probably the effect runs twice in strict mode.",
+    ]
+    parts, size, i = [], 0, seed
+    while size < n_bytes:
+        sentence = sentences[i % len(sentences)]
+        parts.append(sentence)
+        size += len(sentence) + 1
+        i += 1
+    return " ".join(parts)[:n_bytes]
+
+
+def cache_cases(tmp: Path, quick: bool) -> Iterator[Case]:
+    ops_per_thread = 50 if quick else 200
+    pools: List[ThreadPoolExecutor] = []
+    try:
+        for threads in (1, 2, 4, 8, 16):
+            cache = SkillCache(str(tmp / f"cache-{threads}.db"))
+            pool = ThreadPoolExecutor(max_workers=threads)
+            pools.append(pool)
+            rounds = iter(range(10 ** 9))
+
+            def worker(round_id: int, tid: int, cache=cache) -> None:
+                for i in range(ops_per_thread):
+                    key = f"k:{tid}:{i % 64}"
+                    cache.set(key, {'round': round_id, 'i': i}, ttl=3600)
+                    cache.get(key)
+
+            def run(pool=pool, threads=threads, worker=worker, rounds=rounds) -> None:
+                round_id = next(rounds)
+                for future in [pool.submit(worker, round_id, t) for t in range(threads)]:
+                    future.result()
+
+            yield Case(
+                f"cache.set_get[threads={threads}]", run, threads * ops_per_thread * 2,
+                {'threads': threads}, threshold=0.5
+            )
+    finally:
+        for pool in pools:
+            pool.shutdown()
+
+
+def registry_cases(tmp: Path, quick: bool) -> Iterator[Case]:
+    for n in (30, 300, 3000):
+        skills = {f"skill-{i}": {'name': f"Skill {i}", 'confidence': 0.5 + (i % 50) / 100}
+                  for i in range(max(1, n // 10))}
+        triggers = {
+            f"{WORDS[i % len(WORDS)]}{i}_{WORDS[(i * 7) % len(WORDS)]}": {
+                'primary': f"skill-{i % len(skills)}"
+            }
+            for i in range(n)
+        }
+        manifest = tmp / f"manifest-{n}.json"
+        manifest.write_text(json.dumps({'skills': skills, 'triggerMatrix': triggers}))
+        registry = SkillRegistry(str(tmp), str(manifest))
+
+        tasks = ["fix the lint error in the component", "build a cache for query patterns",
+                 "deploy the worker config", "unrelated request"]
+
+        def run(registry=registry, tasks=tasks) -> None:
+            for task in tasks:
+                registry.match_trigger("react project", task)
+
+        yield Case(f"registry.match_trigger[triggers={n}]", run, len(tasks), {'triggers': n})
+
+
+def context_cases(tmp: Path, quick: bool) -> Iterator[Case]:
+    sizes = (100, 1000) if quick else (100, 1000, 10000)
+    now = datetime.now()
+    for n in sizes:
+        chain = ContextChain(chain_id=f"bench-{n}", max_entries=n)
+        for i in range(n):
+            chain.add(ContextEntry(
+                id=f"e{i}",
+                context_type=ContextType.SKILL_OUTPUT,
+                content={'text': _text(200, seed=i), 'tags': [WORDS[i % len(WORDS)]]},
+                source_skill=f"skill-{i % 7}",
+                target_skill=None,
+                created_at=now,
+                expires_at=now + timedelta(days=1)
+            ))
+
+        def run(chain=chain) -> None:
+            chain.get_relevant("react hook state effect", top_k=10)
+
+        yield Case(f"context.get_relevant[entries={n}]", run, 1, {'entries': n})
+
+
+def hallucination_cases(tmp: Path, quick: bool) -> Iterator[Case]:
+    preventer = HallucinationPreventer()
+    sizes = (1024, 10240, 102400) if quick else (1024, 10240, 102400, 1048576)
+    for n in sizes:
+        output = _text(n)
+
+        def run(output=output) -> None:
+            preventer.check(output)
+
+        yield Case(f"hallucination.check[bytes={n}]", run, 1, {'bytes': n})
+
+
+def rag_cases(tmp: Path, quick: bool) -> Iterator[Case]:
+    import api
+    from orchestrator.orchestrator import UnifiedOrchestrator
+
+    # Isolated cache; restored by the runner's cleanup
+    saved = cache_module._cache
+    cache_module._cache = SkillCache(str(tmp / "rag.db"))
+    rag = api.EnterpriseRAG()
+    rag._orchestrator = UnifiedOrchestrator(str(SKILLS_DIR))
+
+    n = 8 if quick else 32
+    base = ["Fix the lint error in Component.tsx", "Generate a React component",
+            "Create a PDF report", "Search the docs for hooks", "Design a CSS card"]
+    rounds = iter(range(10 ** 9))
+
+    def cold() -> None:
+        round_id = next(rounds)
+        rag.batch_query([f"{base[i % len(base)]} #{round_id}-{i}" for i in range(n)])
+
+    warm_queries = [f"{base[i % len(base)]} #{i}" for i in range(n)]
+
+    def warm() -> None:
+        rag.batch_query(warm_queries)
+
+    try:
+        yield Case(f"rag.batch_query[cold,n={n}]", cold, n, {'batch': n, 'cache': 'cold'}, 0.5)
+        yield Case(f"rag.batch_query[warm,n={n}]", warm, n, {'batch': n, 'cache': 'warm'}, 0.5)
+    finally:
+        cache_module._cache = saved
+
+
+FAMILIES = [cache_cases, registry_cases, context_cases, hallucination_cases, rag_cases]
+
+
+def measure(case: Case, repeat: int, min_time: float) -> Dict:
+    """Time a case: calls per sample are scaled so each sample takes ~min_time."""
+    case.fn()  # warmup
+    start = time.perf_counter()
+    case.fn()
+    single = time.perf_counter() - start
+    calls = max(1, int(min_time / max(single, 1e-9)))
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            case.fn()
+        samples.append((time.perf_counter() - start) / (calls * case.ops) * 1e6)
+
+    return {
+        'params': case.params,
+        'ops_per_call': case.ops,
+        'calls': calls,
+        'median_us': statistics.median(samples),
+        'min_us': min(samples),
+        'stdev_us': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'threshold': case.threshold,
+    }
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=SKILLS_DIR,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(name_filter: str = "", repeat: int = 5, min_time: float = 0.2, quick: bool = False) -> Dict:
+    results = {}
+    tmp = Path(tempfile.mkdtemp(prefix="skills-bench-"))
+    try:
+        for family in FAMILIES:
+            cases = family(tmp, quick)
+            try:
+                for case in cases:
+                    if name_filter and name_filter not in case.name:
+                        continue
+                    results[case.name] = measure(case, repeat, min_time)
+                    print(f"{case.name:<42}{results[case.name]['median_us']:>14.2f} us/op",
+                          flush=True)
+            finally:
+                cases.close()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return {
+        'meta': {
+            'commit': _commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'repeat': repeat,
+            'quick': quick,
+        },
+        'results': results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: Optional[float] = None) -> List[Dict]:
+    """Cases whose median regressed past their threshold vs the baseline."""
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        limit = threshold if threshold is not None else result['threshold']
+        ratio = result['median_us'] / max(base['median_us'], 1e-9)
+        if ratio > 1 + limit:
+            regressions.append({
+                'case': name,
+                'baseline_us': base['median_us'],
+                'current_us': result['median_us'],
+                'ratio': ratio,
+                'threshold': limit,
+            })
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the core RAG pipeline")
+    parser.add_argument('--output', help="Write JSON results to this path")
+    parser.add_argument('--baseline', help="Compare against a previous JSON result")
+    parser.add_argument('--threshold', type=float,
+                        help="Override every case's allowed slowdown (e.g. 0.2 = 20%%)")
+    parser.add_argument('--filter', default="", help="Only run cases whose name contains this")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed samples per case")
+    parser.add_argument('--min-time', type=float, default=0.2, help="Seconds per sample")
+    parser.add_argument('--quick', action='store_true', help="Smaller sizes, for CI smoke runs")
+    args = parser.parse_args(argv)
+
+    report = run(args.filter, args.repeat, args.min_time, args.quick)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nWrote {len(report['results'])} results to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(report, baseline, args.threshold)
+        commit = baseline['meta'].get('commit') or args.baseline
+        if regressions:
+            print(f"\nRegressions vs {commit}:")
+            for r in regressions:
+                print(f"  {r['case']:<40}{r['baseline_us']:>12.2f} -> {r['current_us']:.2f} us/op "
+                      f"({r['ratio']:.2f}x, limit {1 + r['threshold']:.2f}x)")
+            return 1
+        print(f"\nNo regressions vs {commit}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
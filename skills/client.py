@@ -0,0 +1,223 @@
+"""
+Enterprise RAG Client - Thin Client for skills/server.py
+
+Talks to a running RAG server over one keep-alive connection, so a CLI
+invocation costs a socket connect instead of a full system startup.
+Stdlib only: importing this module does not load the RAG stack.
+
+Usage:
+    from client import RAGClient
+
+    with RAGClient(socket_path="/tmp/skills.sock") as rag:
+        result = rag.query("Fix the lint error")
+        print(result['answer'])
+
+        for index, result in rag.stream_batch(["Query 1", "Query 2"]):
+            print(index, result['skill_used'])
+
+CLI:
+    python skills/client.py "Fix the lint error in Component.tsx"
+
+Results are QueryResult.to_dict() payloads. The server address defaults
+to SKILLS_SERVER_SOCKET, else 127.0.0.1:SKILLS_SERVER_PORT (8765).
+"""
+
+import os
+import sys
+import json
+import socket
+import http.client
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class RAGClientError(Exception):
+    """Error response from the server."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class RAGClient:
+    """
+    Client for the local RAG server.
+
+    Example:
+        rag = RAGClient()
+        rag.query("Fix the lint error")['answer']
+        rag.get_pattern("react_lazy_init")
+        rag.close()
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        timeout: Optional[float] = 300
+    ):
+        if socket_path is None and host is None and port is None:
+            socket_path = os.environ.get('SKILLS_SERVER_SOCKET') or None
+        self.socket_path = socket_path
+        self.host = host or DEFAULT_HOST
+        self.port = port or int(os.environ.get('SKILLS_SERVER_PORT', DEFAULT_PORT))
+        self.timeout = timeout
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def __enter__(self) -> 'RAGClient':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            if self.socket_path:
+                self._conn = _UnixHTTPConnection(self.socket_path, self.timeout)
+            else:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _request(self, method: str, path: str, payload: Any = None) -> http.client.HTTPResponse:
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+
+        for attempt in range(2):
+            reused = self._conn is not None and self._conn.sock is not None
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # The server closed an idle keep-alive connection; retry once
+                self.close()
+                if not reused or attempt:
+                    raise
+                continue
+            except Exception:
+                self.close()
+                raise
+
+            if response.status >= 400:
+                data = response.read()
+                try:
+                    message = json.loads(data).get('error', '')
+                except ValueError:
+                    message = data.decode(errors='replace')
+                raise RAGClientError(response.status, message)
+            return response
+
+    def _json(self, method: str, path: str, payload: Any = None) -> Any:
+        response = self._request(method, path, payload)
+        data = response.read()
+        if response.will_close:
+            self.close()
+        return json.loads(data)
+
+    def health(self) -> Dict:
+        return self._json('GET', '/health')
+
+    def stats(self) -> Dict:
+        return self._json('GET', '/stats')
+
+    def query(
+        self,
+        query: str,
+        context: Optional[Dict] = None,
+        min_confidence: float = 0.60
+    ) -> Dict:
+        """Execute a single query."""
+        return self._json('POST', '/query', {
+            'query': query, 'context': context, 'min_confidence': min_confidence
+        })
+
+    def stream_batch(
+        self,
+        queries: List[str],
+        context: Optional[Dict] = None
+    ) -> Iterator[Tuple[int, Dict]]:
+        """Yield ``(index, result)`` pairs as the server completes them."""
+        response = self._request('POST', '/batch', {'queries': queries, 'context': context})
+        try:
+            for line in response:
+                item = json.loads(line)
+                if 'error' in item:
+                    raise RAGClientError(500, item['error'])
+                yield item['index'], item['result']
+        finally:
+            # An abandoned stream leaves unread data on the connection
+            if not response.isclosed() or response.will_close:
+                self.close()
+
+    def batch_query(
+        self,
+        queries: List[str],
+        context: Optional[Dict] = None
+    ) -> List[Dict]:
+        """Execute multiple queries; results in request order."""
+        results: List[Optional[Dict]] = [None] * len(queries)
+        for index, result in self.stream_batch(queries, context):
+            results[index] = result
+        return results
+
+    def get_pattern(self, pattern_id: str) -> Optional[Dict]:
+        """Get a code pattern by ID, or None."""
+        try:
+            return self._json('GET', f"/patterns/{quote(pattern_id, safe='')}")
+        except RAGClientError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def add_pattern(
+        self,
+        pattern_id: str,
+        code: str,
+        description: str,
+        confidence: float = 0.85,
+        tags: List[str] = None
+    ) -> bool:
+        """Add a pattern to the server's knowledge base."""
+        self._json('PUT', f"/patterns/{quote(pattern_id, safe='')}", {
+            'code': code, 'description': description,
+            'confidence': confidence, 'tags': tags or []
+        })
+        return True
+
+
+def main(argv: List[str]) -> int:
+    if not argv:
+        print("Usage: python skills/client.py QUERY [QUERY ...]", file=sys.stderr)
+        return 2
+    with RAGClient() as rag:
+        if len(argv) == 1:
+            print(json.dumps(rag.query(argv[0]), indent=2, default=str))
+        else:
+            for index, result in rag.stream_batch(argv):
+                print(json.dumps({'index': index, **result}, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
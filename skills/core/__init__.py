@@ -9,6 +9,17 @@ Modules:
 - hallucination: Hallucination prevention
 - thinking: Programmatic thinking engine
 - tools: Tool calling validation
+- automaton: Aho-Corasick keyword matching
+- history: Bounded histories with running aggregates
+- classifier: Shared query classification
+- ratelimit: Token bucket rate limiting
+- quota: Persistent daily usage counters
+- health: Backend health and circuit breakers
+- tracing: Request spans with JSONL / Chrome trace export
+- metrics: Sliding-window execution metrics
+- fingerprint: Canonical request cache keys
+- hashing: Stable 128-bit canonical hashing
+- opcount: Per-request storage operation counts
 """
 
 from .cache import SkillCache, CacheType, get_cache, CacheEntry
@@ -16,8 +27,8 @@ from .config import SkillsConfig, get_config
 from .registry import SkillRegistry, SkillInfo, get_registry
 from .context import ContextManager, ContextType, ContextEntry, get_context_manager
 from .hallucination import HallucinationPreventer, HallucinationCheck, get_hallucination_preventer
-from .thinking import ProgrammaticThinking, ThinkingResult, ThinkingPhase, get_thinking_engine
-from .tools import ToolValidator, ToolCall, ValidationResult, get_tool_validator
+from .thinking import ProgrammaticThinking, ThinkingResult, ThinkingEvent, ThinkingPhase, get_thinking_engine
+from .tools import ToolValidator, ToolCall, ValidationResult, ToolExecutionEngine, ToolLimits, get_tool_validator
 
 __all__ = [
     # Cache
@@ -49,6 +60,7 @@ __all__ = [
     # Thinking
     'ProgrammaticThinking',
     'ThinkingResult',
+    'ThinkingEvent',
     'ThinkingPhase',
     'get_thinking_engine',
     
@@ -56,6 +68,8 @@ __all__ = [
     'ToolValidator',
     'ToolCall',
     'ValidationResult',
+    'ToolExecutionEngine',
+    'ToolLimits',
     'get_tool_validator',
 ]
 
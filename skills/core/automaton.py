@@ -0,0 +1,100 @@
+"""
+Keyword Automaton
+=================
+
+Aho-Corasick automaton for matching many literal keywords in one pass.
+
+Matching cost is linear in the text length plus the number of matches,
+independent of how many keywords are loaded.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over literal keywords.
+
+    Example:
+        automaton = KeywordAutomaton([('lint', 'lint'), ('eslint', 'lint')])
+        for start, end, value in automaton.iter_matches("fix eslint"):
+            ...
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, Any]] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._own: List[List[Tuple[int, Any]]] = [[]]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+        self._size = 0
+        self._built = True
+
+        for keyword, value in keywords:
+            self.add(keyword, value)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, keyword: str, value: Any) -> None:
+        """Add a keyword; empty keywords are ignored."""
+        if not keyword:
+            return
+
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._own.append([])
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][ch] = nxt
+            node = nxt
+
+        self._own[node].append((len(keyword), value))
+        self._size += 1
+        self._built = False
+
+    def _build(self) -> None:
+        """Compute failure links and merged outputs (breadth first)."""
+        self._fail = [0] * len(self._goto)
+        self._out = [list(own) for own in self._own]
+
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child].extend(self._out[self._fail[child]])
+
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yield ``(start, end, value)`` for every keyword occurrence."""
+        if not self._built:
+            self._build()
+
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                for length, value in out[node]:
+                    yield i - length + 1, i + 1, value
+
+    def find_values(self, text: str) -> List[Any]:
+        """Distinct (hashable) matched values, in order of first occurrence."""
+        seen: Dict[Any, None] = {}
+        for _, _, value in self.iter_matches(text):
+            seen.setdefault(value, None)
+        return list(seen)
@@ -6,10 +6,9 @@ SQLite-based Local Caching - THE KEY TO ZERO COST
 
 import sqlite3
 import json
-import hashlib
 import time
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterable
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
@@ -17,6 +16,13 @@ from contextlib import contextmanager
 import threading
 import logging
 
+try:
+    from .hashing import stable_hash
+    from .opcount import count_op
+except ImportError:  # Run as a script
+    from hashing import stable_hash
+    from opcount import count_op
+
 logger = logging.getLogger('skills.cache')
 
 
@@ -47,6 +53,9 @@ class SkillCache:
     SQLite-based cache for zero-cost persistence.
     
     Target: 90%+ hit rate = $0 cloud costs
+    
+    Each read statement counts as a 'cache_read' and each write
+    transaction as a 'cache_write' for ``opcount.counting()`` scopes.
     """
     
     TTL_DEFAULTS = {
@@ -105,6 +114,7 @@ class SkillCache:
     
     def get(self, key: str, default: Any = None) -> Optional[Any]:
         """Get from cache, return default if not found or expired."""
+        count_op('cache_read')
         with self._lock:
             with self._transaction() as conn:
                 cursor = conn.execute('SELECT * FROM cache WHERE key = ?', (key,))
@@ -155,6 +165,7 @@ class SkillCache:
         
         value_str = json.dumps(value) if not isinstance(value, str) else value
         
+        count_op('cache_write')
         with self._lock:
             with self._transaction() as conn:
                 conn.execute('''
@@ -166,8 +177,119 @@ class SkillCache:
         
         return True
     
+    # SQLite's default limit on host parameters is 999
+    BULK_CHUNK = 500
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get several entries in one transaction.
+        
+        Returns a dict of the keys found and unexpired; hit counts are
+        updated as for get().
+        """
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        if not keys:
+            return found
+        
+        now = datetime.now()
+        now_iso = now.isoformat()
+        with self._lock:
+            with self._transaction() as conn:
+                expired = []
+                for i in range(0, len(keys), self.BULK_CHUNK):
+                    chunk = keys[i:i + self.BULK_CHUNK]
+                    marks = ','.join('?' * len(chunk))
+                    count_op('cache_read')
+                    rows = conn.execute(
+                        f'SELECT key, value, expires_at FROM cache WHERE key IN ({marks})',
+                        chunk
+                    ).fetchall()
+                    for row in rows:
+                        if row['expires_at'] and now > datetime.fromisoformat(row['expires_at']):
+                            expired.append((row['key'],))
+                            continue
+                        try:
+                            found[row['key']] = json.loads(row['value'])
+                        except (TypeError, ValueError):
+                            found[row['key']] = row['value']
+                
+                if expired:
+                    conn.executemany('DELETE FROM cache WHERE key = ?', expired)
+                if found:
+                    conn.executemany(
+                        'UPDATE cache SET hit_count = hit_count + 1, last_accessed = ? WHERE key = ?',
+                        [(now_iso, key) for key in found]
+                    )
+        return found
+    
+    def set_many(
+        self,
+        items: Dict[str, Any],
+        cache_type = None,
+        ttl: Optional[int] = None
+    ) -> int:
+        """Set several entries with the same type and TTL in one transaction."""
+        if cache_type is None:
+            cache_type = CacheType.EXECUTION
+        elif isinstance(cache_type, str):
+            cache_type = CacheType(cache_type)
+        
+        if ttl is None:
+            ttl = self.TTL_DEFAULTS.get(cache_type, 86400)
+        
+        now = datetime.now()
+        expires = (now + timedelta(seconds=ttl)).isoformat() if ttl else None
+        rows = [
+            (key, json.dumps(value) if not isinstance(value, str) else value,
+             cache_type.value, now.isoformat(), expires, now.isoformat())
+            for key, value in items.items()
+        ]
+        if not rows:
+            return 0
+        
+        count_op('cache_write')
+        with self._lock:
+            with self._transaction() as conn:
+                conn.executemany('''
+                    INSERT OR REPLACE INTO cache 
+                    (key, value, cache_type, created_at, expires_at, hit_count, last_accessed)
+                    VALUES (?, ?, ?, ?, ?, 0, ?)
+                ''', rows)
+        return len(rows)
+    
+    def get_by_prefix(
+        self,
+        prefix: str,
+        cache_type: Optional[CacheType] = None
+    ) -> Dict[str, Any]:
+        """Get all unexpired entries whose key starts with prefix."""
+        query = "SELECT key, value FROM cache WHERE key LIKE ? ESCAPE '\\' " \
+                "AND (expires_at IS NULL OR expires_at > ?)"
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        params = [escaped + '%', datetime.now().isoformat()]
+        if cache_type:
+            query += ' AND cache_type = ?'
+            params.append(cache_type.value)
+        
+        count_op('cache_read')
+        with self._lock:
+            with self._transaction() as conn:
+                rows = conn.execute(query, params).fetchall()
+        
+        entries = {}
+        for row in rows:
+            if not row['key'].startswith(prefix):
+                continue  # LIKE is case-insensitive
+            try:
+                entries[row['key']] = json.loads(row['value'])
+            except (TypeError, ValueError):
+                entries[row['key']] = row['value']
+        return entries
+    
     def delete(self, key: str) -> bool:
         """Delete cache entry."""
+        count_op('cache_write')
         with self._lock:
             with self._transaction() as conn:
                 cursor = conn.execute('DELETE FROM cache WHERE key = ?', (key,))
@@ -211,8 +333,7 @@ class SkillCache:
     @staticmethod
     def generate_key(*args, **kwargs) -> str:
         """Generate cache key from arguments."""
-        key_data = json.dumps({'args': args, 'kwargs': kwargs}, sort_keys=True)
-        return hashlib.sha256(key_data.encode()).hexdigest()[:16]
+        return stable_hash(args, kwargs)
 
 
 # Singleton
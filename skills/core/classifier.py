@@ -0,0 +1,129 @@
+"""
+Query Classification Engine
+===========================
+
+Single-pass query classifier shared by the thinking engine and the
+orchestrator.
+
+The query is lower-cased once and checked against the deduplicated
+keyword set of every rule table; the thinking query type, orchestrator
+intent and required skills are then resolved from that hit set by
+priority rules. Entities come from precompiled regexes. Results are
+cached per query.
+
+At a few dozen short keywords, C substring search beats both a
+pure-Python Aho-Corasick automaton and a lookahead regex alternation,
+so the keyword pass uses it (see the benchmark).
+
+Benchmark: python skills/benchmarks/bench_classifier.py
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import FrozenSet, Optional, Tuple
+
+
+# Rules are (label, keywords) checked in order; the first rule with a
+# keyword occurring anywhere in the query wins (substring semantics).
+QUERY_TYPE_RULES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('lint_fix', ('lint', 'error', 'fix', 'bug')),
+    ('generate', ('generate', 'create', 'write')),
+    ('document', ('document', 'pdf', 'word', 'excel')),
+    ('search', ('search', 'find', 'query')),
+)
+
+INTENT_RULES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('lint', ('lint', 'eslint', 'error', 'fix', 'bug')),
+    ('document', ('document', 'pdf', 'word', 'excel')),
+    ('generate', ('generate', 'create', 'build', 'make')),
+    ('design', ('design', 'style', 'ui', 'css')),
+    ('rag', ('query', 'search', 'retrieve', 'find')),
+)
+
+# Every matching rule contributes its skill, in this order
+SKILL_RULES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('lint-fixer', ('lint',)),
+    ('react-patterns', ('react',)),
+    ('docx', ('document',)),
+    ('LLM', ('generate',)),
+)
+
+# The lookbehind only starts file matches at token starts; a token that
+# fails to match at its start cannot match from inside either.
+FILE_PATTERN = re.compile(r'(?<![\w\-])[\w\-]+\.[tj]sx?')
+ERROR_CODE_PATTERN = re.compile(r'react-hooks/[\w-]+')
+
+
+@dataclass(frozen=True)
+class QueryClassification:
+    """Everything the classifiers extract from one query."""
+    query_type: str
+    intent: str
+    entities: Tuple[str, ...]
+    skills: Tuple[str, ...]
+    keywords: FrozenSet[str]
+
+
+class QueryClassifier:
+    """
+    Precompiled classifier for query type, intent, entities and skills.
+
+    Example:
+        result = get_query_classifier().classify("Fix lint error in App.tsx")
+        result.query_type  # 'lint_fix'
+        result.intent      # 'lint'
+        result.entities    # ('App.tsx',)
+    """
+
+    def __init__(self, cache_size: int = 4096):
+        self._keywords: Tuple[str, ...] = tuple(sorted(
+            {k for rules in (QUERY_TYPE_RULES, INTENT_RULES, SKILL_RULES)
+             for _, words in rules for k in words}
+        ))
+        self._query_type_rules = self._compile_rules(QUERY_TYPE_RULES)
+        self._intent_rules = self._compile_rules(INTENT_RULES)
+        self._skill_rules = self._compile_rules(SKILL_RULES)
+        self._cached_classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def classify(self, query: str) -> QueryClassification:
+        """Classify a query (cached per query string)."""
+        return self._cached_classify(query)
+
+    def _classify(self, query: str) -> QueryClassification:
+        query_lower = query.lower()
+        keywords = frozenset(k for k in self._keywords if k in query_lower)
+
+        return QueryClassification(
+            query_type=self._first_rule(self._query_type_rules, keywords),
+            intent=self._first_rule(self._intent_rules, keywords),
+            entities=tuple(FILE_PATTERN.findall(query) + ERROR_CODE_PATTERN.findall(query)),
+            skills=tuple(
+                label for label, words in self._skill_rules
+                if not words.isdisjoint(keywords)
+            ),
+            keywords=keywords
+        )
+
+    @staticmethod
+    def _compile_rules(rules) -> Tuple[Tuple[str, FrozenSet[str]], ...]:
+        return tuple((label, frozenset(words)) for label, words in rules)
+
+    @staticmethod
+    def _first_rule(rules, keywords: FrozenSet[str], default: str = 'general') -> str:
+        for label, words in rules:
+            if not words.isdisjoint(keywords):
+                return label
+        return default
+
+
+# Singleton
+_classifier: Optional[QueryClassifier] = None
+
+
+def get_query_classifier() -> QueryClassifier:
+    """Get global query classifier."""
+    global _classifier
+    if _classifier is None:
+        _classifier = QueryClassifier()
+    return _classifier
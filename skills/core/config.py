@@ -23,6 +23,8 @@ class SkillsConfig:
     gemini_daily_limit: int = 1500
     deepseek_daily_limit: int = 999999  # Unlimited
     local_daily_limit: int = 999999  # Unlimited
+    quota_spill_threshold: float = 0.95  # spill to the next tier at 95% of quota
+    quota_burst: int = 60  # token bucket capacity for quota-limited models
     
     # Performance targets
     target_cache_hit_rate: float = 0.90
@@ -33,9 +35,20 @@ class SkillsConfig:
     timeout: int = 300
     confidence_threshold: float = 0.85
     
+    # Context memory budget (cold chains are offloaded to the cache)
+    context_max_memory_bytes: int = 64 * 1024 * 1024
+    
+    # Request tracing (empty = off; *.json = Chrome trace, else JSONL)
+    trace_path: str = ""
+    
+    # Local query server (a Unix socket path takes precedence over TCP)
+    server_socket: str = ""
+    server_host: str = "127.0.0.1"
+    server_port: int = 8765
+    
     # Paths
     skills_path: str = "./skills"
-    manifest_path: str = "./skills/skill-manifest.json"
+    manifest_path: str = ""  # empty = skill-manifest.json under skills_path
     
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
@@ -52,4 +65,10 @@ def get_config() -> SkillsConfig:
         # Override from environment
         if os.environ.get('SKILLS_CACHE_PATH'):
             _config.cache_path = os.environ['SKILLS_CACHE_PATH']
+        if os.environ.get('SKILLS_TRACE_PATH'):
+            _config.trace_path = os.environ['SKILLS_TRACE_PATH']
+        if os.environ.get('SKILLS_SERVER_SOCKET'):
+            _config.server_socket = os.environ['SKILLS_SERVER_SOCKET']
+        if os.environ.get('SKILLS_SERVER_PORT'):
+            _config.server_port = int(os.environ['SKILLS_SERVER_PORT'])
     return _config
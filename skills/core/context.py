@@ -14,10 +14,12 @@ Architecture:
 - ContextValidator: Validates context integrity
 """
 
+import copy
 import json
 import hashlib
 import time
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Set, Callable
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
 from enum import Enum
@@ -48,6 +50,8 @@ class ContextEntry:
     expires_at: Optional[datetime]
     relevance_score: float = 1.0
     metadata: Dict = field(default_factory=dict)
+    size_bytes: int = 0
+    shared_ref: Optional[str] = None  # SharedPayload id when content is shared
     
     def is_expired(self) -> bool:
         if self.expires_at is None:
@@ -58,6 +62,52 @@ class ContextEntry:
         return self.relevance_score >= min_score
 
 
+class SharedPayload:
+    """
+    Reference-counted handle to a single read-only context payload.
+    
+    Every chain that receives a shared entry points at the same ``content``
+    object, so fanning one context out to many chains costs no extra memory
+    and the cache holds one copy of the payload rather than one per chain. The content is a
+    private copy taken when the payload is created, so later edits to the
+    source entry do not leak into the chains sharing it.
+    
+    ``refcount`` counts references held in this process only; the cached
+    copy is shared with other managers and expires by TTL.
+    """
+    
+    __slots__ = ('payload_id', '_content', 'refcount', 'size_bytes')
+    
+    def __init__(self, payload_id: str, content: Any):
+        self.payload_id = payload_id
+        self._content = content
+        self.refcount = 0
+        try:
+            self.size_bytes = len(json.dumps(content, default=str))
+        except (TypeError, ValueError):
+            self.size_bytes = len(str(content))
+    
+    @property
+    def content(self) -> Any:
+        return self._content
+
+
+# Fixed per-entry overhead (object headers, ids, timestamps) added to the
+# serialized payload size when estimating memory use.
+ENTRY_OVERHEAD_BYTES = 256
+
+
+def estimate_entry_size(entry: ContextEntry) -> int:
+    """Approximate in-memory footprint of an entry in bytes."""
+    try:
+        # Shared payloads are charged once, by the manager holding them
+        payload = "" if entry.shared_ref else json.dumps(entry.content, default=str)
+        meta = json.dumps(entry.metadata, default=str) if entry.metadata else ""
+    except (TypeError, ValueError):
+        payload, meta = str(entry.content), str(entry.metadata)
+    return ENTRY_OVERHEAD_BYTES + len(payload) + len(meta)
+
+
 @dataclass
 class ContextChain:
     """Chain of context entries."""
@@ -65,27 +115,52 @@ class ContextChain:
     entries: List[ContextEntry] = field(default_factory=list)
     current_index: int = 0
     max_entries: int = 100
+    approx_bytes: int = 0
+    on_remove: Optional[Callable[[ContextEntry], None]] = field(
+        default=None, repr=False, compare=False
+    )
+    _index: Dict[str, ContextEntry] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
     
     def add(self, entry: ContextEntry):
         """Add entry to chain."""
         if len(self.entries) >= self.max_entries:
             # Remove oldest expired entry or least relevant
             self._evict_one()
+        if not entry.size_bytes:
+            entry.size_bytes = estimate_entry_size(entry)
         self.entries.append(entry)
+        self._index[entry.id] = entry
+        self.approx_bytes += entry.size_bytes
+    
+    def get(self, entry_id: str) -> Optional[ContextEntry]:
+        """Get entry by id in O(1)."""
+        return self._index.get(entry_id)
     
     def _evict_one(self):
         """Evict one entry from chain."""
         # First try to remove expired
         for i, entry in enumerate(self.entries):
             if entry.is_expired():
-                self.entries.pop(i)
+                self._remove_at(i)
                 return
         
         # Otherwise remove least relevant
         if self.entries:
             min_idx = min(range(len(self.entries)), 
                          key=lambda i: self.entries[i].relevance_score)
-            self.entries.pop(min_idx)
+            self._remove_at(min_idx)
+    
+    def _remove_at(self, index: int) -> ContextEntry:
+        """Remove entry at index, keeping the byte estimate in sync."""
+        entry = self.entries.pop(index)
+        if self._index.get(entry.id) is entry:
+            del self._index[entry.id]
+        self.approx_bytes = max(0, self.approx_bytes - entry.size_bytes)
+        if self.on_remove:
+            self.on_remove(entry)
+        return entry
     
     def get_relevant(self, query: str, top_k: int = 10) -> List[ContextEntry]:
         """Get relevant entries for a query."""
@@ -111,21 +186,66 @@ class ContextChain:
         return relevant[:top_k]
     
     def to_dict(self) -> Dict:
-        """Serialize chain."""
+        """Serialize chain. Shared entries are stored as references."""
         return {
             'chain_id': self.chain_id,
             'entries': [
                 {
                     'id': e.id,
                     'context_type': e.context_type.value,
-                    'content': e.content,
+                    'content': None if e.shared_ref else e.content,
+                    'shared_ref': e.shared_ref,
                     'source_skill': e.source_skill,
-                    'relevance_score': e.relevance_score
+                    'target_skill': e.target_skill,
+                    'expires_at': e.expires_at.isoformat() if e.expires_at else None,
+                    'relevance_score': e.relevance_score,
+                    'metadata': e.metadata
                 }
                 for e in self.entries
             ],
             'current_index': self.current_index
         }
+    
+    @classmethod
+    def from_dict(
+        cls,
+        data: Dict,
+        max_entries: int = 100,
+        resolve: Optional[Callable[[str], Optional[SharedPayload]]] = None
+    ) -> 'ContextChain':
+        """
+        Deserialize chain produced by ``to_dict``.
+        
+        ``resolve`` maps a shared reference to its payload; entries whose
+        payload can no longer be resolved are dropped.
+        """
+        chain = cls(
+            chain_id=data['chain_id'],
+            current_index=data.get('current_index', 0),
+            max_entries=max_entries
+        )
+        for entry_data in data.get('entries', []):
+            expires_at = entry_data.get('expires_at')
+            shared_ref = entry_data.get('shared_ref')
+            content = entry_data['content']
+            if shared_ref:
+                payload = resolve(shared_ref) if resolve else None
+                if payload is None:
+                    continue
+                content = payload.content
+            chain.add(ContextEntry(
+                id=entry_data['id'],
+                context_type=ContextType(entry_data['context_type']),
+                content=content,
+                shared_ref=shared_ref,
+                source_skill=entry_data['source_skill'],
+                target_skill=entry_data.get('target_skill'),
+                created_at=datetime.now(),
+                expires_at=datetime.fromisoformat(expires_at) if expires_at else None,
+                relevance_score=entry_data.get('relevance_score', 1.0),
+                metadata=entry_data.get('metadata') or {}
+            ))
+        return chain
 
 
 class ContextManager:
@@ -138,12 +258,31 @@ class ContextManager:
     3. Relevance filtering
     4. Cross-skill context sharing
     5. Context validation
+    6. Global memory budget with LRU offload of cold chains to the cache
+    
+    Without a cache there is nowhere to offload to, so the memory budget
+    is not enforced: chains stay resident and a warning is logged once.
     """
     
-    def __init__(self, cache=None, max_chain_size: int = 100):
+    CHAIN_TTL = 86400  # 24 hours
+    
+    def __init__(
+        self,
+        cache=None,
+        max_chain_size: int = 100,
+        max_memory_bytes: Optional[int] = None
+    ):
         self.cache = cache
         self.max_chain_size = max_chain_size
-        self.chains: Dict[str, ContextChain] = {}
+        self.max_memory_bytes = max_memory_bytes
+        # Resident chains in LRU order (least recently used first)
+        self.chains: 'OrderedDict[str, ContextChain]' = OrderedDict()
+        self.offloaded: Set[str] = set()
+        self.shared_payloads: Dict[str, SharedPayload] = {}
+        self.resident_bytes = 0
+        self.offload_count = 0
+        self.reload_count = 0
+        self._warned_no_offload = False
         self._context_id_counter = 0
     
     def create_context(
@@ -183,51 +322,156 @@ class ContextManager:
     ) -> None:
         """Add context entry to a chain."""
         
-        if chain_id not in self.chains:
-            self.chains[chain_id] = ContextChain(
+        if chain_id in self.chains:
+            chain = self.chains[chain_id]
+            self.chains.move_to_end(chain_id)
+        elif chain_id in self.offloaded:
+            chain = self.get_chain(chain_id)
+        else:
+            chain = None
+        
+        if chain is None:
+            chain = ContextChain(
                 chain_id=chain_id,
-                max_entries=self.max_chain_size
+                max_entries=self.max_chain_size,
+                on_remove=self._release_entry
             )
+            self.chains[chain_id] = chain
         
-        self.chains[chain_id].add(entry)
+        before = chain.approx_bytes
+        chain.add(entry)
+        self.resident_bytes += chain.approx_bytes - before
         
         # Also cache the chain
-        if self.cache:
-            self.cache.set(
-                f"chain:{chain_id}",
-                self.chains[chain_id].to_dict(),
-                ttl=86400  # 24 hours
-            )
+        self._persist_chain(chain)
+        self._enforce_budget(keep=chain_id)
     
     def get_chain(self, chain_id: str) -> Optional[ContextChain]:
-        """Get a context chain."""
+        """Get a context chain, reloading it from the cache if offloaded."""
         
         if chain_id in self.chains:
+            self.chains.move_to_end(chain_id)
             return self.chains[chain_id]
         
         # Try to load from cache
         if self.cache:
             data = self.cache.get(f"chain:{chain_id}")
             if data:
-                chain = ContextChain(chain_id=chain_id)
-                for entry_data in data.get('entries', []):
-                    entry = ContextEntry(
-                        id=entry_data['id'],
-                        context_type=ContextType(entry_data['context_type']),
-                        content=entry_data['content'],
-                        source_skill=entry_data['source_skill'],
-                        target_skill=entry_data.get('target_skill'),
-                        created_at=datetime.now(),
-                        expires_at=None,
-                        relevance_score=entry_data.get('relevance_score', 1.0)
-                    )
-                    chain.entries.append(entry)
+                chain = ContextChain.from_dict(
+                    data,
+                    max_entries=self.max_chain_size,
+                    resolve=self._resolve_payload
+                )
+                chain.on_remove = self._release_entry
+                if chain_id in self.offloaded:
+                    self.offloaded.discard(chain_id)
+                    self.reload_count += 1
+                else:
+                    # First sight of this chain: its handles are new references
+                    for entry in chain.entries:
+                        if entry.shared_ref:
+                            self.shared_payloads[entry.shared_ref].refcount += 1
                 
                 self.chains[chain_id] = chain
+                self.resident_bytes += chain.approx_bytes
+                self._enforce_budget(keep=chain_id)
                 return chain
         
+        # Offloaded copy expired from the cache
+        self.offloaded.discard(chain_id)
         return None
     
+    def _persist_chain(self, chain: ContextChain) -> None:
+        """Write chain to the cache."""
+        if self.cache:
+            self.cache.set(
+                f"chain:{chain.chain_id}",
+                chain.to_dict(),
+                ttl=self.CHAIN_TTL
+            )
+    
+    def _enforce_budget(self, keep: Optional[str] = None) -> None:
+        """Offload least recently used chains until under the memory budget."""
+        
+        if self.max_memory_bytes is None or self.resident_bytes <= self.max_memory_bytes:
+            return
+        
+        if not self.cache:
+            if not self._warned_no_offload:
+                logger.warning(
+                    f"Context memory budget ({self.max_memory_bytes} bytes) exceeded "
+                    "but no cache is configured; keeping all chains resident"
+                )
+                self._warned_no_offload = True
+            return
+        
+        while self.resident_bytes > self.max_memory_bytes:
+            victim = next((cid for cid in self.chains if cid != keep), None)
+            if victim is None:
+                break
+            self._offload(victim)
+    
+    def _offload(self, chain_id: str) -> None:
+        """Move a resident chain out of memory."""
+        
+        chain = self.chains.pop(chain_id)
+        self.resident_bytes = max(0, self.resident_bytes - chain.approx_bytes)
+        self.offload_count += 1
+        
+        self._persist_chain(chain)
+        self.offloaded.add(chain_id)
+        logger.debug(f"Offloaded chain {chain_id} ({chain.approx_bytes} bytes)")
+    
+    def _resolve_payload(self, payload_id: str) -> Optional[SharedPayload]:
+        """Look up a shared payload, loading it from the cache if needed."""
+        
+        payload = self.shared_payloads.get(payload_id)
+        if payload is None and self.cache:
+            data = self.cache.get(f"shared:{payload_id}")
+            if data is not None:
+                payload = SharedPayload(payload_id, data.get('content'))
+                self._hold_payload(payload)
+        return payload
+    
+    def _hold_payload(self, payload: SharedPayload) -> None:
+        """Keep a payload resident, charging its bytes to the budget."""
+        self.shared_payloads[payload.payload_id] = payload
+        self.resident_bytes += payload.size_bytes
+    
+    def _share_payload(self, entry: ContextEntry) -> SharedPayload:
+        """Get or create the shared payload backing an entry."""
+        
+        payload = self._resolve_payload(entry.shared_ref) if entry.shared_ref else None
+        if payload is None:
+            payload = self.shared_payloads.get(entry.id)
+        if payload is None:
+            payload = SharedPayload(entry.id, copy.deepcopy(entry.content))
+            self._hold_payload(payload)
+        # Serialized on each share, however many chains reference it; each
+        # new reference also pushes the cached copy's expiry past the chain's
+        if self.cache:
+            self.cache.set(
+                f"shared:{payload.payload_id}",
+                {'content': payload.content},
+                ttl=self.CHAIN_TTL
+            )
+        return payload
+    
+    def _release_entry(self, entry: ContextEntry) -> None:
+        """Drop a reference held by an entry leaving its chain."""
+        
+        if not entry.shared_ref:
+            return
+        payload = self.shared_payloads.get(entry.shared_ref)
+        if payload is None:
+            return
+        payload.refcount -= 1
+        if payload.refcount <= 0:
+            # Only the local handle goes: other managers and persisted chains
+            # may still reference the cached copy, which expires by TTL
+            del self.shared_payloads[entry.shared_ref]
+            self.resident_bytes = max(0, self.resident_bytes - payload.size_bytes)
+    
     def get_relevant_context(
         self,
         chain_id: str,
@@ -259,31 +503,38 @@ class ContextManager:
         to_chain: str,
         context_id: str
     ) -> bool:
-        """Share context between chains."""
+        """
+        Share context between chains.
+        
+        The target chain receives a handle to the source payload rather than
+        a copy, so sharing one entry with many chains is O(1) per chain.
+        """
         
         source_chain = self.get_chain(from_chain)
         if not source_chain:
             return False
         
-        # Find the entry
-        for entry in source_chain.entries:
-            if entry.id == context_id:
-                # Create a copy for target chain
-                shared_entry = ContextEntry(
-                    id=f"shared_{entry.id}",
-                    context_type=ContextType.PEER_MESSAGE,
-                    content=entry.content,
-                    source_skill=entry.source_skill,
-                    target_skill=source_chain.chain_id,
-                    created_at=datetime.now(),
-                    expires_at=entry.expires_at,
-                    metadata={'shared_from': from_chain}
-                )
-                
-                self.add_to_chain(to_chain, shared_entry)
-                return True
+        entry = source_chain.get(context_id)
+        if entry is None:
+            return False
+        
+        payload = self._share_payload(entry)
+        payload.refcount += 1
         
-        return False
+        shared_entry = ContextEntry(
+            id=f"shared_{entry.id}",
+            context_type=ContextType.PEER_MESSAGE,
+            content=payload.content,
+            source_skill=entry.source_skill,
+            target_skill=source_chain.chain_id,
+            created_at=datetime.now(),
+            expires_at=entry.expires_at,
+            metadata={'shared_from': from_chain},
+            shared_ref=payload.payload_id
+        )
+        
+        self.add_to_chain(to_chain, shared_entry)
+        return True
     
     def validate_context(self, entry: ContextEntry) -> Dict:
         """Validate a context entry."""
@@ -327,9 +578,17 @@ class ContextManager:
         total_entries = sum(len(chain.entries) for chain in self.chains.values())
         
         return {
-            'total_chains': len(self.chains),
+            'total_chains': len(self.chains) + len(self.offloaded),
+            'resident_chains': len(self.chains),
+            'offloaded_chains': len(self.offloaded),
             'total_entries': total_entries,
-            'avg_chain_size': total_entries / max(1, len(self.chains))
+            'avg_chain_size': total_entries / max(1, len(self.chains)),
+            'resident_bytes': self.resident_bytes,
+            'max_memory_bytes': self.max_memory_bytes,
+            'offloads': self.offload_count,
+            'reloads': self.reload_count,
+            'shared_payloads': len(self.shared_payloads),
+            'shared_refs': sum(p.refcount for p in self.shared_payloads.values())
         }
 
 
@@ -341,10 +600,14 @@ def get_context_manager(cache=None) -> ContextManager:
     """Get global context manager."""
     global _context_manager
     if _context_manager is None:
+        from core.config import get_config
         if cache is None:
             from core.cache import get_cache
             cache = get_cache()
-        _context_manager = ContextManager(cache=cache)
+        _context_manager = ContextManager(
+            cache=cache,
+            max_memory_bytes=get_config().context_max_memory_bytes
+        )
     return _context_manager
 
 
@@ -0,0 +1,23 @@
+"""
+Request Fingerprints
+====================
+
+The one cache key scheme for query requests, shared by EnterpriseRAG and
+UnifiedOrchestrator so a request is cached once, under one key.
+"""
+
+from typing import Any, Dict, Optional
+
+try:
+    from .hashing import stable_hash
+except ImportError:  # Run as a script
+    from hashing import stable_hash
+
+
+def request_fingerprint(query: str, context: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Cache key for a (query, context) request.
+
+    Context key order does not matter; a missing context equals ``{}``.
+    """
+    return stable_hash(query, context or {})
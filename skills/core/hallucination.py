@@ -14,13 +14,27 @@ Strategies:
 
 import json
 import re
-from typing import Dict, List, Any, Optional, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Set, Tuple, Iterable, Iterator
 from dataclasses import dataclass, field
 from enum import Enum
 import logging
 
+try:
+    from .automaton import KeywordAutomaton
+    from .history import BoundedHistory
+except ImportError:  # Run as a script
+    from automaton import KeywordAutomaton
+    from history import BoundedHistory
+
 logger = logging.getLogger('hallucination')
 
+DEFAULT_PATTERNS_PATH = Path(__file__).parent.parent / 'rag' / 'knowledge' / 'patterns.json'
+
 
 class ConfidenceLevel(Enum):
     """Confidence levels for outputs."""
@@ -41,6 +55,7 @@ class HallucinationCheck:
     suggestions: List[str]
     verified_facts: List[str]
     uncertain_claims: List[str]
+    pattern_counts: Dict[str, int] = field(default_factory=dict)
 
 
 @dataclass
@@ -53,6 +68,193 @@ class FactVerification:
     evidence: List[str]
 
 
+# A fixed phrase between word boundaries, e.g. r'\bresearch shows\b'
+_PHRASE = re.compile(r"\\b([\w' ]+)\\b")
+
+
+def _can_overlap(a: str, b: str) -> bool:
+    """
+    Whether matches of two word-bounded phrases could overlap in a text.
+    
+    Matches start and end on word boundaries, so they can only share
+    whole words: a suffix of one phrase is a prefix of the other, or one
+    phrase contains the other.
+    """
+    for x, y in ((a, b), (b, a)):
+        ends_y = {m.end() for m in re.finditer(r'\w\b', y)}
+        ends_x = {m.end() for m in re.finditer(r'\w\b', x)}
+        for m in re.finditer(r'\b\w', x):
+            rest = x[m.start():]
+            if y.startswith(rest) and len(rest) in ends_y:
+                return True
+            if rest.startswith(y) and m.start() + len(y) in ends_x:
+                return True
+    return False
+
+
+class PatternMatcher:
+    """
+    Matcher over a list of regex patterns.
+    
+    Each pattern's matches are exactly what its own ``re.findall`` would
+    return. Fixed phrases that cannot overlap one another are compiled
+    into one alternation with a named group per pattern, so they share a
+    single pass over the text. Any other pattern (one with repetition,
+    like ``is ... known as``, or a phrase that could overlap another) is
+    scanned on its own; in a shared non-overlapping pass it would hide
+    the matches of the patterns inside its span.
+    """
+    
+    def __init__(self, patterns: Tuple[str, ...], flags: int = re.IGNORECASE):
+        self.patterns = patterns
+        self._separate: List[Tuple[int, 're.Pattern']] = []
+        phrases: Dict[int, str] = {}
+        
+        for i, pattern in enumerate(patterns):
+            m = _PHRASE.fullmatch(pattern)
+            phrase = m.group(1).lower() if m else None
+            if phrase is None or any(_can_overlap(phrase, other) for other in phrases.values()):
+                self._separate.append((i, re.compile(pattern, flags)))
+            else:
+                phrases[i] = phrase
+        
+        self.regex = re.compile(
+            '|'.join(f"(?P<p{i}>{patterns[i]})" for i in phrases), flags
+        ) if phrases else None
+    
+    def scan_by_pattern(self, text: str) -> List[List[str]]:
+        """Matched strings per pattern, in text order."""
+        found: List[List[str]] = [[] for _ in self.patterns]
+        if self.regex is not None:
+            for m in self.regex.finditer(text):
+                found[int(m.lastgroup[1:])].append(m.group())
+        for i, regex in self._separate:
+            found[i] = [' '.join(f) if isinstance(f, tuple) else f for f in regex.findall(text)]
+        return found
+    
+    def scan(self, text: str) -> Tuple[List[str], List[int]]:
+        """Return matched strings (in pattern order) and per-pattern match counts."""
+        found = self.scan_by_pattern(text)
+        return [match for matches in found for match in matches], [len(m) for m in found]
+
+
+@lru_cache(maxsize=32)
+def compile_patterns(patterns: Tuple[str, ...]) -> PatternMatcher:
+    """Get a (shared) compiled matcher for a pattern list."""
+    return PatternMatcher(patterns)
+
+
+class KnownPatternIndex:
+    """
+    Index of verified code patterns for claim verification.
+    
+    Lower-cased pattern code snippets and normalized ids ("lazy_init" ->
+    "lazy init") are loaded into one keyword automaton, so finding every
+    known pattern mentioned in a text is a single pass regardless of how
+    many patterns are held.
+    """
+    
+    def __init__(self, patterns: Optional[Dict[str, Dict]] = None):
+        self.patterns: Dict[str, Dict] = {}
+        self._order: Dict[str, int] = {}
+        self._automaton: Optional[KeywordAutomaton] = None
+        for pattern_id, pattern in (patterns or {}).items():
+            self.add(pattern_id, pattern['code'], pattern.get('confidence', 0.85),
+                     pattern.get('verified', True))
+    
+    def __len__(self) -> int:
+        return len(self.patterns)
+    
+    def __contains__(self, pattern_id: str) -> bool:
+        return pattern_id in self.patterns
+    
+    def get(self, pattern_id: str) -> Optional[Dict]:
+        return self.patterns.get(pattern_id)
+    
+    def add(
+        self,
+        pattern_id: str,
+        code: str,
+        confidence: float,
+        verified: bool = True
+    ) -> None:
+        """Add or replace a pattern."""
+        self.patterns[pattern_id] = {
+            'code': code,
+            'confidence': confidence,
+            'verified': verified
+        }
+        self._order.setdefault(pattern_id, len(self._order))
+        self._automaton = None  # Rebuilt on next lookup
+    
+    def load_file(self, path: Path) -> int:
+        """Load patterns from a patterns.json file without overriding existing ids."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load patterns from {path}: {e}")
+            return 0
+        
+        loaded = 0
+        for pattern_id, pattern in data.get('patterns', {}).items():
+            if pattern_id in self.patterns or not pattern.get('code'):
+                continue
+            self.add(pattern_id, pattern['code'], pattern.get('confidence', 0.85))
+            loaded += 1
+        return loaded
+    
+    def load_cache(self, cache) -> int:
+        """Load patterns stored under ``pattern:<id>`` in the cache."""
+        loaded = 0
+        for key, pattern in cache.get_by_prefix('pattern:').items():
+            if isinstance(pattern, dict) and pattern.get('code'):
+                self.add(key[len('pattern:'):], pattern['code'],
+                         pattern.get('confidence', 0.85))
+                loaded += 1
+        return loaded
+    
+    def _get_automaton(self) -> KeywordAutomaton:
+        if self._automaton is None:
+            automaton = KeywordAutomaton()
+            for pattern_id, pattern in self.patterns.items():
+                automaton.add(pattern['code'].lower(), ('code', pattern_id))
+                automaton.add(pattern_id.replace('_', ' ').lower(), ('id', pattern_id))
+            self._automaton = automaton
+        return self._automaton
+    
+    def find(self, text: str) -> List[Tuple[str, str]]:
+        """
+        Find patterns mentioned in text (case-insensitive).
+        
+        Returns:
+            ``(kind, pattern_id)`` pairs, kind being 'code' or 'id', in
+            pattern insertion order
+        """
+        found = self._get_automaton().find_values(text.lower())
+        return sorted(found, key=lambda m: self._order[m[1]])
+    
+    def find_codes(self, text: str) -> List[str]:
+        """Ids of patterns whose code occurs verbatim (case-sensitive) in text."""
+        return [
+            pattern_id for kind, pattern_id in self.find(text)
+            if kind == 'code' and self.patterns[pattern_id]['code'] in text
+        ]
+    
+    def find_code(self, text: str) -> Optional[Dict]:
+        """First pattern whose code occurs verbatim (case-sensitive) in text."""
+        return self.first(self.find_codes(text))
+    
+    def first(self, pattern_ids: Iterable[str]) -> Optional[Dict]:
+        """The earliest added of the given patterns, or None."""
+        pattern_id = min(pattern_ids, key=self._order.__getitem__, default=None)
+        return self.patterns[pattern_id] if pattern_id is not None else None
+    
+    @property
+    def max_code_length(self) -> int:
+        return max((len(p['code']) for p in self.patterns.values()), default=0)
+
+
 class HallucinationPreventer:
     """
     Prevents hallucinations in AI outputs.
@@ -98,7 +300,8 @@ class HallucinationPreventer:
         r'\bproven\b',
     ]
     
-    # Known good patterns (from our patterns database)
+    # Default known good patterns; each instance indexes these together with
+    # rag/knowledge/patterns.json and patterns stored in the cache
     KNOWN_PATTERNS = {
         'lazy_init': {
             'code': 'useState(() => value)',
@@ -117,9 +320,26 @@ class HallucinationPreventer:
         }
     }
     
-    def __init__(self, cache=None):
+    def __init__(
+        self,
+        cache=None,
+        patterns_path: Optional[str] = None,
+        history_size: int = 1000,
+        history_sink=None,
+        known_patterns: Optional[KnownPatternIndex] = None
+    ):
         self.cache = cache
-        self.verification_history: List[FactVerification] = []
+        self.verification_history = BoundedHistory(history_size, sink=history_sink)
+        if known_patterns is not None:
+            # Prebuilt index (e.g. a check_many worker): skip file and cache loads
+            self.known_patterns = known_patterns
+        else:
+            self.known_patterns = KnownPatternIndex(self.KNOWN_PATTERNS)
+            self.known_patterns.load_file(Path(patterns_path) if patterns_path else DEFAULT_PATTERNS_PATH)
+            if cache:
+                self.known_patterns.load_cache(cache)
+        self._uncertainty_matcher = compile_patterns(tuple(self.UNCERTAINTY_PATTERNS))
+        self._factual_matcher = compile_patterns(tuple(self.FACTUAL_PATTERNS))
     
     def check(self, output: str, context: Dict = None) -> HallucinationCheck:
         """
@@ -132,6 +352,93 @@ class HallucinationPreventer:
         Returns:
             HallucinationCheck with results
         """
+        uncertainty_matches, uncertainty_counts = self._uncertainty_matcher.scan(output)
+        factual_matches, factual_counts = self._factual_matcher.scan(output)
+        
+        return self._build_check(
+            uncertainty_matches,
+            uncertainty_counts,
+            factual_matches,
+            factual_counts,
+            has_code=self._has_code(output),
+            pattern_match=self._check_known_patterns(output),
+            context=context
+        )
+    
+    def check_many(
+        self,
+        outputs: Iterable[str],
+        workers: int = 1,
+        chunk_size: int = 256,
+        context: Dict = None
+    ) -> Iterator[HallucinationCheck]:
+        """
+        Check many outputs, yielding results in input order.
+        
+        With ``workers > 1`` chunks of ``chunk_size`` outputs are fanned out
+        to a process pool; each worker compiles the matchers and pattern
+        index once. At most ``2 * workers`` chunks are in flight, so
+        ``outputs`` may be a lazy iterator of any length.
+        
+        Args:
+            outputs: Outputs to check (any iterable)
+            workers: Number of worker processes (1 = in-process)
+            chunk_size: Outputs per task sent to a worker
+            context: Optional context passed to every check
+            
+        Returns:
+            Iterator of HallucinationCheck
+        """
+        if workers <= 1:
+            for output in outputs:
+                yield self.check(output, context)
+            return
+        
+        iterator = iter(outputs)
+        pending = deque()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_batch_worker,
+            initargs=(type(self), dict(self.known_patterns.patterns))
+        ) as pool:
+            while True:
+                while len(pending) < 2 * workers:
+                    chunk = list(islice(iterator, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append(pool.submit(_check_batch, chunk, context))
+                if not pending:
+                    break
+                yield from pending.popleft().result()
+    
+    def stream(
+        self,
+        context: Dict = None,
+        abort_threshold: float = 0.40
+    ) -> 'StreamingCheck':
+        """
+        Start an incremental check over a streamed output.
+        
+        Example:
+            checker = preventer.stream()
+            for chunk in response:
+                if checker.feed(chunk).should_abort:
+                    break
+            result = checker.finish()
+        """
+        return StreamingCheck(self, context=context, abort_threshold=abort_threshold)
+    
+    def _build_check(
+        self,
+        uncertainty_matches: List[str],
+        uncertainty_counts: List[int],
+        factual_matches: List[str],
+        factual_counts: List[int],
+        has_code: bool,
+        pattern_match: Optional[Dict],
+        context: Dict = None
+    ) -> HallucinationCheck:
+        """Assemble a HallucinationCheck from scan results."""
         issues = []
         warnings = []
         suggestions = []
@@ -139,13 +446,11 @@ class HallucinationPreventer:
         verified_facts = []
         
         # 1. Check for uncertainty language
-        uncertainty_matches = self._check_uncertainty(output)
         if uncertainty_matches:
             uncertain_claims.extend(uncertainty_matches)
             warnings.append(f"Uncertainty detected: {len(uncertainty_matches)} phrases")
         
         # 2. Check for factual claims
-        factual_matches = self._check_factual_claims(output)
         for claim in factual_matches:
             # Try to verify against known patterns
             verified = self._verify_against_known(claim, context)
@@ -155,14 +460,9 @@ class HallucinationPreventer:
                 uncertain_claims.append(claim)
         
         # 3. Check confidence indicators
-        confidence = self._calculate_confidence(
-            output, 
-            uncertainty_matches, 
-            factual_matches
-        )
+        confidence = self._score(len(uncertainty_matches), len(factual_matches), has_code)
         
         # 4. Check against known good patterns
-        pattern_match = self._check_known_patterns(output)
         if pattern_match:
             confidence = max(confidence, pattern_match['confidence'])
             verified_facts.append(f"Pattern match: {pattern_match['code']}")
@@ -176,54 +476,55 @@ class HallucinationPreventer:
         if uncertain_claims:
             suggestions.append("Verify uncertain claims before presenting")
         
-        # Determine level
-        if confidence > 0.85:
-            level = ConfidenceLevel.HIGH
-        elif confidence > 0.60:
-            level = ConfidenceLevel.MEDIUM
-        elif confidence > 0.40:
-            level = ConfidenceLevel.LOW
-        else:
-            level = ConfidenceLevel.UNCERTAIN
-        
         return HallucinationCheck(
             is_hallucination=is_hallucination,
             confidence=confidence,
-            level=level,
+            level=self._confidence_level(confidence),
             issues=issues,
             warnings=warnings,
             suggestions=suggestions,
             verified_facts=verified_facts,
-            uncertain_claims=uncertain_claims
+            uncertain_claims=uncertain_claims,
+            pattern_counts=self._pattern_counts(uncertainty_counts, factual_counts)
         )
     
+    @staticmethod
+    def _confidence_level(confidence: float) -> ConfidenceLevel:
+        """Map a confidence score to its level."""
+        if confidence > 0.85:
+            return ConfidenceLevel.HIGH
+        elif confidence > 0.60:
+            return ConfidenceLevel.MEDIUM
+        elif confidence > 0.40:
+            return ConfidenceLevel.LOW
+        return ConfidenceLevel.UNCERTAIN
+    
+    def _pattern_counts(
+        self,
+        uncertainty_counts: List[int],
+        factual_counts: List[int]
+    ) -> Dict[str, int]:
+        """Map non-zero per-pattern counts back to their patterns."""
+        counts = {}
+        for pattern, count in zip(self.UNCERTAINTY_PATTERNS, uncertainty_counts):
+            if count:
+                counts[pattern] = count
+        for pattern, count in zip(self.FACTUAL_PATTERNS, factual_counts):
+            if count:
+                counts[pattern] = count
+        return counts
+    
     def _check_uncertainty(self, text: str) -> List[str]:
         """Find uncertainty patterns in text."""
-        matches = []
-        for pattern in self.UNCERTAINTY_PATTERNS:
-            found = re.findall(pattern, text, re.IGNORECASE)
-            matches.extend(found)
-        return matches
+        return self._uncertainty_matcher.scan(text)[0]
     
     def _check_factual_claims(self, text: str) -> List[str]:
         """Find factual claims in text."""
-        matches = []
-        for pattern in self.FACTUAL_PATTERNS:
-            found = re.findall(pattern, text, re.IGNORECASE)
-            matches.extend([' '.join(f) if isinstance(f, tuple) else f for f in found])
-        return matches
+        return self._factual_matcher.scan(text)[0]
     
     def _verify_against_known(self, claim: str, context: Dict = None) -> bool:
         """Verify claim against known patterns."""
-        claim_lower = claim.lower()
-        
-        for pattern_id, pattern in self.KNOWN_PATTERNS.items():
-            if pattern['code'].lower() in claim_lower:
-                return True
-            if pattern_id.replace('_', ' ') in claim_lower:
-                return True
-        
-        return False
+        return bool(self.known_patterns.find(claim))
     
     def _calculate_confidence(
         self,
@@ -232,17 +533,30 @@ class HallucinationPreventer:
         factual_matches: List[str]
     ) -> float:
         """Calculate overall confidence score."""
+        return self._score(
+            len(uncertainty_matches),
+            len(factual_matches),
+            self._has_code(text)
+        )
+    
+    @staticmethod
+    def _has_code(text: str) -> bool:
+        """Check for code blocks (higher confidence)."""
+        return '```' in text or 'useState' in text
+    
+    @staticmethod
+    def _score(uncertainty_count: int, factual_count: int, has_code: bool) -> float:
+        """Confidence score from match counts."""
         
         base_confidence = 0.80
         
         # Reduce for uncertainty
-        uncertainty_penalty = len(uncertainty_matches) * 0.10
+        uncertainty_penalty = uncertainty_count * 0.10
         
         # Increase for verified facts
-        fact_bonus = len(factual_matches) * 0.05
+        fact_bonus = factual_count * 0.05
         
-        # Check for code blocks (higher confidence)
-        code_bonus = 0.10 if '```' in text or 'useState' in text else 0
+        code_bonus = 0.10 if has_code else 0
         
         confidence = base_confidence - uncertainty_penalty + fact_bonus + code_bonus
         
@@ -250,10 +564,7 @@ class HallucinationPreventer:
     
     def _check_known_patterns(self, text: str) -> Optional[Dict]:
         """Check if text matches known good patterns."""
-        for pattern_id, pattern in self.KNOWN_PATTERNS.items():
-            if pattern['code'] in text:
-                return pattern
-        return None
+        return self.known_patterns.find_code(text)
     
     def verify_fact(
         self,
@@ -268,8 +579,9 @@ class HallucinationPreventer:
         source = None
         
         # Check against known patterns
-        for pattern_id, pattern in self.KNOWN_PATTERNS.items():
-            if pattern['code'] in claim or pattern_id.replace('_', ' ') in claim.lower():
+        for kind, pattern_id in self.known_patterns.find(claim):
+            pattern = self.known_patterns.get(pattern_id)
+            if kind == 'id' or pattern['code'] in claim:
                 is_verified = True
                 source = f"known_pattern:{pattern_id}"
                 evidence.append(f"Matches verified pattern: {pattern['code']}")
@@ -295,6 +607,8 @@ class HallucinationPreventer:
         )
         
         self.verification_history.append(verification)
+        if is_verified:
+            self.verification_history.incr('verified')
         return verification
     
     def add_known_pattern(
@@ -304,27 +618,186 @@ class HallucinationPreventer:
         confidence: float,
         verified: bool = True
     ):
-        """Add a new known good pattern."""
-        self.KNOWN_PATTERNS[pattern_id] = {
-            'code': code,
-            'confidence': confidence,
-            'verified': verified
-        }
+        """Add a new known good pattern to this instance."""
+        self.known_patterns.add(pattern_id, code, confidence, verified)
     
     def get_stats(self) -> Dict:
         """Get hallucination prevention statistics."""
         
-        total = len(self.verification_history)
-        verified = sum(1 for v in self.verification_history if v.is_verified)
+        history = self.verification_history
         
         return {
-            'total_checks': total,
-            'verified': verified,
-            'verification_rate': verified / max(1, total),
-            'known_patterns': len(self.KNOWN_PATTERNS)
+            'total_checks': history.total,
+            'verified': history.count('verified'),
+            'verification_rate': history.rate('verified'),
+            'known_patterns': len(self.known_patterns)
         }
 
 
+@dataclass
+class StreamStatus:
+    """Running state of a streaming check after a chunk."""
+    confidence: float
+    level: ConfidenceLevel
+    should_abort: bool
+    chars_seen: int
+    uncertainty_count: int
+    factual_count: int
+
+
+class StreamingCheck:
+    """
+    Incremental hallucination check over streamed text chunks.
+    
+    No uncertainty or factual pattern matches across a newline, so
+    completed lines are scanned once and committed, and ``finish()``
+    returns exactly what ``check()`` returns for the concatenated text.
+    Known code patterns may span lines; each commit is searched together
+    with the end of the text before it, long enough to hold any code.
+    
+    The unfinished line is kept until its newline (or ``finish()``) and
+    scanned provisionally for the running status. On very long lines
+    only the last ``max_pending_chars`` or so are rescanned per chunk;
+    earlier text is settled into provisional counts at a word boundary,
+    so the running status (never the final result) can miss a match
+    that the boundary cuts.
+    """
+    
+    # Tail kept unsettled when a long line is settled, longer than any
+    # uncertainty phrase
+    SPLIT_MARGIN = 64
+    
+    def __init__(
+        self,
+        preventer: HallucinationPreventer,
+        context: Dict = None,
+        abort_threshold: float = 0.40,
+        max_pending_chars: int = 4096
+    ):
+        self.preventer = preventer
+        self.context = context
+        self.abort_threshold = abort_threshold
+        self.max_pending_chars = max_pending_chars
+        self.chars_seen = 0
+        self.aborted = False
+        self._line: List[str] = []  # unfinished line
+        self._tail = ""             # its unsettled end, rescanned per chunk
+        self._settled = (0, 0, False)  # provisional (uncertainty, factual, has_code) before it
+        self._uncertainty: List[List[str]] = [[] for _ in preventer.UNCERTAINTY_PATTERNS]
+        self._factual: List[List[str]] = [[] for _ in preventer.FACTUAL_PATTERNS]
+        self._has_code = False
+        self._code_ids: Set[str] = set()
+        self._code_carry = ""
+        self._finished = False
+    
+    def feed(self, chunk: str) -> StreamStatus:
+        """Consume a chunk and return the running status."""
+        if self._finished:
+            raise RuntimeError("StreamingCheck already finished")
+        
+        self.chars_seen += len(chunk)
+        *lines, rest = chunk.split('\n')
+        if lines:
+            lines[0] = ''.join(self._line) + lines[0]
+            self._commit('\n'.join(lines) + '\n')
+            self._line, self._tail, self._settled = [], "", (0, 0, False)
+        if rest:
+            self._line.append(rest)
+            self._tail += rest
+            if len(self._tail) > self.max_pending_chars:
+                self._settle()
+        
+        # Provisional scan of the unfinished line
+        uncertainty = sum(map(len, self._uncertainty)) + self._settled[0]
+        factual = sum(map(len, self._factual)) + self._settled[1]
+        has_code = self._has_code or self._settled[2]
+        code_ids = self._code_ids
+        if self._tail:
+            uncertainty += len(self.preventer._uncertainty_matcher.scan(self._tail)[0])
+            factual += len(self.preventer._factual_matcher.scan(self._tail)[0])
+            has_code = has_code or self.preventer._has_code(self._tail)
+            code_ids = code_ids.union(self.preventer.known_patterns.find_codes(self._tail))
+        pattern_match = self.preventer.known_patterns.first(code_ids)
+        
+        confidence = self.preventer._score(uncertainty, factual, has_code)
+        if pattern_match:
+            confidence = max(confidence, pattern_match['confidence'])
+        
+        if confidence < self.abort_threshold:
+            self.aborted = True
+        
+        return StreamStatus(
+            confidence=confidence,
+            level=HallucinationPreventer._confidence_level(confidence),
+            should_abort=self.aborted,
+            chars_seen=self.chars_seen,
+            uncertainty_count=uncertainty,
+            factual_count=factual
+        )
+    
+    def finish(self) -> HallucinationCheck:
+        """Commit remaining text and return the final check."""
+        if not self._finished:
+            if self._line:
+                self._commit(''.join(self._line))
+                self._line, self._tail, self._settled = [], "", (0, 0, False)
+            self._finished = True
+        
+        return self.preventer._build_check(
+            [match for matches in self._uncertainty for match in matches],
+            [len(matches) for matches in self._uncertainty],
+            [match for matches in self._factual for match in matches],
+            [len(matches) for matches in self._factual],
+            has_code=self._has_code,
+            pattern_match=self.preventer.known_patterns.first(self._code_ids),
+            context=self.context
+        )
+    
+    def _settle(self) -> None:
+        """Fold all but the end of a long unfinished line into provisional counts."""
+        limit = len(self._tail) - self.SPLIT_MARGIN
+        cut = self._tail.rfind(' ', 0, limit) + 1 or limit
+        head, self._tail = self._tail[:cut], self._tail[cut:]
+        uncertainty, factual, has_code = self._settled
+        self._settled = (
+            uncertainty + len(self.preventer._uncertainty_matcher.scan(head)[0]),
+            factual + len(self.preventer._factual_matcher.scan(head)[0]),
+            has_code or self.preventer._has_code(head)
+        )
+    
+    def _commit(self, text: str) -> None:
+        """Scan whole lines into the running totals."""
+        for found, matches in zip(
+            self._uncertainty, self.preventer._uncertainty_matcher.scan_by_pattern(text)
+        ):
+            found.extend(matches)
+        for found, matches in zip(
+            self._factual, self.preventer._factual_matcher.scan_by_pattern(text)
+        ):
+            found.extend(matches)
+        self._has_code = self._has_code or self.preventer._has_code(text)
+        
+        index = self.preventer.known_patterns
+        window = self._code_carry + text
+        self._code_ids.update(index.find_codes(window))
+        keep = index.max_code_length - 1
+        self._code_carry = window[-keep:] if keep > 0 else ""
+
+
+# Per-process preventer used by check_many workers
+_batch_preventer: Optional[HallucinationPreventer] = None
+
+
+def _init_batch_worker(cls, patterns: Dict[str, Dict]) -> None:
+    """Build the worker's preventer once, with the parent's patterns."""
+    global _batch_preventer
+    _batch_preventer = cls(known_patterns=KnownPatternIndex(patterns))
+
+
+def _check_batch(outputs: List[str], context: Dict = None) -> List[HallucinationCheck]:
+    return [_batch_preventer.check(output, context) for output in outputs]
+
+
 # Singleton
 _hallucination_preventer: Optional[HallucinationPreventer] = None
 
@@ -0,0 +1,116 @@
+"""
+Canonical Hashing
+=================
+
+Stable 128-bit keys for cache entries, shared by every cache key scheme.
+
+Each part is canonically encoded and fed to BLAKE2b (16-byte digest),
+prefixed with its length so parts cannot run into each other:
+
+- str parts are hashed as UTF-8 directly (no JSON escaping pass);
+- other values use compact, key-sorted JSON from the C encoder, with
+  type-tagged objects for datetime/date/time, Path, Enum, UUID, Decimal,
+  set/frozenset, bytes and dataclasses.
+
+Encoding follows JSON where JSON is defined: tuples encode as lists and
+int/float/bool/None dict keys as their JSON string forms. Values of any
+other type raise TypeError rather than hashing an unstable repr.
+
+Benchmark: python skills/benchmarks/bench_hashing.py
+"""
+
+import hashlib
+import json
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from enum import Enum
+from pathlib import PurePath
+from typing import Any
+from uuid import UUID
+
+DIGEST_BYTES = 16
+
+# Tag key for non-JSON types; a NUL-prefixed key cannot come from
+# ordinary JSON-shaped input by accident
+_TAG = '\x00t'
+
+
+def _tagged(kind: str, value: Any) -> dict:
+    return {_TAG: kind, 'v': value}
+
+
+def _encode_extra(value: Any) -> Any:
+    """``json.dumps`` default hook: tag the types JSON lacks."""
+    if isinstance(value, datetime):
+        return _tagged('datetime', value.isoformat())
+    if isinstance(value, date):
+        return _tagged('date', value.isoformat())
+    if isinstance(value, dt_time):
+        return _tagged('time', value.isoformat())
+    if isinstance(value, PurePath):
+        return _tagged('path', value.as_posix())
+    if isinstance(value, Enum):
+        cls = type(value)
+        return _tagged('enum', [f"{cls.__module__}.{cls.__qualname__}", value.value])
+    if isinstance(value, UUID):
+        return _tagged('uuid', str(value))
+    if isinstance(value, Decimal):
+        return _tagged('decimal', str(value))
+    if isinstance(value, (set, frozenset)):
+        return _tagged('set', sorted(value, key=canonical_bytes))
+    if isinstance(value, (bytes, bytearray)):
+        return _tagged('bytes', bytes(value).hex())
+    if is_dataclass(value) and not isinstance(value, type):
+        cls = type(value)
+        return _tagged('dataclass', [
+            f"{cls.__module__}.{cls.__qualname__}",
+            {f.name: getattr(value, f.name) for f in fields(value)}
+        ])
+    raise TypeError(f"Cannot canonically encode {type(value).__name__}")
+
+
+def _sortable_keys(value: Any) -> Any:
+    """Rewrite dicts whose keys do not sort together as tagged pair lists."""
+    if isinstance(value, dict):
+        items = [(k, _sortable_keys(v)) for k, v in value.items()]
+        try:
+            sorted(k for k, _ in items)
+            return dict(items)
+        except TypeError:
+            return _tagged('map', sorted(
+                ([k, v] for k, v in items), key=lambda kv: canonical_bytes(kv[0])
+            ))
+    if isinstance(value, (list, tuple)):
+        return [_sortable_keys(v) for v in value]
+    return value
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(
+        value, sort_keys=True, separators=(',', ':'), default=_encode_extra
+    )
+
+
+def canonical_bytes(value: Any) -> bytes:
+    """Canonical, type-tagged byte encoding of a value."""
+    if type(value) is str:
+        return b's' + value.encode('utf-8', 'surrogatepass')
+    if type(value) is bytes:
+        return b'b' + value
+    try:
+        encoded = _dumps(value)
+    except TypeError:
+        # Mixed key types cannot be sorted by the C encoder
+        encoded = _dumps(_sortable_keys(value))
+    return b'j' + encoded.encode('utf-8', 'surrogatepass')
+
+
+def stable_hash(*parts: Any) -> str:
+    """128-bit BLAKE2b hex digest (32 chars) of the canonical parts."""
+    h = hashlib.blake2b(digest_size=DIGEST_BYTES)
+    for part in parts:
+        data = canonical_bytes(part)
+        h.update(b'%d:' % len(data))
+        h.update(data)
+    return h.hexdigest()
@@ -0,0 +1,145 @@
+"""
+Backend Health Tracking
+=======================
+
+Rolling latency, error rate and queue depth per backend, with a circuit
+breaker that ejects a backend after repeated failures and lets a single
+probe through once its cooldown has passed.
+"""
+
+import threading
+import time
+from enum import Enum
+from typing import Callable, Dict
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    CLOSED: calls flow; ``failure_threshold`` consecutive failures open it.
+    OPEN: calls are rejected until ``reset_timeout`` seconds have passed.
+    HALF_OPEN: one probe call is let through; success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether a call would be allowed now (does not reserve a probe)."""
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return True
+            if self.state == CircuitState.OPEN:
+                return self.clock() - self.opened_at >= self.reset_timeout
+            return not self._probing
+
+    def allow(self) -> bool:
+        """Admit a call, reserving the probe slot when half-open."""
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                if self.clock() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = CircuitState.HALF_OPEN
+                self._probing = False
+            if self.state == CircuitState.HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CircuitState.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = CircuitState.OPEN
+                self.opened_at = self.clock()
+            self._probing = False
+
+
+class BackendHealth:
+    """
+    Rolling health of one backend.
+
+    Latency and error rate are EWMAs over completed calls, failed ones
+    included; ``in_flight`` is the current queue depth. Until its first
+    call completes a backend is assumed to take ``prior_ms``, so a cold
+    backend is not mistaken for the fastest one.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        breaker: CircuitBreaker = None,
+        prior_ms: float = 100.0
+    ):
+        self.alpha = alpha
+        self.breaker = breaker or CircuitBreaker()
+        self.prior_ms = prior_ms
+        self.latency_ms = prior_ms
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def finish(self, latency_ms: float, ok: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.calls += 1
+            if not ok:
+                self.errors += 1
+            if self.calls == 1:
+                self.latency_ms = latency_ms  # replaces the prior
+            else:
+                self.latency_ms = self.alpha * latency_ms + (1 - self.alpha) * self.latency_ms
+            self.error_rate = self.alpha * (0.0 if ok else 1.0) + (1 - self.alpha) * self.error_rate
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def expected_ms(self) -> float:
+        """Expected completion time for a new call, penalized by error rate."""
+        queue_factor = self.in_flight + 1
+        return self.latency_ms * queue_factor / max(0.05, 1.0 - self.error_rate)
+
+    def to_dict(self) -> Dict:
+        return {
+            'latency_ms': round(self.latency_ms, 3),
+            'error_rate': round(self.error_rate, 4),
+            'in_flight': self.in_flight,
+            'calls': self.calls,
+            'errors': self.errors,
+            'circuit': self.breaker.state.value,
+            'expected_ms': round(self.expected_ms(), 3)
+        }
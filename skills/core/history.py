@@ -0,0 +1,144 @@
+"""
+Bounded History with Streaming Aggregates
+=========================================
+
+Fixed-size ring buffer for execution histories.
+
+Only the most recent ``maxlen`` items are kept in memory; counts, sums
+and EWMAs are maintained incrementally over the whole lifetime, so stats
+are O(1) no matter how long a worker runs. Evicted items can optionally
+be spilled to a JSONL file.
+"""
+
+import json
+import threading
+from collections import deque
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+import logging
+
+logger = logging.getLogger('skills.history')
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class JsonlSink:
+    """Appends evicted history items to a JSONL file."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def __call__(self, item: Any) -> None:
+        record = asdict(item) if is_dataclass(item) else item
+        line = json.dumps(record, default=_json_default)
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+
+
+class BoundedHistory:
+    """
+    Ring buffer with O(1) running aggregates.
+
+    Example:
+        history = BoundedHistory(maxlen=1000)
+        history.append(result)
+        history.incr('successful')
+        history.observe('duration_ms', 12.5)
+        history.rate('successful')   # successful / total
+        history.ewma('duration_ms')
+    """
+
+    def __init__(
+        self,
+        maxlen: int = 1000,
+        alpha: float = 0.1,
+        sink: Optional[Callable[[Any], None]] = None
+    ):
+        self.maxlen = maxlen
+        self.alpha = alpha
+        self.sink = sink
+        self.total = 0
+        self._items: deque = deque(maxlen=maxlen)
+        self._counts: Dict[str, int] = {}
+        self._sums: Dict[str, float] = {}
+        self._observations: Dict[str, int] = {}
+        self._ewmas: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(list(self._items))
+
+    def __getitem__(self, index: int) -> Any:
+        return self._items[index]
+
+    def append(self, item: Any) -> None:
+        """Add an item, spilling the oldest one if the buffer is full."""
+        evicted = None
+        with self._lock:
+            if len(self._items) == self.maxlen:
+                evicted = self._items[0]
+            self._items.append(item)
+            self.total += 1
+
+        if evicted is not None and self.sink:
+            try:
+                self.sink(evicted)
+            except Exception as e:
+                logger.warning(f"History sink failed: {e}")
+
+    def incr(self, name: str, n: int = 1) -> None:
+        """Increment a named lifetime counter."""
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + n
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a numeric observation (sum, mean and EWMA)."""
+        with self._lock:
+            self._sums[name] = self._sums.get(name, 0.0) + value
+            self._observations[name] = self._observations.get(name, 0) + 1
+            previous = self._ewmas.get(name)
+            self._ewmas[name] = value if previous is None else (
+                self.alpha * value + (1 - self.alpha) * previous
+            )
+
+    def count(self, name: str) -> int:
+        return self._counts.get(name, 0)
+
+    def rate(self, name: str, denominator: Optional[int] = None) -> float:
+        """Counter divided by ``denominator`` (default: total appended)."""
+        total = self.total if denominator is None else denominator
+        return self.count(name) / max(1, total)
+
+    def sum(self, name: str) -> float:
+        return self._sums.get(name, 0.0)
+
+    def mean(self, name: str) -> float:
+        return self.sum(name) / max(1, self._observations.get(name, 0))
+
+    def ewma(self, name: str) -> float:
+        return self._ewmas.get(name, 0.0)
+
+    def clear(self) -> None:
+        """Drop retained items and reset all aggregates."""
+        with self._lock:
+            self._items.clear()
+            self.total = 0
+            self._counts.clear()
+            self._sums.clear()
+            self._observations.clear()
+            self._ewmas.clear()
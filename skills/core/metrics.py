@@ -0,0 +1,236 @@
+"""
+Rolling Execution Metrics
+=========================
+
+Sliding-window counters and latency histograms for execution results.
+
+A window is a ring of time buckets with running totals: recording adds
+to the current bucket and the totals, and buckets that fall out of the
+window are subtracted as the ring rotates. Queries read the totals and a
+fixed set of log-spaced latency bins, so they cost the same no matter
+how many results were recorded. Windows are kept overall and per skill
+and per model.
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Latency bin upper edges in ms: 0.1ms .. ~60s, 25% apart
+LATENCY_BINS: Tuple[float, ...] = tuple(
+    0.1 * 1.25 ** i for i in range(int(math.log(600000) / math.log(1.25)) + 2)
+)
+
+COUNTERS = ('count', 'success', 'cached', 'failed')
+
+
+class _Bucket:
+    __slots__ = ('epoch', 'counts', 'cost', 'latency')
+
+    def __init__(self):
+        self.epoch = -1
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.cost = 0.0
+        self.latency = [0] * (len(LATENCY_BINS) + 1)
+
+
+class SlidingWindow:
+    """
+    Counts, cost and latency histogram over the last ``window_seconds``.
+
+    Example:
+        window = SlidingWindow(window_seconds=300, bucket_seconds=10)
+        window.record(success=True, cached=False, cost=0.0, latency_ms=42)
+        window.snapshot()['p95_ms']
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 300,
+        bucket_seconds: float = 10,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.clock = clock
+        self._buckets = [_Bucket() for _ in range(max(1, int(window_seconds // bucket_seconds)))]
+        self._counts = dict.fromkeys(COUNTERS, 0)
+        self._cost = 0.0
+        self._latency = [0] * (len(LATENCY_BINS) + 1)
+        self._lock = threading.Lock()
+
+    def _current(self) -> _Bucket:
+        """Bucket for now, expiring whatever it held from an older epoch."""
+        epoch = int(self.clock() // self.bucket_seconds)
+        bucket = self._buckets[epoch % len(self._buckets)]
+        if bucket.epoch != epoch:
+            self._evict(bucket)
+            bucket.epoch = epoch
+        return bucket
+
+    def _evict(self, bucket: _Bucket) -> None:
+        for name in COUNTERS:
+            self._counts[name] -= bucket.counts[name]
+            bucket.counts[name] = 0
+        self._cost -= bucket.cost
+        bucket.cost = 0.0
+        for i, n in enumerate(bucket.latency):
+            if n:
+                self._latency[i] -= n
+                bucket.latency[i] = 0
+
+    def _expire(self) -> None:
+        horizon = int(self.clock() // self.bucket_seconds) - len(self._buckets)
+        for bucket in self._buckets:
+            if 0 <= bucket.epoch <= horizon:
+                self._evict(bucket)
+                bucket.epoch = -1
+
+    def record(self, success: bool, cached: bool, cost: float, latency_ms: float) -> None:
+        flags = {'count': 1, 'success': int(success), 'cached': int(cached),
+                 'failed': int(not success and not cached)}
+        bin_index = bisect_left(LATENCY_BINS, latency_ms)
+        with self._lock:
+            bucket = self._current()
+            for name, n in flags.items():
+                bucket.counts[name] += n
+                self._counts[name] += n
+            bucket.cost += cost
+            self._cost += cost
+            bucket.latency[bin_index] += 1
+            self._latency[bin_index] += 1
+
+    def percentile(self, q: float) -> float:
+        """Latency percentile (0-100) as the upper edge of its bin."""
+        with self._lock:
+            self._expire()
+            return self._percentile(q)
+
+    def _percentile(self, q: float) -> float:
+        total = self._counts['count']
+        if total == 0:
+            return 0.0
+        target = max(1, math.ceil(total * q / 100))
+        seen = 0
+        for i, n in enumerate(self._latency):
+            seen += n
+            if seen >= target:
+                return LATENCY_BINS[i] if i < len(LATENCY_BINS) else float('inf')
+        return float('inf')
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            self._expire()
+            count = self._counts['count']
+            return {
+                'count': count,
+                'success_rate': self._counts['success'] / max(1, count - self._counts['cached']),
+                'cache_hit_rate': self._counts['cached'] / max(1, count),
+                'failed': self._counts['failed'],
+                'total_cost': self._cost,
+                'cost_per_1k': self._cost / max(1, count) * 1000,
+                'p50_ms': self._percentile(50),
+                'p95_ms': self._percentile(95),
+                'p99_ms': self._percentile(99),
+            }
+
+
+class ExecutionMetrics:
+    """
+    Rolling metrics for ExecutionResults, overall and per skill/model.
+
+    Example:
+        metrics = ExecutionMetrics()
+        metrics.record(result)
+        metrics.snapshot()                  # all results in the window
+        metrics.snapshot(skill='lint-fixer')
+        metrics.check_targets(manifest['performanceTargets'])
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 300,
+        bucket_seconds: float = 10,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.clock = clock
+        self.total = 0
+        self.total_cost = 0.0
+        self._lifetime = dict.fromkeys(COUNTERS, 0)
+        self._windows: Dict[str, SlidingWindow] = {}
+        self._lock = threading.Lock()
+
+    def _window(self, key: str) -> SlidingWindow:
+        window = self._windows.get(key)
+        if window is None:
+            with self._lock:
+                window = self._windows.setdefault(
+                    key, SlidingWindow(self.window_seconds, self.bucket_seconds, self.clock)
+                )
+        return window
+
+    def record(self, result) -> None:
+        """Record an ExecutionResult."""
+        status = getattr(result.status, 'value', result.status)
+        success = status == 'success'
+        cached = bool(result.cache_hit)
+        with self._lock:
+            self.total += 1
+            self.total_cost += result.cost
+            self._lifetime['count'] += 1
+            self._lifetime['success'] += int(success)
+            self._lifetime['cached'] += int(cached)
+            self._lifetime['failed'] += int(not success and not cached)
+
+        for key in ('all', f'skill:{result.skill_id}', f'model:{result.model_used}'):
+            self._window(key).record(success, cached, result.cost, result.duration_ms)
+
+    def lifetime(self) -> Dict:
+        """Counters since start (not windowed)."""
+        count = self._lifetime['count']
+        return {
+            'total_executions': count,
+            'success_rate': self._lifetime['success'] / max(1, count - self._lifetime['cached']),
+            'cache_hit_rate': self._lifetime['cached'] / max(1, count),
+            'total_cost': self.total_cost,
+        }
+
+    def snapshot(self, skill: Optional[str] = None, model: Optional[str] = None) -> Dict:
+        """Windowed stats overall, or for one skill or model."""
+        key = f'skill:{skill}' if skill else f'model:{model}' if model else 'all'
+        window = self._windows.get(key)
+        return window.snapshot() if window else SlidingWindow(
+            self.window_seconds, self.bucket_seconds, self.clock
+        ).snapshot()
+
+    def breakdown(self, kind: str) -> Dict[str, Dict]:
+        """Windowed stats for every 'skill' or 'model' seen."""
+        prefix = f'{kind}:'
+        return {
+            key[len(prefix):]: window.snapshot()
+            for key, window in list(self._windows.items()) if key.startswith(prefix)
+        }
+
+    def check_targets(self, targets: Dict) -> Dict[str, Dict]:
+        """
+        Compare the window against manifest ``performanceTargets``.
+
+        responseTimeMs is checked against p95 latency.
+        """
+        stats = self.snapshot()
+        checks: List[Tuple[str, str, float, bool]] = [
+            ('cacheHitRate', 'cache_hit_rate', stats['cache_hit_rate'], True),
+            ('responseTimeMs', 'p95_ms', stats['p95_ms'], False),
+            ('costPer1kQueries', 'cost_per_1k', stats['cost_per_1k'], False),
+        ]
+        report = {}
+        for target, metric, actual, higher_is_better in checks:
+            if target not in targets:
+                continue
+            goal = targets[target]
+            met = actual >= goal if higher_is_better else actual <= goal
+            report[target] = {'metric': metric, 'target': goal, 'actual': actual, 'met': met}
+        return report
@@ -0,0 +1,47 @@
+"""
+Storage Operation Counting
+==========================
+
+Counts the storage operations a unit of work actually performs. The
+storage layers (cache, quota) call ``count_op`` where each read or write
+transaction happens; callers wrap a request in ``counting()`` to collect
+what it cost:
+
+    with counting() as ops:
+        cache.get(key)
+    ops  # {'cache_read': 1}
+
+Scopes live in a ContextVar, so they follow asyncio tasks and work
+submitted with ``asyncio.to_thread`` or ``copy_context().run``. Scopes
+nest: an operation is counted in every enclosing scope. Outside any
+scope ``count_op`` is a no-op.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Tuple
+
+_scopes: ContextVar[Tuple[Dict[str, int], ...]] = ContextVar('skills_op_scopes', default=())
+_lock = threading.Lock()
+
+
+def count_op(stage: str, n: int = 1) -> None:
+    """Record ``n`` operations of ``stage`` in every active scope."""
+    scopes = _scopes.get()
+    if not scopes:
+        return
+    with _lock:
+        for counts in scopes:
+            counts[stage] = counts.get(stage, 0) + n
+
+
+@contextmanager
+def counting() -> Iterator[Dict[str, int]]:
+    """Collect the operations counted inside the block into a dict."""
+    counts: Dict[str, int] = {}
+    token = _scopes.set(_scopes.get() + (counts,))
+    try:
+        yield counts
+    finally:
+        _scopes.reset(token)
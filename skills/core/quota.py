@@ -0,0 +1,153 @@
+"""
+Persistent Usage Counters
+=========================
+
+Per-model daily usage counters in SQLite, shared by every process that
+points at the same database file.
+
+Increments run inside ``BEGIN IMMEDIATE`` transactions, so a
+check-and-increment against a quota is atomic across processes. Counters
+are keyed by UTC day, which gives the daily rollover; rows older than
+``RETENTION_DAYS`` are pruned as new days start. Counts that need no
+quota check can be added in bulk with ``add_many``. Each transaction
+counts as a 'quota_write' and each lookup as a 'quota_read' for
+``opcount.counting()`` scopes.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+import logging
+
+try:
+    from .opcount import count_op
+except ImportError:  # Run as a script
+    from opcount import count_op
+
+logger = logging.getLogger('skills.quota')
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class UsageStore:
+    """
+    Atomic daily usage counters.
+
+    Example:
+        store = UsageStore("./skills/cache/skills.db")
+        if store.try_consume('gemini', limit=1500):
+            ...  # call gemini
+        store.used('gemini')
+    """
+
+    RETENTION_DAYS = 7
+
+    def __init__(
+        self,
+        path: Union[str, Path] = ':memory:',
+        clock: Callable[[], datetime] = _utc_now
+    ):
+        self.path = str(path)
+        if self.path != ':memory:':
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._pruned_day: Optional[str] = None
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS model_usage (
+                model TEXT NOT NULL,
+                day TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (model, day)
+            )
+        ''')
+
+    def today(self) -> str:
+        return self.clock().strftime('%Y-%m-%d')
+
+    def try_consume(self, model: str, limit: Optional[float] = None, n: int = 1) -> bool:
+        """
+        Add ``n`` to today's count unless that would exceed ``limit``.
+
+        The read and the increment happen under one write lock, so
+        concurrent processes never overshoot the limit.
+        """
+        day = self.today()
+        count_op('quota_write')
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if limit is not None:
+                    row = conn.execute(
+                        'SELECT count FROM model_usage WHERE model = ? AND day = ?',
+                        (model, day)
+                    ).fetchone()
+                    if (row[0] if row else 0) + n > limit:
+                        conn.execute('ROLLBACK')
+                        return False
+                self._increment({model: n}, day)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return True
+
+    def add_many(self, counts: Dict[str, int], day: Optional[str] = None) -> None:
+        """Add unchecked counts for several models in one transaction."""
+        day = day or self.today()
+        count_op('quota_write')
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._increment(counts, day)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    def _increment(self, counts: Dict[str, int], day: str) -> None:
+        self._conn.executemany('''
+            INSERT INTO model_usage (model, day, count) VALUES (?, ?, ?)
+            ON CONFLICT (model, day) DO UPDATE SET count = count + excluded.count
+        ''', [(model, day, n) for model, n in counts.items()])
+        if self._pruned_day != day:
+            self._prune(day)
+
+    def _prune(self, day: str) -> None:
+        cutoff = (datetime.strptime(day, '%Y-%m-%d') - timedelta(days=self.RETENTION_DAYS))
+        self._conn.execute(
+            'DELETE FROM model_usage WHERE day < ?', (cutoff.strftime('%Y-%m-%d'),)
+        )
+        self._pruned_day = day
+
+    def used(self, model: str) -> int:
+        """Today's count for a model."""
+        count_op('quota_read')
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT count FROM model_usage WHERE model = ? AND day = ?',
+                (model, self.today())
+            ).fetchone()
+        return row[0] if row else 0
+
+    def usage(self) -> Dict[str, int]:
+        """Today's counts for every model used today."""
+        count_op('quota_read')
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT model, count FROM model_usage WHERE day = ?', (self.today(),)
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
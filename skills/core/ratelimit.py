@@ -0,0 +1,86 @@
+"""
+Token Bucket Rate Limiting
+==========================
+
+Thread-safe token bucket shared by the tool engine and model routing.
+
+A bucket holds up to ``capacity`` tokens and refills continuously at
+``rate`` tokens per second; each admitted request takes one token.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """
+    Continuous-refill token bucket.
+
+    Example:
+        bucket = TokenBucket(rate=5, capacity=10)  # 5/s, bursts of 10
+        if bucket.try_acquire():
+            ...
+        else:
+            time.sleep(bucket.wait_time())
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available, without waiting."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def refund(self, tokens: float = 1.0) -> None:
+        """Return tokens taken for a request that was not admitted after all."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Seconds until ``tokens`` will be available (0 if they are now)."""
+        with self._lock:
+            self._refill()
+            return max(0.0, (tokens - self._tokens) / self.rate)
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Block until tokens are taken; False if ``timeout`` runs out first."""
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            if self.try_acquire(tokens):
+                return True
+            delay = self.wait_time(tokens)
+            if deadline is not None:
+                remaining = deadline - self.clock()
+                if remaining <= 0 or delay > remaining:
+                    return False
+            time.sleep(delay)
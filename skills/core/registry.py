@@ -34,6 +34,7 @@ class SkillRegistry:
         self.manifest_path = Path(manifest_path or self.skills_path / "skill-manifest.json")
         self.skills: Dict[str, SkillInfo] = {}
         self.trigger_matrix: Dict[str, Dict] = {}
+        self.performance_targets: Dict[str, float] = {}
         self._load_manifest()
         logger.info(f"Registry initialized with {len(self.skills)} skills")
     
@@ -59,6 +60,7 @@ class SkillRegistry:
             
             # Load trigger matrix
             self.trigger_matrix = manifest.get('triggerMatrix', {})
+            self.performance_targets = manifest.get('performanceTargets', {})
     
     def get_skill(self, skill_id: str) -> Optional[SkillInfo]:
         """Get skill by ID."""
@@ -109,16 +111,33 @@ class SkillRegistry:
 
 # Singleton
 _registry: Optional[SkillRegistry] = None
+# Registries for other skills trees, by resolved path
+_registries: Dict[Path, SkillRegistry] = {}
 
 
 def get_registry(skills_path: Optional[str] = None, manifest_path: Optional[str] = None) -> SkillRegistry:
-    """Get global registry instance."""
+    """
+    Get global registry instance.
+    
+    A ``skills_path`` other than the global registry's gets a shared
+    registry of its own, so a caller never sees another tree's skills.
+    The manifest defaults to skill-manifest.json under the skills path.
+    """
     global _registry
     if _registry is None:
         from .config import get_config
         config = get_config()
         _registry = SkillRegistry(
             skills_path or config.skills_path,
-            manifest_path or config.manifest_path
+            manifest_path or config.manifest_path or None
         )
-    return _registry
+        return _registry
+    
+    if skills_path is None:
+        return _registry
+    root = Path(skills_path).resolve()
+    if root == _registry.skills_path.resolve():
+        return _registry
+    if root not in _registries:
+        _registries[root] = SkillRegistry(skills_path, manifest_path)
+    return _registries[root]
@@ -14,14 +14,34 @@ Process:
 This engine prevents hallucinations by enforcing structured thinking.
 """
 
-import json
 import time
-from typing import Dict, List, Any, Optional, Callable
+import asyncio
+import threading
+from collections import OrderedDict
+from contextvars import copy_context
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import (
+    Dict, List, Any, Optional, Callable, Set, Tuple,
+    AsyncIterator, Generator, Iterator
+)
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime
 import logging
 
+try:
+    from .classifier import get_query_classifier
+    from .config import get_config
+    from .hashing import stable_hash
+    from .history import BoundedHistory
+    from .tracing import span
+except ImportError:  # Run as a script
+    from classifier import get_query_classifier
+    from config import get_config
+    from hashing import stable_hash
+    from history import BoundedHistory
+    from tracing import span
+
 logger = logging.getLogger('thinking')
 
 
@@ -54,8 +74,13 @@ class ThinkingStep:
     actual_output: Any = None
     status: ExecutionStatus = ExecutionStatus.PENDING
     confidence: float = 0.0
-    duration_ms: int = 0
+    duration_ms: float = 0.0
     issues: List[str] = field(default_factory=list)
+    duration_ns: int = 0
+    
+    def __post_init__(self):
+        if self.duration_ns and not self.duration_ms:
+            self.duration_ms = self.duration_ns / 1e6
 
 
 @dataclass
@@ -66,11 +91,19 @@ class ThinkingResult:
     steps: List[ThinkingStep]
     final_answer: Any
     confidence: float
-    total_duration_ms: int
+    total_duration_ms: float
     success: bool
     learnings: List[str]
 
 
+@dataclass
+class ThinkingEvent:
+    """Progress event from ``think_stream``: a completed step or the result."""
+    step: Optional[ThinkingStep]
+    result: Optional[ThinkingResult]
+    elapsed_ns: int
+
+
 class ProgrammaticThinking:
     """
     Programmatic Thinking Engine for structured problem solving.
@@ -82,14 +115,32 @@ class ProgrammaticThinking:
     4. VERIFY: Check results match expectations
     5. LEARN: Record patterns for future
     
-    Each phase validates before proceeding to next.
+    Each phase validates before proceeding to next. Plans that executed
+    successfully are recorded by LEARN and reused for later queries with
+    the same analysis signature.
     """
     
-    def __init__(self, cache=None, hallucination_preventer=None):
+    PLAN_MEMO_SIZE = 256
+    
+    def __init__(
+        self,
+        cache=None,
+        hallucination_preventer=None,
+        history_size: int = 1000,
+        history_sink=None,
+        max_concurrent: Optional[int] = None
+    ):
         self.cache = cache
         self.hallucination_preventer = hallucination_preventer
+        self.max_concurrent = max_concurrent or get_config().max_concurrent
         self.step_counter = 0
-        self.process_history: List[ThinkingResult] = []
+        # Guards step_counter, the pool and the plan memo
+        self._lock = threading.Lock()
+        # Shared by every think() on this engine; created on first use
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # In-process LRU front for plans persisted in the cache
+        self._plan_memo: 'OrderedDict[str, Dict]' = OrderedDict()
+        self.process_history = BoundedHistory(history_size, sink=history_sink)
     
     def think(
         self,
@@ -111,23 +162,113 @@ class ProgrammaticThinking:
             ThinkingResult with complete thinking process
         """
         
+        with span('thinking.think', query=query) as trace:
+            phases = self._run_phases(query, context, available_tools, max_steps)
+            while True:
+                step, result = self._advance(phases)
+                if result is not None:
+                    trace.set(success=result.success, steps=len(result.steps))
+                    return result
+    
+    async def think_stream(
+        self,
+        query: str,
+        context: Dict = None,
+        available_tools: List[str] = None,
+        max_steps: int = 20,
+        phase_timeout: Optional[float] = None
+    ) -> AsyncIterator['ThinkingEvent']:
+        """
+        Async variant of ``think`` yielding each step as it completes.
+        
+        Phases run in a worker thread so the event loop stays responsive.
+        The last event carries the ThinkingResult. ``phase_timeout`` raises
+        ``asyncio.TimeoutError`` when a single step takes longer.
+        
+        Steps are cooperative: a step already running when the consumer is
+        cancelled, times out or stops iterating is not interrupted. It
+        finishes in its thread, then the process is closed so no further
+        step starts and plan actions that have not started are skipped.
+        
+        Example:
+            async for event in engine.think_stream("Fix the lint error"):
+                if event.result:
+                    print(event.result.confidence)
+                else:
+                    print(event.step.phase.value, event.step.duration_ms)
+        """
+        
+        start = time.perf_counter_ns()
+        stop = threading.Event()
+        phases = self._run_phases(query, context, available_tools, max_steps, stop)
+        advance: Optional[asyncio.Future] = None
+        try:
+            while True:
+                # Shielded: cancelling the wait must not orphan the thread
+                # while it is still inside the generator
+                advance = asyncio.ensure_future(asyncio.to_thread(self._advance, phases))
+                step, result = await asyncio.wait_for(asyncio.shield(advance), timeout=phase_timeout)
+                elapsed_ns = time.perf_counter_ns() - start
+                if result is not None:
+                    yield ThinkingEvent(step=None, result=result, elapsed_ns=elapsed_ns)
+                    return
+                yield ThinkingEvent(step=step, result=None, elapsed_ns=elapsed_ns)
+        finally:
+            stop.set()
+            if advance is not None and not advance.done():
+                advance.add_done_callback(lambda _: phases.close())
+            else:
+                phases.close()
+    
+    @staticmethod
+    def _advance(phases: Generator) -> Tuple[Optional[ThinkingStep], Optional[ThinkingResult]]:
+        """Run the process to its next step, or to its result."""
+        try:
+            return next(phases), None
+        except StopIteration as done:
+            return None, done.value
+    
+    def _run_phases(
+        self,
+        query: str,
+        context: Dict = None,
+        available_tools: List[str] = None,
+        max_steps: int = 20,
+        stop: Optional[threading.Event] = None
+    ) -> Generator[ThinkingStep, None, ThinkingResult]:
+        """
+        Yield each step as it completes and return the final result.
+        
+        Once ``stop`` is set, plan actions that have not started are skipped.
+        """
+        
         process_id = f"think_{int(time.time()*1000)}"
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         steps = []
         learnings = []
         
         # Phase 1: ANALYZE
-        analyze_step = self._analyze(query, context)
+        with span('thinking.analyze'):
+            analyze_step = self._analyze(query, context)
         steps.append(analyze_step)
+        yield analyze_step
         
         if analyze_step.status != ExecutionStatus.SUCCESS:
             return self._create_result(
                 process_id, query, steps, None, 0.0, start_time, False, learnings
             )
         
-        # Phase 2: PLAN
-        plan_step, plan = self._plan(query, analyze_step.actual_output, available_tools)
+        # Phase 2: PLAN (reuse a learned plan for the same analysis signature)
+        with span('thinking.plan') as trace:
+            plan_key = self._plan_key(analyze_step.actual_output, available_tools)
+            cached_plan = self._get_cached_plan(plan_key)
+            trace.set(cached=cached_plan is not None)
+            if cached_plan is not None:
+                plan_step, plan = self._cached_plan_step(cached_plan), cached_plan
+            else:
+                plan_step, plan = self._plan(query, analyze_step.actual_output, available_tools)
         steps.append(plan_step)
+        yield plan_step
         
         if plan_step.status != ExecutionStatus.SUCCESS:
             return self._create_result(
@@ -135,28 +276,36 @@ class ProgrammaticThinking:
             )
         
         # Phase 3: EXECUTE
-        execution_results = []
-        for i, action in enumerate(plan.get('actions', [])):
-            if len(steps) >= max_steps:
-                learnings.append(f"Reached max steps ({max_steps})")
-                break
-            
-            exec_step = self._execute_step(action, context)
-            steps.append(exec_step)
-            execution_results.append(exec_step.actual_output)
-            
-            if exec_step.status == ExecutionStatus.FAILED:
-                learnings.append(f"Step {i} failed: {exec_step.issues}")
-                break
+        executed = []
+        plan_steps = self._iter_plan(
+            plan.get('actions', []), context, max_steps - len(steps), max_steps, learnings, stop
+        )
+        try:
+            for index, exec_step in plan_steps:
+                executed.append((index, exec_step))
+                yield exec_step
+        finally:
+            plan_steps.close()
+        exec_steps = [step for _, step in sorted(executed, key=lambda e: e[0])]
+        steps.extend(exec_steps)
+        execution_results = [s.actual_output for s in exec_steps]
         
         # Phase 4: VERIFY
-        verify_step = self._verify(execution_results, query)
+        with span('thinking.verify'):
+            verify_step = self._verify(execution_results, query)
         steps.append(verify_step)
+        yield verify_step
         
         # Phase 5: LEARN
-        learn_step = self._learn(steps)
+        with span('thinking.learn'):
+            learn_step = self._learn(
+                steps,
+                plan_key=plan_key if cached_plan is None else None,
+                plan=plan
+            )
         steps.append(learn_step)
         learnings.extend(learn_step.actual_output or [])
+        yield learn_step
         
         # Calculate final confidence
         confidence = self._calculate_confidence(steps)
@@ -171,13 +320,14 @@ class ProgrammaticThinking:
     def _analyze(self, query: str, context: Dict = None) -> ThinkingStep:
         """Analyze the problem."""
         
-        step_start = time.time()
-        self.step_counter += 1
+        step_start = time.perf_counter_ns()
+        step_id = self._next_step_id()
         
+        classification = get_query_classifier().classify(query)
         analysis = {
-            'query_type': self._classify_query(query),
-            'key_entities': self._extract_entities(query),
-            'required_skills': self._identify_required_skills(query),
+            'query_type': classification.query_type,
+            'key_entities': list(classification.entities),
+            'required_skills': list(classification.skills),
             'context_relevant': bool(context)
         }
         
@@ -189,7 +339,7 @@ class ProgrammaticThinking:
                 issues.extend(check.warnings)
         
         return ThinkingStep(
-            id=f"step_{self.step_counter}",
+            id=step_id,
             phase=ThinkingPhase.ANALYZE,
             description="Analyze problem structure",
             action="classify_and_extract",
@@ -197,7 +347,7 @@ class ProgrammaticThinking:
             actual_output=analysis,
             status=ExecutionStatus.SUCCESS,
             confidence=0.9,
-            duration_ms=int((time.time() - step_start) * 1000),
+            duration_ns=time.perf_counter_ns() - step_start,
             issues=issues
         )
     
@@ -209,8 +359,8 @@ class ProgrammaticThinking:
     ) -> tuple:
         """Create execution plan."""
         
-        step_start = time.time()
-        self.step_counter += 1
+        step_start = time.perf_counter_ns()
+        step_id = self._next_step_id()
         
         query_type = analysis.get('query_type', 'unknown')
         required_skills = analysis.get('required_skills', [])
@@ -221,32 +371,44 @@ class ProgrammaticThinking:
             'actions': []
         }
         
+        # Each action names the actions it depends on; independent actions
+        # run concurrently in the EXECUTE phase
         if query_type == 'lint_fix':
             plan['actions'] = [
-                {'action': 'detect_error', 'skill': 'lint-fixer'},
-                {'action': 'find_pattern', 'skill': 'lint-error-solutions'},
-                {'action': 'apply_fix', 'skill': 'lint-fixer'},
-                {'action': 'validate', 'skill': 'lint-fixer'}
+                {'id': 'detect_error', 'action': 'detect_error', 'skill': 'lint-fixer',
+                 'depends_on': []},
+                {'id': 'find_pattern', 'action': 'find_pattern', 'skill': 'lint-error-solutions',
+                 'depends_on': []},
+                {'id': 'apply_fix', 'action': 'apply_fix', 'skill': 'lint-fixer',
+                 'depends_on': ['detect_error', 'find_pattern']},
+                {'id': 'validate', 'action': 'validate', 'skill': 'lint-fixer',
+                 'depends_on': ['apply_fix']}
             ]
         elif query_type == 'generate':
             plan['actions'] = [
-                {'action': 'understand_requirements', 'skill': 'LLM'},
-                {'action': 'generate_content', 'skill': 'LLM'},
-                {'action': 'validate_output', 'skill': 'LLM'}
+                {'id': 'understand_requirements', 'action': 'understand_requirements',
+                 'skill': 'LLM', 'depends_on': []},
+                {'id': 'generate_content', 'action': 'generate_content', 'skill': 'LLM',
+                 'depends_on': ['understand_requirements']},
+                {'id': 'validate_output', 'action': 'validate_output', 'skill': 'LLM',
+                 'depends_on': ['generate_content']}
             ]
         elif query_type == 'document':
             plan['actions'] = [
-                {'action': 'parse_input', 'skill': 'docx'},
-                {'action': 'process_content', 'skill': 'docx'},
-                {'action': 'generate_output', 'skill': 'docx'}
+                {'id': 'parse_input', 'action': 'parse_input', 'skill': 'docx',
+                 'depends_on': []},
+                {'id': 'process_content', 'action': 'process_content', 'skill': 'docx',
+                 'depends_on': ['parse_input']},
+                {'id': 'generate_output', 'action': 'generate_output', 'skill': 'docx',
+                 'depends_on': ['process_content']}
             ]
         else:
             plan['actions'] = [
-                {'action': 'process', 'skill': 'LLM'}
+                {'id': 'process', 'action': 'process', 'skill': 'LLM', 'depends_on': []}
             ]
         
         step = ThinkingStep(
-            id=f"step_{self.step_counter}",
+            id=step_id,
             phase=ThinkingPhase.PLAN,
             description="Create execution plan",
             action="generate_plan",
@@ -254,16 +416,205 @@ class ProgrammaticThinking:
             actual_output=plan,
             status=ExecutionStatus.SUCCESS,
             confidence=0.85,
-            duration_ms=int((time.time() - step_start) * 1000)
+            duration_ns=time.perf_counter_ns() - step_start
         )
         
         return step, plan
     
+    def _plan_key(self, analysis: Dict, available_tools: List[str] = None) -> str:
+        """Cache key from the normalized analysis signature."""
+        signature = {
+            'query_type': analysis.get('query_type'),
+            'entities': sorted(analysis.get('key_entities', [])),
+            'skills': sorted(analysis.get('required_skills', [])),
+            'tools': sorted(available_tools or [])
+        }
+        return f"plan:{stable_hash(signature)}"
+    
+    def _get_cached_plan(self, plan_key: str) -> Optional[Dict]:
+        """Look up a learned plan in memory, then in the cache."""
+        with self._lock:
+            plan = self._plan_memo.get(plan_key)
+            if plan is not None:
+                self._plan_memo.move_to_end(plan_key)
+                return plan
+        
+        if self.cache:
+            plan = self.cache.get(plan_key)
+            if isinstance(plan, dict) and 'actions' in plan:
+                self._remember_plan(plan_key, plan)
+                return plan
+        return None
+    
+    def _remember_plan(self, plan_key: str, plan: Dict) -> None:
+        with self._lock:
+            self._plan_memo[plan_key] = plan
+            self._plan_memo.move_to_end(plan_key)
+            while len(self._plan_memo) > self.PLAN_MEMO_SIZE:
+                self._plan_memo.popitem(last=False)
+    
+    def _cached_plan_step(self, plan: Dict) -> ThinkingStep:
+        """PLAN step for a plan reused from a previous process."""
+        return ThinkingStep(
+            id=self._next_step_id(),
+            phase=ThinkingPhase.PLAN,
+            description="Reuse learned plan",
+            action="load_cached_plan",
+            expected_output="Step-by-step plan",
+            actual_output=plan,
+            status=ExecutionStatus.SUCCESS,
+            confidence=0.85
+        )
+    
+    def _execute_plan(
+        self,
+        actions: List[Dict],
+        context: Dict = None,
+        budget: int = 20,
+        max_steps: int = 20
+    ) -> Tuple[List[ThinkingStep], List[str]]:
+        """
+        Execute plan actions as a dependency graph.
+        
+        Returns:
+            Executed steps in plan order and learnings
+        """
+        learnings = []
+        executed = sorted(
+            self._iter_plan(actions, context, budget, max_steps, learnings),
+            key=lambda e: e[0]
+        )
+        return [step for _, step in executed], learnings
+    
+    def _iter_plan(
+        self,
+        actions: List[Dict],
+        context: Dict,
+        budget: int,
+        max_steps: int,
+        learnings: List[str],
+        stop: Optional[threading.Event] = None
+    ) -> Iterator[Tuple[int, ThinkingStep]]:
+        """
+        Yield ``(action_index, step)`` as plan actions complete.
+        
+        Ready actions run concurrently on the engine's pool of
+        ``max_concurrent`` threads; a lone ready action with nothing else
+        running executes inline, so sequential plans never hop threads.
+        A failed action skips everything that depends on it;
+        independent branches keep running. Actions without ``depends_on``
+        depend on the previous action, as in a sequential plan.
+        """
+        index_of = {a.get('id', f"action_{i}"): i for i, a in enumerate(actions)}
+        deps: Dict[int, Set[int]] = {}
+        for i, action in enumerate(actions):
+            if 'depends_on' in action:
+                # Unknown dependencies map to -1 and can never be satisfied
+                deps[i] = {index_of.get(d, -1) for d in action['depends_on']}
+            else:
+                deps[i] = {i - 1} if i else set()
+        
+        done: Set[int] = set()
+        blocked: Set[int] = {-1}  # failed or skipped
+        waiting = set(range(len(actions)))
+        running = {}
+        started = 0
+        
+        try:
+            while stop is None or not stop.is_set():
+                # Skip everything downstream of a failure
+                changed = True
+                while changed:
+                    changed = False
+                    for i in sorted(waiting):
+                        if deps[i] & blocked:
+                            waiting.discard(i)
+                            blocked.add(i)
+                            learnings.append(f"Step {i} skipped: dependency failed")
+                            changed = True
+                
+                ready = []
+                for i in sorted(waiting):
+                    if not deps[i] <= done:
+                        continue
+                    if started >= budget:
+                        learnings.append(f"Reached max steps ({max_steps})")
+                        waiting.clear()
+                        break
+                    waiting.discard(i)
+                    ready.append(i)
+                    started += 1
+                
+                if len(ready) == 1 and not running:
+                    completed = [(ready[0], self._execute_traced_step(actions[ready[0]], context, stop))]
+                else:
+                    for i in ready:
+                        # Submitted in a copy of our context so step spans nest
+                        running[self._executor().submit(
+                            copy_context().run, self._execute_traced_step, actions[i], context, stop
+                        )] = i
+                    if not running:
+                        break
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    completed = [(running.pop(future), future.result()) for future in finished]
+                
+                for i, step in completed:
+                    if step is None:
+                        continue  # skipped after stop
+                    if step.status == ExecutionStatus.FAILED:
+                        blocked.add(i)
+                        learnings.append(f"Step {i} failed: {step.issues}")
+                    else:
+                        done.add(i)
+                    yield i, step
+        finally:
+            # Closed mid-plan: drop queued actions (running ones finish)
+            for future in running:
+                future.cancel()
+        
+        if waiting:
+            learnings.append(f"Unresolvable dependencies for steps: {sorted(waiting)}")
+    
+    def _executor(self) -> ThreadPoolExecutor:
+        """The engine's step pool, created on first concurrent plan."""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=max(1, self.max_concurrent),
+                        thread_name_prefix='thinking-step'
+                    )
+        return self._pool
+    
+    def close(self) -> None:
+        """Shut down the step pool (a later plan creates a new one)."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+    
+    def _next_step_id(self) -> str:
+        """Allocate a step id (thread-safe)."""
+        with self._lock:
+            self.step_counter += 1
+            return f"step_{self.step_counter}"
+    
+    def _execute_traced_step(
+        self,
+        action: Dict,
+        context: Dict = None,
+        stop: Optional[threading.Event] = None
+    ) -> Optional[ThinkingStep]:
+        if stop is not None and stop.is_set():
+            return None
+        with span('thinking.step', action=action.get('action')):
+            return self._execute_step(action, context)
+    
     def _execute_step(self, action: Dict, context: Dict = None) -> ThinkingStep:
         """Execute a single action."""
         
-        step_start = time.time()
-        self.step_counter += 1
+        step_start = time.perf_counter_ns()
+        step_id = self._next_step_id()
         
         action_type = action.get('action', 'unknown')
         skill = action.get('skill', 'LLM')
@@ -279,7 +630,7 @@ class ProgrammaticThinking:
         confidence = 0.85
         
         return ThinkingStep(
-            id=f"step_{self.step_counter}",
+            id=step_id,
             phase=ThinkingPhase.EXECUTE,
             description=f"Execute: {action_type}",
             action=action_type,
@@ -287,14 +638,14 @@ class ProgrammaticThinking:
             actual_output=result,
             status=ExecutionStatus.SUCCESS,
             confidence=confidence,
-            duration_ms=int((time.time() - step_start) * 1000)
+            duration_ns=time.perf_counter_ns() - step_start
         )
     
     def _verify(self, results: List[Any], original_query: str) -> ThinkingStep:
         """Verify execution results."""
         
-        step_start = time.time()
-        self.step_counter += 1
+        step_start = time.perf_counter_ns()
+        step_id = self._next_step_id()
         
         # Count successes
         successes = sum(1 for r in results if r and r.get('status') == 'completed')
@@ -310,7 +661,7 @@ class ProgrammaticThinking:
         status = ExecutionStatus.SUCCESS if confidence > 0.5 else ExecutionStatus.FAILED
         
         return ThinkingStep(
-            id=f"step_{self.step_counter}",
+            id=step_id,
             phase=ThinkingPhase.VERIFY,
             description="Verify results",
             action="check_results",
@@ -318,14 +669,19 @@ class ProgrammaticThinking:
             actual_output=verification,
             status=status,
             confidence=confidence,
-            duration_ms=int((time.time() - step_start) * 1000)
+            duration_ns=time.perf_counter_ns() - step_start
         )
     
-    def _learn(self, steps: List[ThinkingStep]) -> ThinkingStep:
-        """Extract learnings from the process."""
+    def _learn(
+        self,
+        steps: List[ThinkingStep],
+        plan_key: Optional[str] = None,
+        plan: Optional[Dict] = None
+    ) -> ThinkingStep:
+        """Extract learnings from the process and record successful plans."""
         
-        step_start = time.time()
-        self.step_counter += 1
+        step_start = time.perf_counter_ns()
+        step_id = self._next_step_id()
         
         learnings = []
         
@@ -340,8 +696,15 @@ class ProgrammaticThinking:
         if successful_steps:
             learnings.append(f"Successful pattern: {len(successful_steps)} steps completed")
         
+        # Record the plan when every step succeeded
+        if plan_key and plan and len(successful_steps) == len(steps):
+            self._remember_plan(plan_key, plan)
+            if self.cache:
+                self.cache.set(plan_key, plan, cache_type='pattern')
+            learnings.append("Plan recorded for reuse")
+        
         return ThinkingStep(
-            id=f"step_{self.step_counter}",
+            id=step_id,
             phase=ThinkingPhase.LEARN,
             description="Extract learnings",
             action="record_patterns",
@@ -349,58 +712,20 @@ class ProgrammaticThinking:
             actual_output=learnings,
             status=ExecutionStatus.SUCCESS,
             confidence=0.9,
-            duration_ms=int((time.time() - step_start) * 1000)
+            duration_ns=time.perf_counter_ns() - step_start
         )
     
     def _classify_query(self, query: str) -> str:
         """Classify the type of query."""
-        
-        query_lower = query.lower()
-        
-        if any(w in query_lower for w in ['lint', 'error', 'fix', 'bug']):
-            return 'lint_fix'
-        if any(w in query_lower for w in ['generate', 'create', 'write']):
-            return 'generate'
-        if any(w in query_lower for w in ['document', 'pdf', 'word', 'excel']):
-            return 'document'
-        if any(w in query_lower for w in ['search', 'find', 'query']):
-            return 'search'
-        
-        return 'general'
+        return get_query_classifier().classify(query).query_type
     
     def _extract_entities(self, query: str) -> List[str]:
         """Extract key entities from query."""
-        
-        # Simple entity extraction
-        entities = []
-        
-        # File names
-        import re
-        files = re.findall(r'[\w\-]+\.[tj]sx?', query)
-        entities.extend(files)
-        
-        # Error codes
-        errors = re.findall(r'react-hooks/[\w-]+', query)
-        entities.extend(errors)
-        
-        return entities
+        return list(get_query_classifier().classify(query).entities)
     
     def _identify_required_skills(self, query: str) -> List[str]:
         """Identify which skills are needed."""
-        
-        query_lower = query.lower()
-        skills = []
-        
-        if 'lint' in query_lower:
-            skills.append('lint-fixer')
-        if 'react' in query_lower:
-            skills.append('react-patterns')
-        if 'document' in query_lower:
-            skills.append('docx')
-        if 'generate' in query_lower:
-            skills.append('LLM')
-        
-        return skills
+        return list(get_query_classifier().classify(query).skills)
     
     def _calculate_confidence(self, steps: List[ThinkingStep]) -> float:
         """Calculate overall confidence."""
@@ -429,7 +754,7 @@ class ProgrammaticThinking:
         steps: List[ThinkingStep],
         answer: Any,
         confidence: float,
-        start_time: float,
+        start_time: int,
         success: bool,
         learnings: List[str]
     ) -> ThinkingResult:
@@ -441,26 +766,30 @@ class ProgrammaticThinking:
             steps=steps,
             final_answer=answer,
             confidence=confidence,
-            total_duration_ms=int((time.time() - start_time) * 1000),
+            total_duration_ms=(time.perf_counter_ns() - start_time) / 1e6,
             success=success,
             learnings=learnings
         )
         
         self.process_history.append(result)
+        if success:
+            self.process_history.incr('successful')
+        self.process_history.observe('confidence', confidence)
+        self.process_history.observe('duration_ms', result.total_duration_ms)
         
         return result
     
     def get_stats(self) -> Dict:
         """Get thinking engine statistics."""
         
-        total = len(self.process_history)
-        successful = sum(1 for p in self.process_history if p.success)
+        history = self.process_history
         
         return {
-            'total_processes': total,
-            'successful': successful,
-            'success_rate': successful / max(1, total),
-            'avg_confidence': sum(p.confidence for p in self.process_history) / max(1, total)
+            'total_processes': history.total,
+            'successful': history.count('successful'),
+            'success_rate': history.rate('successful'),
+            'avg_confidence': history.mean('confidence'),
+            'ewma_duration_ms': history.ewma('duration_ms')
         }
 
 
@@ -10,18 +10,32 @@ Features:
 3. Execution Tracking
 4. Error Recovery
 5. Result Caching
+6. Concurrent Execution (rate limits, deadlines, in-flight dedup)
 """
 
-import json
 import time
-import hashlib
-from typing import Dict, List, Any, Optional, Callable
-from dataclasses import dataclass, field
+import threading
+from contextvars import copy_context
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator, Tuple
+from dataclasses import dataclass, field, replace
 from enum import Enum
 from datetime import datetime
+from functools import partial
 import logging
 import re
 
+try:
+    from .hashing import stable_hash
+    from .history import BoundedHistory
+    from .ratelimit import TokenBucket
+    from .tracing import span
+except ImportError:  # Run as a script
+    from hashing import stable_hash
+    from history import BoundedHistory
+    from ratelimit import TokenBucket
+    from tracing import span
+
 logger = logging.getLogger('tools')
 
 
@@ -45,6 +59,16 @@ class ToolDefinition:
     required_params: List[str]
     returns: str
     examples: List[Dict] = field(default_factory=list)
+    # Result caching policy; side-effecting tools are never cached
+    cacheable: bool = True
+    cache_ttl: int = 3600
+    cache_negative: bool = False    # also cache falsy results
+    negative_ttl: int = 300
+    side_effects: bool = False
+    
+    @property
+    def caches_results(self) -> bool:
+        return self.cacheable and not self.side_effects
 
 
 @dataclass
@@ -69,6 +93,113 @@ class ValidationResult:
     sanitized_params: Dict
 
 
+SchemaValidator = Callable[[Dict], ValidationResult]
+
+# Distinguishes a cache miss from a cached falsy result
+_MISS = object()
+
+# Schema type names to Python types ('any' is never checked)
+TYPE_MAP: Dict[str, Any] = {
+    'string': str,
+    'integer': int,
+    'number': (int, float),
+    'boolean': bool,
+    'object': dict,
+    'array': list
+}
+
+# (group, pattern, warning) - reported in this order. The literals cannot
+# overlap, so a single non-overlapping scan sees every rule that matches.
+SECURITY_RULES = (
+    ('script_tag', r'<script', 'Potential XSS'),
+    ('js_scheme', r'javascript:', 'Potential XSS'),
+    ('drop_table', r'DROP TABLE', 'Potential SQL injection'),
+    ('sql_comment', r';--', 'Potential SQL injection'),
+    ('path_traversal', r'\.\./', 'Path traversal'),
+)
+
+SECURITY_PATTERN = re.compile(
+    '|'.join(f'(?P<{group}>{pattern})' for group, pattern, _ in SECURITY_RULES),
+    re.IGNORECASE
+)
+
+
+def security_warnings(param: str, value: str) -> List[str]:
+    """Security warnings for a string value, one scan for all rules."""
+    
+    matched = {m.lastgroup for m in SECURITY_PATTERN.finditer(value)}
+    if not matched:
+        return []
+    return [
+        f"{warning} detected in {param}"
+        for group, _, warning in SECURITY_RULES if group in matched
+    ]
+
+
+def _unknown_tool(tool_name: str, parameters: Dict) -> ValidationResult:
+    return ValidationResult(
+        is_valid=False,
+        errors=[f"Unknown tool: {tool_name}"],
+        warnings=[],
+        sanitized_params={}
+    )
+
+
+def compile_schema(definition: ToolDefinition) -> SchemaValidator:
+    """
+    Compile a tool definition into a validator closure.
+    
+    Parameter specs and types are resolved once here, so validating a
+    call is a dict walk with isinstance checks.
+    """
+    
+    required = tuple(definition.required_params)
+    # param -> (schema type name, Python type or None if unchecked)
+    param_types = {
+        param: (spec.get('type'), TYPE_MAP.get(spec.get('type')))
+        for param, spec in definition.parameters.items()
+    }
+    
+    def validate(parameters: Dict) -> ValidationResult:
+        errors = []
+        warnings = []
+        sanitized = {}
+        
+        # Check required parameters
+        for param in required:
+            if param not in parameters:
+                errors.append(f"Missing required parameter: {param}")
+            elif parameters[param] is None:
+                errors.append(f"Parameter {param} cannot be None")
+        
+        for param, value in parameters.items():
+            checked = param_types.get(param)
+            if checked is None:
+                warnings.append(f"Unknown parameter: {param}")
+                continue
+            
+            expected, py_type = checked
+            if py_type is not None and not isinstance(value, py_type):
+                errors.append(
+                    f"Parameter {param} has wrong type. "
+                    f"Expected {expected}, got {type(value).__name__}"
+                )
+            
+            if isinstance(value, str):
+                warnings.extend(security_warnings(param, value))
+            
+            sanitized[param] = value
+        
+        return ValidationResult(
+            is_valid=not errors,
+            errors=errors,
+            warnings=warnings,
+            sanitized_params=sanitized
+        )
+    
+    return validate
+
+
 class ToolValidator:
     """
     Validates tool calls and parameters.
@@ -90,7 +221,8 @@ class ToolValidator:
             },
             required_params=['pattern_id'],
             returns='Pattern object with code and confidence',
-            examples=[{'pattern_id': 'lazy_init'}]
+            examples=[{'pattern_id': 'lazy_init'}],
+            cache_negative=True
         ),
         'execute_skill': ToolDefinition(
             name='execute_skill',
@@ -100,7 +232,8 @@ class ToolValidator:
                 'context': {'type': 'object', 'description': 'Execution context'}
             },
             required_params=['skill_id'],
-            returns='Execution result'
+            returns='Execution result',
+            side_effects=True
         ),
         'cache_get': ToolDefinition(
             name='cache_get',
@@ -109,7 +242,8 @@ class ToolValidator:
                 'key': {'type': 'string', 'description': 'Cache key'}
             },
             required_params=['key'],
-            returns='Cached value or None'
+            returns='Cached value or None',
+            cacheable=False  # already a cache read
         ),
         'cache_set': ToolDefinition(
             name='cache_set',
@@ -120,7 +254,8 @@ class ToolValidator:
                 'ttl': {'type': 'integer', 'description': 'Time to live in seconds'}
             },
             required_params=['key', 'value'],
-            returns='Boolean success'
+            returns='Boolean success',
+            side_effects=True
         ),
         'peer_request': ToolDefinition(
             name='peer_request',
@@ -132,18 +267,23 @@ class ToolValidator:
                 'payload': {'type': 'object'}
             },
             required_params=['from_skill', 'to_skill', 'request_type'],
-            returns='Response from peer'
+            returns='Response from peer',
+            side_effects=True
         )
     }
     
-    def __init__(self, cache=None):
+    def __init__(self, cache=None, history_size: int = 1000, history_sink=None):
         self.cache = cache
-        self.call_history: List[ToolCall] = []
+        self.call_history = BoundedHistory(history_size, sink=history_sink)
         self.call_counter = 0
+        self._validators: Dict[str, Tuple[ToolDefinition, SchemaValidator]] = {
+            name: (tool, compile_schema(tool)) for name, tool in self.TOOLS.items()
+        }
     
     def register_tool(self, definition: ToolDefinition):
-        """Register a new tool."""
+        """Register a new tool and compile its schema."""
         self.TOOLS[definition.name] = definition
+        self._validators[definition.name] = (definition, compile_schema(definition))
     
     def validate(self, tool_name: str, parameters: Dict) -> ValidationResult:
         """
@@ -157,99 +297,52 @@ class ToolValidator:
             ValidationResult with errors and sanitized params
         """
         
-        errors = []
-        warnings = []
-        sanitized = {}
-        
-        # Check tool exists
-        if tool_name not in self.TOOLS:
-            errors.append(f"Unknown tool: {tool_name}")
-            return ValidationResult(
-                is_valid=False,
-                errors=errors,
-                warnings=warnings,
-                sanitized_params={}
-            )
-        
-        tool = self.TOOLS[tool_name]
-        
-        # Check required parameters
-        for param in tool.required_params:
-            if param not in parameters:
-                errors.append(f"Missing required parameter: {param}")
-            elif parameters[param] is None:
-                errors.append(f"Parameter {param} cannot be None")
+        return self._validator_for(tool_name)(parameters)
+    
+    def validate_many(self, calls: Iterable[Tuple[str, Dict]]) -> List[ValidationResult]:
+        """
+        Validate a batch of ``(tool_name, parameters)`` calls.
         
-        # Validate parameter types
-        for param, value in parameters.items():
-            if param in tool.parameters:
-                expected_type = tool.parameters[param].get('type')
-                
-                # Type checking
-                if expected_type and expected_type != 'any':
-                    if not self._check_type(value, expected_type):
-                        errors.append(
-                            f"Parameter {param} has wrong type. "
-                            f"Expected {expected_type}, got {type(value).__name__}"
-                        )
-                
-                # Security checks
-                security_issues = self._security_check(param, value)
-                if security_issues:
-                    warnings.extend(security_issues)
-                
-                sanitized[param] = value
-            else:
-                warnings.append(f"Unknown parameter: {param}")
+        Each tool's compiled validator is looked up once per batch.
+        """
         
-        return ValidationResult(
-            is_valid=len(errors) == 0,
-            errors=errors,
-            warnings=warnings,
-            sanitized_params=sanitized
-        )
+        validators: Dict[str, SchemaValidator] = {}
+        results = []
+        for tool_name, parameters in calls:
+            validator = validators.get(tool_name)
+            if validator is None:
+                validator = validators[tool_name] = self._validator_for(tool_name)
+            results.append(validator(parameters))
+        return results
+    
+    def _validator_for(self, tool_name: str) -> 'SchemaValidator':
+        """Compiled validator for a tool, recompiling if its definition changed."""
+        
+        tool = self.TOOLS.get(tool_name)
+        if tool is None:
+            return partial(_unknown_tool, tool_name)
+        
+        compiled = self._validators.get(tool_name)
+        if compiled is None or compiled[0] is not tool:
+            # Registered through another instance (TOOLS is shared)
+            compiled = self._validators[tool_name] = (tool, compile_schema(tool))
+        return compiled[1]
     
     def _check_type(self, value: Any, expected: str) -> bool:
         """Check if value matches expected type."""
         
-        type_map = {
-            'string': str,
-            'integer': int,
-            'number': (int, float),
-            'boolean': bool,
-            'object': dict,
-            'array': list
-        }
-        
-        if expected == 'any':
-            return True
-        
-        expected_type = type_map.get(expected)
+        expected_type = TYPE_MAP.get(expected)
         if expected_type is None:
-            return True  # Unknown type, assume valid
+            return True  # 'any' or unknown type, assume valid
         
         return isinstance(value, expected_type)
     
     def _security_check(self, param: str, value: Any) -> List[str]:
         """Check for security issues."""
         
-        issues = []
-        
         if isinstance(value, str):
-            # Check for injection patterns
-            patterns = [
-                (r'<script', 'Potential XSS'),
-                (r'javascript:', 'Potential XSS'),
-                (r'DROP TABLE', 'Potential SQL injection'),
-                (r';--', 'Potential SQL injection'),
-                (r'\.\./', 'Path traversal'),
-            ]
-            
-            for pattern, warning in patterns:
-                if re.search(pattern, str(value), re.IGNORECASE):
-                    issues.append(f"{warning} detected in {param}")
-        
-        return issues
+            return security_warnings(param, value)
+        return []
     
     def create_call(
         self,
@@ -278,7 +371,8 @@ class ToolValidator:
     def execute(
         self,
         call: ToolCall,
-        executor: Optional[Callable] = None
+        executor: Optional[Callable] = None,
+        record: bool = True
     ) -> ToolCall:
         """
         Execute a validated tool call.
@@ -286,6 +380,9 @@ class ToolValidator:
         Args:
             call: The tool call to execute
             executor: Optional custom executor function
+            record: Count the outcome in ``call_history``; callers that
+                settle calls themselves (ToolExecutionEngine) pass False
+                and call ``record`` once per call
             
         Returns:
             Updated ToolCall with results
@@ -294,43 +391,66 @@ class ToolValidator:
         if call.status == ToolStatus.INVALID:
             return call
         
+        with span('tool.execute', tool=call.tool_name) as trace:
+            self._execute(call, executor)
+            if record:
+                self.record(call)
+            trace.set(status=call.status.value)
+            return call
+    
+    def _execute(self, call: ToolCall, executor: Optional[Callable]) -> ToolCall:
         start_time = time.time()
         call.status = ToolStatus.EXECUTING
         
+        tool = self.TOOLS.get(call.tool_name)
+        cache_key = None
+        if self.cache and tool is not None and tool.caches_results:
+            cache_key = self._cache_key(call.tool_name, call.parameters)
+        
         try:
-            # Check cache first
-            if self.cache:
-                cache_key = self._cache_key(call.tool_name, call.parameters)
-                cached = self.cache.get(cache_key)
-                if cached is not None:
+            # Check cache first (a stored falsy result is a negative hit)
+            if cache_key:
+                with span('cache.read'):
+                    cached = self.cache.get(cache_key, _MISS)
+                if cached is not _MISS:
                     call.result = cached
                     call.status = ToolStatus.CACHED
                     call.cache_hit = True
-                    call.duration_ms = int((time.time() - start_time) * 1000)
-                    return call
+                    return self._finish(call, start_time)
             
             # Execute
-            if executor:
-                result = executor(call.tool_name, call.parameters)
-            else:
-                result = self._default_executor(call.tool_name, call.parameters)
+            with span('tool.call'):
+                if executor:
+                    result = executor(call.tool_name, call.parameters)
+                else:
+                    result = self._default_executor(call.tool_name, call.parameters)
             
             call.result = result
             call.status = ToolStatus.SUCCESS
             
-            # Cache result
-            if self.cache and result:
-                cache_key = self._cache_key(call.tool_name, call.parameters)
-                self.cache.set(cache_key, result, ttl=3600)
+            # Cache result per the tool's policy
+            if cache_key and (result or tool.cache_negative):
+                with span('cache.write'):
+                    ttl = tool.cache_ttl if result else tool.negative_ttl
+                    self.cache.set(cache_key, result, ttl=ttl)
         
         except Exception as e:
             call.status = ToolStatus.FAILED
             call.validation_errors.append(str(e))
             call.result = None
         
+        return self._finish(call, start_time)
+    
+    def _finish(self, call: ToolCall, start_time: float) -> ToolCall:
+        """Record the duration of an executed call."""
         call.duration_ms = int((time.time() - start_time) * 1000)
         return call
     
+    def record(self, call: ToolCall) -> None:
+        """Count a settled call's outcome and duration in the history."""
+        self.call_history.incr(call.status.value)
+        self.call_history.observe('duration_ms', call.duration_ms)
+    
     def _default_executor(self, tool_name: str, parameters: Dict) -> Any:
         """Default executor for built-in tools."""
         
@@ -356,17 +476,16 @@ class ToolValidator:
     
     def _cache_key(self, tool_name: str, parameters: Dict) -> str:
         """Generate cache key for tool call."""
-        
-        key_data = f"{tool_name}:{json.dumps(parameters, sort_keys=True)}"
-        return hashlib.sha256(key_data.encode()).hexdigest()[:16]
+        return stable_hash(tool_name, parameters)
     
     def get_stats(self) -> Dict:
         """Get tool calling statistics."""
         
-        total = len(self.call_history)
-        successful = sum(1 for c in self.call_history if c.status == ToolStatus.SUCCESS)
-        cached = sum(1 for c in self.call_history if c.status == ToolStatus.CACHED)
-        failed = sum(1 for c in self.call_history if c.status == ToolStatus.FAILED)
+        history = self.call_history
+        total = history.total
+        successful = history.count(ToolStatus.SUCCESS.value)
+        cached = history.count(ToolStatus.CACHED.value)
+        failed = history.count(ToolStatus.FAILED.value)
         
         return {
             'total_calls': total,
@@ -375,10 +494,246 @@ class ToolValidator:
             'failed': failed,
             'success_rate': successful / max(1, total - cached),
             'cache_hit_rate': cached / max(1, total),
+            'ewma_duration_ms': history.ewma('duration_ms'),
             'tools_available': len(self.TOOLS)
         }
 
 
+@dataclass
+class ToolLimits:
+    """Execution limits for one tool in a ToolExecutionEngine."""
+    max_concurrent: Optional[int] = None   # None = bounded only by the pool
+    rate: Optional[float] = None           # calls per second (token bucket)
+    burst: Optional[float] = None          # bucket capacity (default: rate)
+    timeout: Optional[float] = None        # seconds per call
+
+
+class ToolExecutionEngine:
+    """
+    Runs batches of tool calls concurrently on a bounded thread pool.
+    
+    Calls are dispatched as per-tool concurrency limits and token buckets
+    admit them, and yielded as they complete. Identical calls (same
+    ``_cache_key``) that are already in flight share one execution, except
+    for side-effecting tools. A tool's ``timeout`` runs from the moment
+    its call is submitted to the pool, so time spent queued behind a
+    concurrency or rate limit does not count against it; the batch
+    ``timeout`` of ``run`` is a separate deadline. A call still pending or
+    running at its deadline is yielded as FAILED; a running worker cannot
+    be interrupted, so its late result is dropped. Every yielded call is
+    counted once in the validator's history, including calls that shared
+    another's execution.
+    
+    Example:
+        engine = ToolExecutionEngine(validator, max_workers=8)
+        engine.set_limits('get_pattern', ToolLimits(max_concurrent=2, rate=20))
+        for call in engine.run(calls, timeout=5):
+            ...
+    """
+    
+    def __init__(
+        self,
+        validator: ToolValidator,
+        max_workers: int = 8,
+        executor: Optional[Callable] = None,
+        limits: Optional[Dict[str, ToolLimits]] = None
+    ):
+        self.validator = validator
+        self.executor = executor
+        self.limits: Dict[str, ToolLimits] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._active: Dict[str, int] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        # Notified whenever a call finishes and frees its slot
+        self._released = threading.Condition(self._lock)
+        self._release_count = 0
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        self.stats = {'executed': 0, 'deduplicated': 0, 'timed_out': 0}
+        
+        for tool_name, tool_limits in (limits or {}).items():
+            self.set_limits(tool_name, tool_limits)
+    
+    def set_limits(self, tool_name: str, limits: ToolLimits) -> None:
+        """Set concurrency, rate and timeout limits for a tool."""
+        with self._lock:
+            self.limits[tool_name] = limits
+            if limits.rate:
+                self._buckets[tool_name] = TokenBucket(limits.rate, limits.burst)
+            else:
+                self._buckets.pop(tool_name, None)
+    
+    def run(
+        self,
+        calls: Iterable[ToolCall],
+        timeout: Optional[float] = None
+    ) -> Iterator[ToolCall]:
+        """
+        Execute calls, yielding each one as it completes.
+        
+        Args:
+            calls: Calls from ``ToolValidator.create_call``
+            timeout: Deadline in seconds for the whole batch
+        """
+        
+        batch_deadline = None if timeout is None else time.monotonic() + timeout
+        pending: List[ToolCall] = []
+        
+        for call in calls:
+            if call.status == ToolStatus.INVALID:
+                yield call
+                continue
+            pending.append(call)
+        
+        # future -> [(call, deadline, started)]
+        running: Dict[Future, List[Tuple[ToolCall, Optional[float], float]]] = {}
+        
+        while pending or running:
+            with self._lock:
+                seen = self._release_count
+            now = time.monotonic()
+            next_wake = None
+            waiting = []
+            
+            for call in pending:
+                if batch_deadline is not None and now >= batch_deadline:
+                    yield self._timed_out(call, now, now)
+                    continue
+                future, retry_in = self._dispatch(call)
+                if future is None:
+                    waiting.append(call)
+                    if retry_in is not None:
+                        next_wake = retry_in if next_wake is None else min(next_wake, retry_in)
+                else:
+                    running.setdefault(future, []).append(
+                        (call, self._call_deadline(call, batch_deadline, now), now)
+                    )
+            pending = waiting
+            
+            if not running and not pending:
+                break
+            
+            deadlines = [d for entries in running.values() for _, d, _ in entries if d is not None]
+            if pending and batch_deadline is not None:
+                deadlines.append(batch_deadline)
+            wake = None
+            if deadlines:
+                wake = max(0.0, min(deadlines) - time.monotonic())
+            if next_wake is not None:
+                wake = next_wake if wake is None else min(wake, next_wake)
+            
+            # Sleep until a call finishes (ours or another batch's, which
+            # may free a slot we wait on), a deadline, or a bucket refill
+            with self._released:
+                if self._release_count == seen:
+                    self._released.wait(wake)
+            
+            for future in [f for f in running if f.done()]:
+                work = future.result()
+                for call, _, _ in running.pop(future):
+                    yield self._apply(call, work)
+            
+            now = time.monotonic()
+            for future in list(running):
+                entries = running[future]
+                live = []
+                for call, deadline, started in entries:
+                    if deadline is not None and now >= deadline:
+                        yield self._timed_out(call, started, now)
+                    else:
+                        live.append((call, deadline, started))
+                if live:
+                    running[future] = live
+                else:
+                    del running[future]
+    
+    def _call_deadline(
+        self,
+        call: ToolCall,
+        batch_deadline: Optional[float],
+        submitted: float
+    ) -> Optional[float]:
+        """Earlier of the batch deadline and the tool timeout from submission."""
+        limits = self.limits.get(call.tool_name)
+        if limits is None or limits.timeout is None:
+            return batch_deadline
+        return min(batch_deadline or float('inf'), submitted + limits.timeout)
+    
+    def _dispatch(self, call: ToolCall) -> Tuple[Optional[Future], Optional[float]]:
+        """
+        Start (or join) execution of a call.
+        
+        Returns (future, None) when dispatched, or (None, retry_in) when a
+        limit holds it back; retry_in is None when waiting on a slot.
+        """
+        
+        key = self.validator._cache_key(call.tool_name, call.parameters)
+        tool_name = call.tool_name
+        
+        tool = self.validator.TOOLS.get(tool_name)
+        if tool is not None and tool.side_effects:
+            key = None  # every side-effecting call runs
+        
+        with self._lock:
+            future = self._inflight.get(key) if key else None
+            if future is not None:
+                self.stats['deduplicated'] += 1
+                return future, None
+            
+            limits = self.limits.get(tool_name)
+            if limits and limits.max_concurrent is not None:
+                if self._active.get(tool_name, 0) >= limits.max_concurrent:
+                    return None, None
+            
+            bucket = self._buckets.get(tool_name)
+            if bucket and not bucket.try_acquire():
+                return None, bucket.wait_time()
+            
+            self._active[tool_name] = self._active.get(tool_name, 0) + 1
+            self.stats['executed'] += 1
+            # Workers run on a private copy, so a timed-out call is never
+            # mutated after it has been yielded
+            work = replace(call, validation_errors=list(call.validation_errors))
+            future = self._pool.submit(
+                copy_context().run, self.validator.execute, work, self.executor, False
+            )
+            if key:
+                self._inflight[key] = future
+        
+        future.add_done_callback(lambda _: self._release(key, tool_name))
+        return future, None
+    
+    def _release(self, key: Optional[str], tool_name: str) -> None:
+        with self._lock:
+            if key:
+                self._inflight.pop(key, None)
+            self._active[tool_name] -= 1
+            self._release_count += 1
+            self._released.notify_all()
+    
+    def _apply(self, call: ToolCall, work: ToolCall) -> ToolCall:
+        call.status = work.status
+        call.result = work.result
+        call.duration_ms = work.duration_ms
+        call.cache_hit = work.cache_hit
+        call.validation_errors = list(work.validation_errors)
+        self.validator.record(call)
+        return call
+    
+    def _timed_out(self, call: ToolCall, started: float, now: float) -> ToolCall:
+        with self._lock:
+            self.stats['timed_out'] += 1
+        call.status = ToolStatus.FAILED
+        call.validation_errors.append("Timed out")
+        call.duration_ms = int((now - started) * 1000)
+        self.validator.record(call)
+        return call
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool."""
+        self._pool.shutdown(wait=wait)
+
+
 # Singleton
 _tool_validator: Optional[ToolValidator] = None
 
@@ -0,0 +1,255 @@
+"""
+Request Tracing
+===============
+
+Lightweight spans for timing breakdowns across the pipeline.
+
+The current span lives in a ContextVar, so nesting follows asyncio tasks
+automatically; work handed to thread pools is submitted through
+``contextvars.copy_context().run`` to keep its parent. When tracing is
+disabled ``span()`` returns a shared no-op context manager.
+
+Enable with ``SKILLS_TRACE_PATH`` (``*.json`` writes a Chrome trace for
+chrome://tracing or Perfetto, anything else writes JSONL) or in code:
+
+    get_tracer().enable(ChromeTraceExporter("trace.json"))
+    with span('my.stage', key='value'):
+        ...
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from itertools import count
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Union
+import logging
+
+try:
+    from .config import get_config
+    from .history import JsonlSink
+except ImportError:  # Run as a script
+    from config import get_config
+    from history import JsonlSink
+
+logger = logging.getLogger('skills.tracing')
+
+_current_span: ContextVar[Optional['Span']] = ContextVar('skills_current_span', default=None)
+
+
+@dataclass
+class Span:
+    """A timed, named unit of work (times are perf_counter_ns)."""
+    name: str
+    trace_id: str
+    span_id: int
+    parent_id: Optional[int]
+    start_ns: int
+    end_ns: int = 0
+    wall_time: float = 0.0
+    thread_id: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+
+class _NoopSpan:
+    """Returned by span() when tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ('tracer', 'span', 'token')
+
+    def __init__(self, tracer: 'Tracer', span: Span):
+        self.tracer = tracer
+        self.span = span
+        self.token = None
+
+    def __enter__(self) -> Span:
+        self.token = _current_span.set(self.span)
+        self.span.start_ns = time.perf_counter_ns()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.span.end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.span.attributes['error'] = f"{exc_type.__name__}: {exc}"
+        try:
+            _current_span.reset(self.token)
+        except ValueError:
+            # Exited in a different context (e.g. an async generator
+            # resumed by another task); the span itself is still valid
+            _current_span.set(None)
+        self.tracer._finish(self.span)
+        return False
+
+
+class ChromeTraceExporter:
+    """
+    Writes spans as Chrome trace "complete" events.
+
+    Events are appended as they finish, so the file is readable before
+    ``close()`` (the closing bracket is optional in the array format).
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        with open(self.path, 'w') as f:
+            f.write('[\n')
+        self._first = True
+
+    def __call__(self, span: Span) -> None:
+        event = {
+            'name': span.name,
+            'cat': span.name.split('.', 1)[0],
+            'ph': 'X',
+            'ts': span.start_ns / 1000,
+            'dur': (span.end_ns - span.start_ns) / 1000,
+            'pid': self._pid,
+            'tid': span.thread_id,
+            'args': {
+                'trace_id': span.trace_id,
+                'span_id': span.span_id,
+                'parent_id': span.parent_id,
+                **span.attributes
+            }
+        }
+        line = json.dumps(event, default=str)
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line if self._first else ',\n' + line)
+            self._first = False
+
+    def close(self) -> None:
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write('\n]\n')
+
+
+class Tracer:
+    """
+    Creates spans and hands finished ones to an exporter.
+
+    The most recent ``max_spans`` finished spans are also kept in memory.
+
+    Example:
+        tracer = Tracer()
+        tracer.enable(JsonlSink("trace.jsonl"))
+        with tracer.span('orchestrator.execute', intent="Fix lint") as s:
+            s.set(skill='lint-fixer')
+    """
+
+    def __init__(
+        self,
+        exporter: Optional[Callable[[Span], None]] = None,
+        max_spans: int = 10000,
+        enabled: bool = False
+    ):
+        self.exporter = exporter
+        self.enabled = enabled or exporter is not None
+        self.spans: Deque[Span] = deque(maxlen=max_spans)
+        self._ids = count(1)
+
+    def enable(self, exporter: Optional[Callable[[Span], None]] = None) -> None:
+        """Start tracing, optionally replacing the exporter."""
+        if exporter is not None:
+            self.exporter = exporter
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def span(self, name: str, **attributes) -> Union[_ActiveSpan, _NoopSpan]:
+        """Context manager timing a child of the current span."""
+        if not self.enabled:
+            return _NOOP_SPAN
+
+        parent = _current_span.get()
+        return _ActiveSpan(self, Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(8),
+            span_id=next(self._ids),
+            parent_id=parent.span_id if parent else None,
+            start_ns=0,
+            wall_time=time.time(),
+            thread_id=threading.get_ident(),
+            attributes=attributes
+        ))
+
+    def _finish(self, span: Span) -> None:
+        self.spans.append(span)
+        if self.exporter is not None:
+            try:
+                self.exporter(span)
+            except Exception as e:
+                logger.warning(f"Trace export failed: {e}")
+
+    def trace(self, trace_id: str) -> List[Span]:
+        """Finished spans of one trace, in start order."""
+        return sorted(
+            (s for s in self.spans if s.trace_id == trace_id),
+            key=lambda s: s.start_ns
+        )
+
+    def close(self) -> None:
+        """Stop tracing and close the exporter if it supports it."""
+        self.enabled = False
+        close = getattr(self.exporter, 'close', None)
+        if close:
+            close()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+# Singleton
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Get global tracer (enabled if a trace path is configured)."""
+    global _tracer
+    if _tracer is None:
+        tracer = Tracer()
+        path = get_config().trace_path
+        if path:
+            exporter = ChromeTraceExporter(path) if path.endswith('.json') else JsonlSink(path)
+            tracer.enable(exporter)
+        _tracer = tracer
+    return _tracer
+
+
+def span(name: str, **attributes) -> Union[_ActiveSpan, _NoopSpan]:
+    """Span on the global tracer (a shared no-op when tracing is off)."""
+    tracer = _tracer or get_tracer()
+    if not tracer.enabled:
+        return _NOOP_SPAN
+    return tracer.span(name, **attributes)
@@ -4,16 +4,19 @@ Zero-cost architecture with free tier optimization
 """
 
 import json
+import math
 import time
-import hashlib
+import uuid
+import atexit
 import asyncio
 import logging
+import threading
+import weakref
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Iterable, Tuple, AsyncIterator, Callable
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from enum import Enum
-import re
 
 logger = logging.getLogger('orchestrator')
 
@@ -23,6 +26,15 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from core.cache import SkillCache, CacheType, get_cache
 from core.config import get_config
 from core.registry import SkillRegistry, get_registry
+from core.classifier import get_query_classifier
+from core.quota import UsageStore
+from core.ratelimit import TokenBucket
+from core.health import BackendHealth, CircuitBreaker
+from core.tracing import span
+from core.history import BoundedHistory
+from core.metrics import ExecutionMetrics
+from core.fingerprint import request_fingerprint
+from core.opcount import counting
 
 
 class ExecutionStatus(Enum):
@@ -44,6 +56,19 @@ class ExecutionResult:
     cache_hit: bool
     model_used: str
     error: Optional[str] = None
+    # Storage operations this request performed, per stage ('cache_read',
+    # 'cache_write', 'quota_read', 'quota_write'); execute_many's bulk
+    # reads and writes are shared by the batch and only in lookup_counts
+    lookups: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class BatchExecution:
+    """One result from execute_many, with its queue and execution time."""
+    index: int
+    result: ExecutionResult
+    queue_ms: float
+    execution_ms: float
 
 
 @dataclass
@@ -53,8 +78,29 @@ class ModelChoice:
     thinking: bool = False
 
 
+class BackendUnavailable(Exception):
+    """Raised when a backend's circuit breaker is open."""
+
+
 class FreeTierRouter:
-    """Routes to free models - KEY TO ZERO COST."""
+    """
+    Routes to free models - KEY TO ZERO COST.
+    
+    Usage is counted per model per UTC day in a persistent UsageStore,
+    shared across processes. Models with a finite quota are checked and
+    counted atomically in the store, and smoothed by a token bucket
+    refilling at quota/day. Unlimited models need no check, so their
+    counts are buffered and written in one transaction every
+    ``flush_every`` uses, whenever usage is read, on ``close`` and at
+    interpreter exit. When the preferred
+    model is near its quota (``spill_threshold``) or out of tokens, the
+    request spills over to the next tier.
+    
+    Within the allowed tiers (the complexity tier and those after it),
+    models are tried by expected completion time from rolling latency,
+    error rate and queue depth of their registered backends. Backends
+    whose circuit breaker is open are skipped.
+    """
     
     QUOTAS = {
         'gemini': 1500,
@@ -62,24 +108,202 @@ class FreeTierRouter:
         'local': float('inf')
     }
     
-    def __init__(self, cache: SkillCache = None):
+    # Spillover order
+    TIERS = ('gemini', 'deepseek', 'local')
+    
+    def __init__(
+        self,
+        cache: SkillCache = None,
+        quotas: Optional[Dict[str, float]] = None,
+        usage_store: Optional[UsageStore] = None,
+        spill_threshold: float = 0.95,
+        burst: float = 60,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        flush_every: int = 32
+    ):
         self.cache = cache
-        self.daily_usage = {k: 0 for k in self.QUOTAS}
+        self.quotas = {**self.QUOTAS, **(quotas or {})}
+        if usage_store is None:
+            usage_store = UsageStore(cache.cache_path if cache else ':memory:')
+        self.usage = usage_store
+        self.spill_threshold = spill_threshold
+        self.spillovers = 0
+        self.flush_every = max(1, flush_every)
+        # Buffered counts for unlimited models, for _pending_day
+        self._pending: Dict[str, int] = {}
+        self._pending_total = 0
+        self._pending_day: Optional[str] = None
+        self._pending_lock = threading.Lock()
+        self._buckets = {
+            model: TokenBucket(quota / 86400, burst)
+            for model, quota in self.quotas.items() if quota != float('inf')
+        }
+        self.backends: Dict[str, Callable] = {}
+        self.health: Dict[str, BackendHealth] = {
+            model: BackendHealth(breaker=CircuitBreaker(failure_threshold, reset_timeout))
+            for model in self.TIERS
+        }
+        _routers.add(self)
+    
+    @property
+    def daily_usage(self) -> Dict[str, int]:
+        """Today's usage per model."""
+        self.flush_usage()
+        used = self.usage.usage()
+        return {model: used.get(model, 0) for model in self.quotas}
     
-    def route(self, query: str, complexity: float) -> ModelChoice:
-        # Check cache first (ALWAYS FREE)
-        if self.cache:
-            key = hashlib.sha256(query.encode()).hexdigest()[:16]
-            if self.cache.get(key):
-                return ModelChoice(model='cache', cost=0.0)
+    def route(self, query: str, complexity: float, cached: Any = None) -> ModelChoice:
+        """
+        Pick a model for a request.
+        
+        The router does no cache I/O of its own: a caller holding a cache
+        hit for the request may pass it as ``cached`` to route to 'cache'
+        (ALWAYS FREE). The orchestrator answers hits before routing.
+        """
+        if cached:
+            return ModelChoice(model='cache', cost=0.0)
         
         # Route by complexity
         if complexity < 0.3:
-            return ModelChoice(model='gemini', cost=0.0)
+            preferred = 'gemini'
         elif complexity < 0.7:
-            return ModelChoice(model='deepseek', cost=0.0)
+            preferred = 'deepseek'
         else:
-            return ModelChoice(model='local', cost=0.0)
+            preferred = 'local'
+        
+        # Allowed tiers, fastest expected completion first (tier order on
+        # ties, so without health data this is plain spillover order)
+        tiers = self.TIERS[self.TIERS.index(preferred):]
+        candidates = sorted(
+            (model for model in tiers if self.health[model].breaker.available()),
+            key=lambda model: (self.health[model].expected_ms(), tiers.index(model))
+        ) or list(tiers)
+        
+        refused = False
+        for model in candidates:
+            if self._admit(model):
+                if refused:
+                    self.spillovers += 1
+                    logger.info(f"Quota spillover: {candidates[0]} -> {model}")
+                return ModelChoice(model=model, cost=0.0)
+            refused = True
+        
+        # Last tier is over budget too; count it and use it anyway
+        self._count(tiers[-1])
+        return ModelChoice(model=tiers[-1], cost=0.0)
+    
+    def register_backend(self, model: str, handler: Callable) -> None:
+        """Register the callable (sync or async) that serves a model."""
+        self.backends[model] = handler
+    
+    def has_backend(self, model: str) -> bool:
+        return model in self.backends
+    
+    async def call(self, model: str, payload: Dict) -> Any:
+        """
+        Call a model's backend, recording latency, errors and queue depth.
+        
+        Raises BackendUnavailable if the model's circuit is open.
+        """
+        health = self.health[model]
+        if not health.breaker.allow():
+            raise BackendUnavailable(f"Circuit open for {model}")
+        
+        handler = self.backends[model]
+        health.start()
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = handler(payload)
+            if asyncio.iscoroutine(result):
+                result = await result
+            ok = True
+            return result
+        finally:
+            health.finish((time.perf_counter() - start) * 1000, ok)
+    
+    def get_health(self) -> Dict[str, Dict]:
+        """Rolling latency, error rate, queue depth and circuit per model."""
+        return {model: health.to_dict() for model, health in self.health.items()}
+    
+    @staticmethod
+    def estimate_complexity(query: str, context: Dict) -> float:
+        """
+        Task complexity in [0, 1] from the request size (log scale).
+        
+        ~50 chars -> 0.2 (gemini), ~1K -> 0.57 (deepseek), 10K+ -> local.
+        """
+        size = len(query) + len(json.dumps(context, sort_keys=True, default=str))
+        return max(0.0, min(1.0, (math.log10(max(10, size)) - 1) / 3.5))
+    
+    def _admit(self, model: str) -> bool:
+        """Take one unit of a model's budget if it has room."""
+        quota = self.quotas.get(model, float('inf'))
+        if quota == float('inf'):
+            self._count(model)
+            return True
+        
+        bucket = self._buckets[model]
+        if not bucket.try_acquire():
+            return False
+        if self.usage.try_consume(model, limit=quota * self.spill_threshold):
+            return True
+        bucket.refund()
+        return False
+    
+    def _count(self, model: str) -> None:
+        """Count one use of a model without a quota check (buffered)."""
+        day = self.usage.today()
+        with self._pending_lock:
+            if day != self._pending_day:
+                self._flush_pending()
+                self._pending_day = day
+            self._pending[model] = self._pending.get(model, 0) + 1
+            self._pending_total += 1
+            if self._pending_total >= self.flush_every:
+                self._flush_pending()
+    
+    def flush_usage(self) -> None:
+        """Write buffered usage counts to the store."""
+        with self._pending_lock:
+            self._flush_pending()
+    
+    def _flush_pending(self) -> None:
+        if self._pending:
+            counts, self._pending, self._pending_total = self._pending, {}, 0
+            self.usage.add_many(counts, day=self._pending_day)
+    
+    def close(self) -> None:
+        """Flush buffered usage counts (the router stays usable)."""
+        self.flush_usage()
+    
+    def get_usage(self) -> Dict[str, Dict]:
+        """Today's usage, quota and remaining budget per model."""
+        used = self.daily_usage
+        return {
+            model: {
+                'used': used[model],
+                'quota': quota,
+                'remaining': max(0, quota - used[model])
+            }
+            for model, quota in self.quotas.items()
+        }
+
+
+# Live routers, flushed at exit so buffered counts are not lost
+_routers: 'weakref.WeakSet[FreeTierRouter]' = weakref.WeakSet()
+
+
+def _flush_routers() -> None:
+    for router in list(_routers):
+        try:
+            router.flush_usage()
+        except Exception as e:
+            logger.warning(f"Usage flush at exit failed: {e}")
+
+
+atexit.register(_flush_routers)
 
 
 class ConfidenceScorer:
@@ -112,13 +336,20 @@ class UnifiedOrchestrator:
     Target: $0.00 per 1K queries.
     """
     
-    def __init__(self, skills_path: str = "./skills"):
+    def __init__(self, skills_path: str = "./skills", history_size: int = 1000):
         self.config = get_config()
         self.cache = get_cache()
         self.registry = get_registry(skills_path)
-        self.router = FreeTierRouter(self.cache)
+        self.router = FreeTierRouter(
+            self.cache,
+            quotas={'gemini': self.config.gemini_daily_limit},
+            spill_threshold=self.config.quota_spill_threshold,
+            burst=self.config.quota_burst
+        )
         self.scorer = ConfidenceScorer()
-        self.executions: Dict[str, ExecutionResult] = {}
+        self.executions = BoundedHistory(history_size)
+        self.metrics = ExecutionMetrics()
+        self.lookup_counts: Dict[str, int] = {}
         logger.info("UnifiedOrchestrator initialized")
     
     async def execute(
@@ -128,32 +359,185 @@ class UnifiedOrchestrator:
         min_confidence: float = 0.60
     ) -> ExecutionResult:
         """Execute task with auto skill selection."""
-        import uuid
+        with span('orchestrator.execute', intent=intent) as trace:
+            with counting() as ops:
+                result = await self._execute(intent, context, min_confidence)
+            self._count_lookups(result, ops)
+            trace.set(status=result.status.value, skill=result.skill_id, model=result.model_used)
+            return self._record(result)
+    
+    async def _execute(
+        self,
+        intent: str,
+        context: Dict[str, Any],
+        min_confidence: float
+    ) -> ExecutionResult:
         execution_id = str(uuid.uuid4())[:8]
         start_time = time.time()
         
         # 1. Check cache
         cache_key = self._cache_key(intent, context)
-        cached = self.cache.get(cache_key)
+        with span('cache.read'):
+            cached = self.cache.get(cache_key)
         if cached:
-            return ExecutionResult(
-                execution_id=execution_id,
-                skill_id=cached.get('skill_id', 'unknown'),
-                status=ExecutionStatus.CACHED,
-                output=cached.get('output'),
-                confidence=1.0,
-                cost=0.0,
-                duration_ms=int((time.time() - start_time) * 1000),
-                cache_hit=True,
-                model_used='cache'
+            return self._cached_result(execution_id, cached, start_time)
+        
+        result = await self._execute_uncached(
+            execution_id, intent, context, min_confidence, start_time
+        )
+        
+        # 6. Cache result
+        if result.status == ExecutionStatus.SUCCESS:
+            with span('cache.write'):
+                self.cache.set(cache_key, self._cache_entry(result), CacheType.EXECUTION)
+        
+        return result
+    
+    async def execute_many(
+        self,
+        requests: Iterable[Tuple[str, Dict[str, Any]]],
+        concurrency: Optional[int] = None,
+        ordered: bool = False,
+        min_confidence: float = 0.60,
+        write_batch_size: int = 64
+    ) -> AsyncIterator[BatchExecution]:
+        """
+        Execute many ``(intent, context)`` requests with bounded concurrency.
+        
+        Cache lookups for the whole batch are one bulk read and successful
+        results are written back in bulk, both off the event loop; those
+        operations are charged to ``lookup_counts`` rather than to any
+        one result's ``lookups``. Results
+        are yielded as they complete, or in request order if ``ordered``.
+        Identical requests in a batch are executed once.
+        
+        Args:
+            requests: (intent, context) pairs
+            concurrency: Max requests executing at once
+                (default: config.max_concurrent)
+            ordered: Yield in request order instead of completion order
+            min_confidence: Passed to each execution
+            write_batch_size: Cache write-back batch size
+        """
+        
+        requests = list(requests)
+        enqueued = time.perf_counter()
+        keys = [self._cache_key(intent, context) for intent, context in requests]
+        with span('cache.read_many', keys=len(keys)), counting() as ops:
+            cached = await asyncio.to_thread(self.cache.get_many, keys)
+        self._tally(ops)
+        
+        # Group identical requests so each key executes once
+        indices_by_key: Dict[str, List[int]] = {}
+        for index, key in enumerate(keys):
+            indices_by_key.setdefault(key, []).append(index)
+        
+        semaphore = asyncio.Semaphore(max(1, concurrency or self.config.max_concurrent))
+        
+        async def run(key: str, index: int) -> Tuple[str, BatchExecution]:
+            intent, context = requests[index]
+            async with semaphore:
+                started = time.perf_counter()
+                with span('orchestrator.batch_item', intent=intent, index=index), \
+                        counting() as ops:
+                    result = await self._execute_uncached(
+                        str(uuid.uuid4())[:8], intent, context, min_confidence, time.time()
+                    )
+            return key, BatchExecution(
+                index=index,
+                result=self._count_lookups(result, ops),
+                queue_ms=(started - enqueued) * 1000,
+                execution_ms=(time.perf_counter() - started) * 1000
             )
         
+        def fan_out(key: str, item: BatchExecution) -> List[BatchExecution]:
+            return [item] + [
+                replace(item, index=i, result=replace(
+                    item.result, execution_id=str(uuid.uuid4())[:8], lookups={}
+                ))
+                for i in indices_by_key[key][1:]
+            ]
+        
+        ready: List[BatchExecution] = []
+        tasks = []
+        for key, indices in indices_by_key.items():
+            if cached.get(key):
+                entry = cached[key]
+                for index in indices:
+                    ready.append(BatchExecution(
+                        index=index,
+                        result=self._cached_result(str(uuid.uuid4())[:8], entry, time.time()),
+                        queue_ms=(time.perf_counter() - enqueued) * 1000,
+                        execution_ms=0.0
+                    ))
+            else:
+                tasks.append(asyncio.ensure_future(run(key, indices[0])))
+        
+        pending_writes: Dict[str, Dict] = {}
+        buffered: Dict[int, BatchExecution] = {}
+        next_index = 0
+        
+        async def flush():
+            if pending_writes:
+                batch = dict(pending_writes)
+                pending_writes.clear()
+                with span('cache.write_many', keys=len(batch)), counting() as ops:
+                    await asyncio.to_thread(self.cache.set_many, batch, CacheType.EXECUTION)
+                self._tally(ops)
+        
+        def emit(items: List[BatchExecution]) -> List[BatchExecution]:
+            nonlocal next_index
+            if not ordered:
+                return items
+            for item in items:
+                buffered[item.index] = item
+            out = []
+            while next_index in buffered:
+                out.append(buffered.pop(next_index))
+                next_index += 1
+            return out
+        
+        try:
+            for item in ready:
+                self._record(item.result)
+            for item in emit(ready):
+                yield item
+            
+            for next_done in asyncio.as_completed(tasks):
+                key, item = await next_done
+                if item.result.status == ExecutionStatus.SUCCESS:
+                    pending_writes[key] = self._cache_entry(item.result)
+                    if len(pending_writes) >= write_batch_size:
+                        await flush()
+                items = fan_out(key, item)
+                for done in items:
+                    self._record(done.result)
+                for out in emit(items):
+                    yield out
+        finally:
+            for task in tasks:
+                task.cancel()
+            await flush()
+    
+    async def _execute_uncached(
+        self,
+        execution_id: str,
+        intent: str,
+        context: Dict[str, Any],
+        min_confidence: float,
+        start_time: float
+    ) -> ExecutionResult:
+        """Classify, select, score and route a request (no cache I/O)."""
+        
         # 2. Classify intent
-        intent_type = self._classify_intent(intent)
+        with span('orchestrator.classify'):
+            intent_type = self._classify_intent(intent)
         
         # 3. Select skill
-        skill_id = self._select_skill(intent_type)
-        confidence = self.scorer.calculate(0.8, len(str(context)))
+        with span('orchestrator.select_skill'):
+            skill_id = self._select_skill(intent_type)
+        with span('orchestrator.score'):
+            confidence = self.scorer.calculate(0.8, len(str(context)))
         
         if confidence < min_confidence:
             return ExecutionResult(
@@ -169,14 +553,36 @@ class UnifiedOrchestrator:
                 error=f"Confidence {confidence:.2f} below threshold"
             )
         
-        # 4. Route to model
-        model = self.router.route(intent, confidence)
+        # 4. Route to model (quota checks are SQLite transactions; keep
+        # them off the event loop)
+        with span('orchestrator.route') as trace:
+            model = await asyncio.to_thread(
+                self.router.route, intent, self.router.estimate_complexity(intent, context)
+            )
+            trace.set(model=model.model)
         
         # 5. Execute
-        output = {'skill': skill_id, 'model': model.model, 'context': context, 'success': True}
-        
-        # 6. Cache result
-        self.cache.set(cache_key, {'skill_id': skill_id, 'output': output}, CacheType.EXECUTION)
+        if self.router.has_backend(model.model):
+            try:
+                with span('orchestrator.backend', model=model.model):
+                    output = await self.router.call(
+                        model.model, {'skill': skill_id, 'intent': intent, 'context': context}
+                    )
+            except Exception as e:
+                return ExecutionResult(
+                    execution_id=execution_id,
+                    skill_id=skill_id,
+                    status=ExecutionStatus.FAILED,
+                    output=None,
+                    confidence=confidence,
+                    cost=0.0,
+                    duration_ms=int((time.time() - start_time) * 1000),
+                    cache_hit=False,
+                    model_used=model.model,
+                    error=str(e)
+                )
+        else:
+            output = {'skill': skill_id, 'model': model.model, 'context': context, 'success': True}
         
         return ExecutionResult(
             execution_id=execution_id,
@@ -190,6 +596,41 @@ class UnifiedOrchestrator:
             model_used=model.model
         )
     
+    def _record(self, result: ExecutionResult) -> ExecutionResult:
+        """Keep a result in the bounded history and rolling metrics."""
+        self.executions.append(result)
+        self.metrics.record(result)
+        return result
+    
+    def _count_lookups(self, result: ExecutionResult, ops: Dict[str, int]) -> ExecutionResult:
+        """Attach the storage operations counted for a request to its result."""
+        result.lookups = dict(ops)
+        self._tally(ops)
+        return result
+    
+    def _tally(self, ops: Dict[str, int]) -> None:
+        """Add counted storage operations to the lifetime totals."""
+        for stage, count in ops.items():
+            self.lookup_counts[stage] = self.lookup_counts.get(stage, 0) + count
+    
+    @staticmethod
+    def _cache_entry(result: ExecutionResult) -> Dict:
+        return {'skill_id': result.skill_id, 'output': result.output}
+    
+    @staticmethod
+    def _cached_result(execution_id: str, cached: Dict, start_time: float) -> ExecutionResult:
+        return ExecutionResult(
+            execution_id=execution_id,
+            skill_id=cached.get('skill_id', 'unknown'),
+            status=ExecutionStatus.CACHED,
+            output=cached.get('output'),
+            confidence=1.0,
+            cost=0.0,
+            duration_ms=int((time.time() - start_time) * 1000),
+            cache_hit=True,
+            model_used='cache'
+        )
+    
     async def peer_request(
         self,
         from_skill: str,
@@ -208,18 +649,7 @@ class UnifiedOrchestrator:
     
     def _classify_intent(self, intent: str) -> str:
         """Classify user intent."""
-        intent_lower = intent.lower()
-        patterns = {
-            'lint': r'(lint|eslint|error|fix|bug)',
-            'document': r'(document|pdf|word|excel)',
-            'generate': r'(generate|create|build|make)',
-            'design': r'(design|style|ui|css)',
-            'rag': r'(query|search|retrieve|find)',
-        }
-        for ptype, pattern in patterns.items():
-            if re.search(pattern, intent_lower):
-                return ptype
-        return 'general'
+        return get_query_classifier().classify(intent).intent
     
     def _select_skill(self, intent_type: str) -> str:
         """Select skill for intent type."""
@@ -233,26 +663,32 @@ class UnifiedOrchestrator:
         return mapping.get(intent_type, 'LLM')
     
     def _cache_key(self, intent: str, context: Dict) -> str:
-        """Generate cache key."""
-        data = f"{intent}:{json.dumps(context, sort_keys=True)}"
-        return hashlib.sha256(data.encode()).hexdigest()[:16]
+        """Generate cache key (shared with the API layer)."""
+        return request_fingerprint(intent, context)
     
     def get_metrics(self) -> Dict:
-        """Get orchestrator metrics."""
-        total = len(self.executions)
-        if total == 0:
-            return {'total': 0}
+        """
+        Get orchestrator metrics.
         
-        successes = sum(1 for e in self.executions.values() if e.status == ExecutionStatus.SUCCESS)
-        cache_hits = sum(1 for e in self.executions.values() if e.cache_hit)
+        Lifetime counters plus sliding-window stats (latency percentiles,
+        rates, cost) overall and per skill and model, checked against the
+        manifest's performanceTargets. Success rate excludes cache hits.
+        """
+        if self.metrics.total == 0:
+            return {'total': 0}
         
         return {
-            'total_executions': total,
-            'success_rate': successes / total,
-            'cache_hit_rate': cache_hits / total,
-            'total_cost': sum(e.cost for e in self.executions.values()),
-            'target_cost_per_1k': 0.00
+            **self.metrics.lifetime(),
+            'target_cost_per_1k': 0.00,
+            'window': self.metrics.snapshot(),
+            'by_skill': self.metrics.breakdown('skill'),
+            'by_model': self.metrics.breakdown('model'),
+            'targets': self.metrics.check_targets(self.registry.performance_targets)
         }
+    
+    def close(self) -> None:
+        """Flush buffered router usage to the store."""
+        self.router.close()
 
 
 # Singleton
@@ -0,0 +1,402 @@
+"""
+Enterprise RAG Server - Shared Warm Process for Local Clients
+
+One long-running asyncio process holds the cache connections, registry
+and orchestrator, so short-lived clients (CLIs, hooks, scripts) skip
+startup and share one warm cache. It speaks plain HTTP/1.1 with
+keep-alive over a Unix socket or localhost TCP.
+
+Endpoints:
+    GET  /health              {"status": "ok"}
+    GET  /stats               EnterpriseRAG.get_stats()
+    POST /query               {"query", "context"?, "min_confidence"?} -> QueryResult
+    POST /batch               {"queries", "context"?} -> NDJSON stream of
+                              {"index", "result"} lines as queries complete
+    GET  /patterns/<id>       pattern, or 404
+    PUT  /patterns/<id>       {"code", "description", "confidence"?, "tags"?}
+
+Confidences are numbers in [0, 1] and "context" is an object; other
+values get a 400 with a JSON {"error"} body.
+
+Run:
+    python skills/server.py --socket /tmp/skills.sock
+    python skills/server.py --port 8765
+
+Clients: see skills/client.py.
+"""
+
+import sys
+import json
+import math
+import signal
+import asyncio
+import argparse
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+from urllib.parse import unquote
+
+# Add skills to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.config import get_config
+from api import EnterpriseRAG, get_rag
+
+logger = logging.getLogger('skills.server')
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 16 * 1024 * 1024
+KEEP_ALIVE_TIMEOUT = 60.0
+
+REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    411: 'Length Required', 413: 'Payload Too Large',
+    431: 'Request Header Fields Too Large', 500: 'Internal Server Error',
+}
+
+
+class HTTPError(Exception):
+    """Error reported to the client as a JSON response."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    __slots__ = ('method', 'path', 'headers', 'body', 'keep_alive')
+
+    def __init__(self, method: str, path: str, headers: Dict[str, str], body: bytes, keep_alive: bool):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+        self.keep_alive = keep_alive
+
+    def json(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self.body or b'{}')
+        except ValueError as e:
+            raise HTTPError(400, f"Invalid JSON body: {e}")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "JSON body must be an object")
+        return data
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """Read one request; None on a clean close between requests."""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise HTTPError(400, "Incomplete request")
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(431, "Request headers too large")
+
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, version = lines[0].split(' ')
+    except ValueError:
+        raise HTTPError(400, f"Malformed request line: {lines[0]!r}")
+
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, sep, value = line.partition(':')
+            if not sep or not name.strip():
+                raise HTTPError(400, f"Malformed header line: {line!r}")
+            headers[name.strip().lower()] = value.strip()
+
+    if 'transfer-encoding' in headers:
+        raise HTTPError(411, "Chunked request bodies are not supported")
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length < 0:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, f"Body exceeds {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b''
+
+    connection = headers.get('connection', '').lower()
+    if version == 'HTTP/1.1':
+        keep_alive = connection != 'close'
+    else:
+        keep_alive = connection == 'keep-alive'
+
+    return Request(method, unquote(target.split('?', 1)[0]), headers, body, keep_alive)
+
+
+def _context(data: Dict) -> Optional[Dict]:
+    """The optional 'context' field of a request body."""
+    context = data.get('context')
+    if context is not None and not isinstance(context, dict):
+        raise HTTPError(400, "'context' must be an object")
+    return context
+
+
+def _fraction(data: Dict, name: str, default: float) -> float:
+    """An optional number in [0, 1] from a request body."""
+    value = data.get(name, default)
+    if (isinstance(value, bool) or not isinstance(value, (int, float))
+            or not math.isfinite(value) or not 0 <= value <= 1):
+        raise HTTPError(400, f"'{name}' must be a number between 0 and 1")
+    return float(value)
+
+
+def _head(status: int, headers: Dict[str, str], keep_alive: bool) -> bytes:
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    headers = dict(headers, Connection='keep-alive' if keep_alive else 'close')
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(payload, default=str).encode()
+
+
+class RAGServer:
+    """
+    Asyncio HTTP server in front of one EnterpriseRAG.
+
+    Example:
+        server = RAGServer(socket_path="/tmp/skills.sock")
+        await server.start()
+        await server.serve_forever()
+    """
+
+    def __init__(
+        self,
+        rag: Optional[EnterpriseRAG] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        socket_path: Optional[str] = None
+    ):
+        config = get_config()
+        self.rag = rag or get_rag()
+        self.socket_path = socket_path if socket_path is not None else config.server_socket
+        self.host = host or config.server_host
+        self.port = port if port is not None else config.server_port
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+
+    @property
+    def address(self) -> str:
+        if self.socket_path:
+            return self.socket_path
+        return f"{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        if self.socket_path:
+            path = Path(self.socket_path)
+            if path.is_socket():
+                path.unlink()  # stale socket from a previous run
+            self._server = await asyncio.start_unix_server(
+                self._handle, path=self.socket_path, limit=MAX_HEADER_BYTES
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._handle, self.host, self.port, limit=MAX_HEADER_BYTES
+            )
+            # Port 0 picks a free port
+            self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Serving on {self.address}")
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        # Idle keep-alive connections would otherwise hold wait_closed()
+        for task in list(self._connections):
+            task.cancel()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        if self.socket_path:
+            Path(self.socket_path).unlink(missing_ok=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until it closes or idles out."""
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except HTTPError as e:
+                    writer.write(self._json(e.status, {'error': str(e)}, keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                self.requests += 1
+                await self._dispatch(request, writer)
+                if not request.keep_alive:
+                    break
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            # A cancellation (server shutdown) propagates after cleanup
+            self._connections.discard(task)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _dispatch(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        try:
+            if request.method == 'POST' and request.path == '/batch':
+                # Errors before the first chunk still get a JSON response
+                await self._stream_batch(request, writer)
+                return
+            status, payload = await self._route(request)
+        except HTTPError as e:
+            status, payload = e.status, {'error': str(e)}
+        except Exception as e:
+            logger.exception(f"{request.method} {request.path} failed")
+            status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+        writer.write(self._json(status, payload, request.keep_alive))
+        await writer.drain()
+
+    def _route(self, request: Request):
+        """Coroutine for a non-streaming request's handler."""
+        method, path = request.method, request.path
+
+        routes = {
+            '/health': ('GET', self._health),
+            '/stats': ('GET', self._stats),
+            '/query': ('POST', self._query),
+            '/batch': ('POST', None),
+        }
+        if path in routes:
+            allowed, handler = routes[path]
+            if method != allowed:
+                raise HTTPError(405, f"{path} expects {allowed}")
+            return handler(request)
+
+        if path.startswith('/patterns/') and len(path) > len('/patterns/'):
+            pattern_id = path[len('/patterns/'):]
+            if method == 'GET':
+                return self._get_pattern(pattern_id)
+            if method == 'PUT':
+                return self._put_pattern(pattern_id, request)
+            raise HTTPError(405, f"{path} expects GET or PUT")
+
+        raise HTTPError(404, f"No route for {method} {path}")
+
+    @staticmethod
+    def _json(status: int, payload: Any, keep_alive: bool) -> bytes:
+        body = _encode(payload)
+        return _head(status, {
+            'Content-Type': 'application/json',
+            'Content-Length': str(len(body))
+        }, keep_alive) + body
+
+    async def _health(self, request: Request) -> Tuple[int, Dict]:
+        return 200, {'status': 'ok', 'requests': self.requests}
+
+    async def _stats(self, request: Request) -> Tuple[int, Dict]:
+        return 200, await asyncio.to_thread(self.rag.get_stats)
+
+    async def _query(self, request: Request) -> Tuple[int, Dict]:
+        data = request.json()
+        query = data.get('query')
+        if not isinstance(query, str) or not query:
+            raise HTTPError(400, "'query' must be a non-empty string")
+        result = await self.rag.aquery(
+            query, _context(data), _fraction(data, 'min_confidence', 0.60)
+        )
+        return 200, result.to_dict()
+
+    @staticmethod
+    def _batch_args(request: Request) -> Tuple[list, Optional[Dict]]:
+        data = request.json()
+        queries = data.get('queries')
+        if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+            raise HTTPError(400, "'queries' must be a list of strings")
+        return queries, _context(data)
+
+    async def _stream_batch(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        """Chunked NDJSON: one line per query, in completion order."""
+        queries, context = self._batch_args(request)
+        writer.write(_head(200, {
+            'Content-Type': 'application/x-ndjson',
+            'Transfer-Encoding': 'chunked'
+        }, request.keep_alive))
+
+        def chunk(payload: Dict) -> bytes:
+            line = _encode(payload) + b'\n'
+            return b'%x\r\n%s\r\n' % (len(line), line)
+
+        try:
+            async for index, result in self.rag.stream_batch(queries, context):
+                writer.write(chunk({'index': index, 'result': result.to_dict()}))
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            # Headers are sent; report the failure in-band
+            logger.exception("Batch stream failed")
+            writer.write(chunk({'error': f"{type(e).__name__}: {e}"}))
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+
+    async def _get_pattern(self, pattern_id: str) -> Tuple[int, Dict]:
+        pattern = await asyncio.to_thread(self.rag.get_pattern, pattern_id)
+        if pattern is None:
+            raise HTTPError(404, f"Unknown pattern: {pattern_id}")
+        return 200, pattern
+
+    async def _put_pattern(self, pattern_id: str, request: Request) -> Tuple[int, Dict]:
+        data = request.json()
+        if not isinstance(data.get('code'), str) or not isinstance(data.get('description'), str):
+            raise HTTPError(400, "'code' and 'description' must be strings")
+        tags = data.get('tags')
+        if tags is not None and (
+            not isinstance(tags, list) or not all(isinstance(t, str) for t in tags)
+        ):
+            raise HTTPError(400, "'tags' must be a list of strings")
+        await asyncio.to_thread(
+            self.rag.add_pattern, pattern_id, data['code'], data['description'],
+            _fraction(data, 'confidence', 0.85), tags
+        )
+        return 200, {'id': pattern_id, 'stored': True}
+
+
+async def serve(host: Optional[str] = None, port: Optional[int] = None, socket_path: Optional[str] = None) -> None:
+    """Run a server until cancelled or sent SIGINT/SIGTERM."""
+    server = RAGServer(host=host, port=port, socket_path=socket_path)
+    await server.start()
+    task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, task.cancel)
+    try:
+        await server.serve_forever()
+    except asyncio.CancelledError:
+        logger.info("Shutting down")
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve EnterpriseRAG to local clients")
+    parser.add_argument('--socket', help="Unix socket path (default: config.server_socket)")
+    parser.add_argument('--host', help="TCP host (default: config.server_host)")
+    parser.add_argument('--port', type=int, help="TCP port (default: config.server_port)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(message)s')
+    asyncio.run(serve(args.host, args.port, args.socket))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,15 @@ import os
 import unittest
 import tempfile
 import shutil
+import socket
+import json
+import re
+import time
+import asyncio
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
+from unittest.mock import patch
 
 # Add skills to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -17,6 +25,32 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from core.cache import SkillCache, CacheType, get_cache
 from core.config import SkillsConfig, get_config
 from core.registry import SkillRegistry, get_registry
+from core.context import ContextManager, ContextType
+from core.hallucination import HallucinationPreventer, KnownPatternIndex, StreamingCheck
+import core.hallucination as hallucination_module
+from core.automaton import KeywordAutomaton
+from core.history import BoundedHistory, JsonlSink
+from core.tools import ToolValidator, ToolDefinition, ToolExecutionEngine, ToolLimits, ToolStatus
+from core.ratelimit import TokenBucket
+from core.classifier import QueryClassifier
+from core.thinking import ProgrammaticThinking, ThinkingStep, ThinkingPhase, ExecutionStatus
+import core.cache as cache_module
+import orchestrator.orchestrator as orchestrator_module
+from orchestrator.orchestrator import (
+    UnifiedOrchestrator, FreeTierRouter, BackendUnavailable, ExecutionStatus as OrchestratorStatus
+)
+from core.health import BackendHealth, CircuitState
+import core.tracing as tracing_module
+from core.tracing import Tracer, ChromeTraceExporter, span
+from core.metrics import ExecutionMetrics
+from orchestrator.orchestrator import ExecutionResult
+import api
+from core.fingerprint import request_fingerprint
+from core.quota import UsageStore
+from core.hashing import stable_hash
+from server import RAGServer
+from client import RAGClient, RAGClientError
+from benchmarks.run_benchmarks import Case, measure, compare
 
 
 class TestConfig(unittest.TestCase):
@@ -108,6 +142,1426 @@ class TestRegistry(unittest.TestCase):
         matches = self.registry.match_trigger('Fix lint error', 'react')
         self.assertGreater(len(matches), 0)
 
+    def test_get_registry_honours_skills_path(self):
+        """Test get_registry loads the given tree's manifest from any cwd."""
+        temp_dir = tempfile.mkdtemp()
+        cwd = os.getcwd()
+        try:
+            os.chdir(temp_dir)
+            registry = get_registry(str(self.skills_path))
+            self.assertEqual(registry.manifest_path, self.skills_path / 'skill-manifest.json')
+            self.assertIn('cacheHitRate', registry.performance_targets)
+            self.assertIs(get_registry(str(self.skills_path)), registry)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(temp_dir)
+
+
+class TestContextManager(unittest.TestCase):
+    """Test context management."""
+    
+    def setUp(self):
+        """Create temp cache for offloaded chains."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = SkillCache(os.path.join(self.temp_dir, 'test_cache.db'))
+    
+    def tearDown(self):
+        """Cleanup temp directory."""
+        shutil.rmtree(self.temp_dir)
+    
+    def _add(self, cm, chain_id, content):
+        entry = cm.create_context(content, ContextType.USER_INPUT, 'user')
+        cm.add_to_chain(chain_id, entry)
+        return entry
+    
+    def test_memory_budget_offloads_cold_chains(self):
+        """Test that cold chains are offloaded and reloaded on demand."""
+        cm = ContextManager(cache=self.cache, max_memory_bytes=2000)
+        for i in range(5):
+            self._add(cm, f'chain_{i}', {'text': 'x' * 500})
+        
+        stats = cm.get_stats()
+        self.assertLessEqual(stats['resident_bytes'], 2000)
+        self.assertGreater(stats['offloaded_chains'], 0)
+        self.assertEqual(stats['total_chains'], 5)
+        
+        chain = cm.get_chain('chain_0')
+        self.assertIsNotNone(chain)
+        self.assertEqual(chain.entries[0].content, {'text': 'x' * 500})
+        self.assertEqual(cm.get_stats()['reloads'], 1)
+    
+    def test_no_budget_keeps_all_chains(self):
+        """Test unbounded manager keeps every chain resident."""
+        cm = ContextManager(cache=self.cache)
+        for i in range(5):
+            self._add(cm, f'chain_{i}', {'text': 'x' * 500})
+        self.assertEqual(cm.get_stats()['resident_chains'], 5)
+    
+    def test_budget_without_cache_keeps_chains(self):
+        """Test chains are never dropped when there is nowhere to offload them."""
+        cm = ContextManager(max_memory_bytes=2000)
+        with self.assertLogs('context', level='WARNING') as logs:
+            for i in range(5):
+                self._add(cm, f'chain_{i}', {'text': 'x' * 500})
+        
+        self.assertEqual(len(logs.records), 1)
+        stats = cm.get_stats()
+        self.assertEqual(stats['resident_chains'], 5)
+        self.assertEqual(stats['offloads'], 0)
+        self.assertEqual(cm.get_chain('chain_0').entries[0].content, {'text': 'x' * 500})
+    
+    def test_share_context_references_single_payload(self):
+        """Test shared entries point at one payload and are ref-counted."""
+        cm = ContextManager(cache=self.cache)
+        entry = self._add(cm, 'source', {'text': 'x' * 5000})
+        
+        for i in range(10):
+            self.assertTrue(cm.share_context('source', f'peer_{i}', entry.id))
+        
+        peer = cm.get_chain('peer_0')
+        shared = peer.get(f'shared_{entry.id}')
+        self.assertIs(shared.content, cm.get_chain('peer_9').get(f'shared_{entry.id}').content)
+        self.assertEqual(shared.content, entry.content)
+        self.assertLess(peer.approx_bytes, 1000)
+        self.assertNotIn('xxxx', json.dumps(peer.to_dict()))
+        self.assertEqual(cm.get_stats()['shared_refs'], 10)
+        self.assertFalse(cm.share_context('source', 'peer_0', 'missing'))
+    
+    def test_shared_payload_survives_reload(self):
+        """Test offloaded chains resolve shared references on reload."""
+        cm = ContextManager(cache=self.cache, max_memory_bytes=5500)
+        entry = self._add(cm, 'source', {'text': 'x' * 5000})
+        cm.share_context('source', 'peer', entry.id)
+        self._add(cm, 'other', {'text': 'y' * 5000})
+        
+        self.assertIn('peer', cm.offloaded)
+        peer = cm.get_chain('peer')
+        self.assertEqual(peer.entries[0].content, {'text': 'x' * 5000})
+        
+        fresh = ContextManager(cache=self.cache)
+        peer = fresh.get_chain('peer')
+        self.assertEqual(peer.entries[0].content, {'text': 'x' * 5000})
+        self.assertEqual(fresh.get_stats()['shared_refs'], 1)
+    
+    def test_shared_payload_is_a_private_copy(self):
+        """Test later edits to the source do not reach shared entries."""
+        cm = ContextManager(cache=self.cache)
+        entry = self._add(cm, 'source', {'text': 'before'})
+        cm.share_context('source', 'peer', entry.id)
+        
+        entry.content['text'] = 'after'
+        self.assertEqual(cm.get_chain('peer').entries[0].content, {'text': 'before'})
+    
+    def test_shared_payload_bytes_charged_to_budget(self):
+        """Test payload bytes stay charged until the last reference goes."""
+        cm = ContextManager(cache=self.cache, max_chain_size=1)
+        entry = self._add(cm, 'source', {'text': 'x' * 5000})
+        before = cm.resident_bytes
+        cm.share_context('source', 'peer', entry.id)
+        self.assertGreater(cm.resident_bytes - before, 5000)
+        
+        self._add(cm, 'source', {'text': 'small'})   # evicts the source entry
+        self.assertGreater(cm.resident_bytes, 5000)
+        self._add(cm, 'peer', {'text': 'small'})     # drops the last reference
+        self.assertLess(cm.resident_bytes, 2000)
+    
+    def test_local_release_keeps_cached_payload(self):
+        """Test one manager dropping its reference does not break others."""
+        cm = ContextManager(cache=self.cache)
+        entry = self._add(cm, 'source', {'text': 'shared'})
+        for i in range(3):
+            cm.share_context('source', f'p{i}', entry.id)
+        
+        other = ContextManager(cache=self.cache, max_chain_size=2)
+        other.get_chain('p0')
+        self._add(other, 'p0', {'text': 'a'})
+        self._add(other, 'p0', {'text': 'b'})
+        
+        third = ContextManager(cache=self.cache)
+        self.assertEqual(third.get_chain('p1').entries[0].content, {'text': 'shared'})
+
+
+class TestHallucinationPreventer(unittest.TestCase):
+    """Test hallucination prevention."""
+    
+    def setUp(self):
+        """Create preventer."""
+        self.preventer = HallucinationPreventer()
+    
+    def test_uncertain_output(self):
+        """Test uncertainty phrases lower confidence."""
+        check = self.preventer.check("I think it might be fine. Perhaps, I think.")
+        self.assertEqual(
+            sorted(check.uncertain_claims),
+            ['I think', 'I think', 'Perhaps', 'might be']
+        )
+        self.assertEqual(check.pattern_counts[r'\bI think\b'], 2)
+        self.assertLess(check.confidence, 0.60)
+    
+    def test_factual_claims(self):
+        """Test factual claims are extracted with their groups."""
+        claims = self.preventer._check_factual_claims(
+            "This hook is known as lazy init, according to the docs."
+        )
+        self.assertEqual(claims, ['is known as', 'according to'])
+    
+    def test_structural_claim_does_not_hide_others(self):
+        """Test each pattern finds what its own findall finds."""
+        text = "The result is, according to research shows and verified data, known as X."
+        self.assertEqual(
+            self.preventer._check_factual_claims(text),
+            ['is known as', 'according to', 'research shows', 'verified']
+        )
+        
+        check = self.preventer.check(text)
+        expected = {}
+        for pattern in self.preventer.FACTUAL_PATTERNS + self.preventer.UNCERTAINTY_PATTERNS:
+            found = len(re.findall(pattern, text, re.IGNORECASE))
+            if found:
+                expected[pattern] = found
+        self.assertEqual(check.pattern_counts, expected)
+        self.assertEqual(len(expected), 4)
+    
+    def test_known_pattern_output(self):
+        """Test known good patterns give high confidence."""
+        check = self.preventer.check("Use useState(() => value) here.")
+        self.assertFalse(check.is_hallucination)
+        self.assertGreaterEqual(check.confidence, 0.85)
+    
+    def test_streaming_matches_full_check(self):
+        """Test chunked checking carries matches across chunk boundaries."""
+        text = "I th" + "ink it is\n called X.\nMaybe it is known as Y, perhaps."
+        full = self.preventer.check(text)
+        
+        checker = self.preventer.stream()
+        for i in range(0, len(text), 3):
+            checker.feed(text[i:i + 3])
+        streamed = checker.finish()
+        
+        self.assertEqual(sorted(streamed.uncertain_claims), sorted(full.uncertain_claims))
+        self.assertEqual(streamed.pattern_counts, full.pattern_counts)
+        self.assertAlmostEqual(streamed.confidence, full.confidence)
+    
+    def test_streaming_equals_full_check_across_splits(self):
+        """Test long-line splits and multi-line codes give the same result as check()."""
+        code = next(p['code'] for p in self.preventer.known_patterns.patterns.values()
+                    if '\n' in p['code'])
+        claim = "The result is, according to research shows and verified data, known as X. "
+        text = ("filler text " * 15 + claim + "maybe more filler " * 15 + "\n"
+                + "Example:\n" + code + "\nI think that is all.")
+        full = self.preventer.check(text)
+        
+        for size in (5, 7, 64):
+            checker = StreamingCheck(self.preventer, max_pending_chars=100)
+            for i in range(0, len(text), size):
+                checker.feed(text[i:i + size])
+            streamed = checker.finish()
+            
+            self.assertEqual(streamed.uncertain_claims, full.uncertain_claims)
+            self.assertEqual(streamed.verified_facts, full.verified_facts)
+            self.assertEqual(streamed.pattern_counts, full.pattern_counts)
+            self.assertAlmostEqual(streamed.confidence, full.confidence)
+        self.assertIn(r'\b(is|are|was|were|has|have|had)\b.*\b(called|known as|defined as)\b',
+                      full.pattern_counts)
+        self.assertTrue(any(f.startswith("Pattern match:") for f in full.verified_facts))
+    
+    def test_streaming_early_abort(self):
+        """Test running confidence triggers an abort signal."""
+        checker = self.preventer.stream(abort_threshold=0.40)
+        status = checker.feed("I think maybe ")
+        self.assertFalse(status.should_abort)
+        status = checker.feed("probably, I guess, not sure, perhaps")
+        self.assertTrue(status.should_abort)
+        self.assertEqual(status.uncertainty_count, 6)
+    
+    def test_check_many_preserves_order(self):
+        """Test batch checking across processes keeps input order."""
+        self.preventer.add_known_pattern('custom_hook', 'useCustomHook()', 0.97)
+        outputs = (f"I think {i}" if i % 2 else f"useCustomHook() {i}" for i in range(50))
+        results = list(self.preventer.check_many(outputs, workers=2, chunk_size=4))
+        
+        self.assertEqual(len(results), 50)
+        self.assertEqual(results[0].confidence, 0.97)
+        self.assertEqual(results[1].uncertain_claims, ['I think'])
+        self.assertEqual(
+            [r.confidence for r in results],
+            [r.confidence for r in self.preventer.check_many(
+                f"I think {i}" if i % 2 else f"useCustomHook() {i}" for i in range(50))]
+        )
+    
+    def test_batch_worker_skips_pattern_file(self):
+        """Test check_many workers reuse the parent's patterns without reloading."""
+        patterns = {'custom_hook': {'code': 'useCustomHook()', 'confidence': 0.97, 'verified': True}}
+        with patch.object(KnownPatternIndex, 'load_file') as load_file:
+            hallucination_module._init_batch_worker(HallucinationPreventer, patterns)
+        
+        load_file.assert_not_called()
+        worker = hallucination_module._batch_preventer
+        self.assertEqual(list(worker.known_patterns.patterns), ['custom_hook'])
+        self.assertEqual(worker.check("useCustomHook()").confidence, 0.97)
+    
+    def test_known_patterns_are_per_instance(self):
+        """Test add_known_pattern does not leak across instances."""
+        self.preventer.add_known_pattern('custom_hook', 'useCustomHook()', 0.9)
+        self.assertTrue(self.preventer.verify_fact('call useCustomHook() once').is_verified)
+        self.assertFalse(HallucinationPreventer().verify_fact('call useCustomHook() once').is_verified)
+    
+    def test_known_patterns_seeded_from_file_and_cache(self):
+        """Test index loads patterns.json and cached patterns."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cache = SkillCache(os.path.join(temp_dir, 'test_cache.db'))
+            cache.set('pattern:cached_one', {'code': 'cachedCall()', 'confidence': 0.9},
+                      cache_type='pattern')
+            preventer = HallucinationPreventer(cache=cache)
+            self.assertIn('react_lazy_init', preventer.known_patterns)
+            self.assertIn('cached_one', preventer.known_patterns)
+            self.assertTrue(preventer._verify_against_known('it is called react lazy init'))
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+class TestKeywordAutomaton(unittest.TestCase):
+    """Test Aho-Corasick keyword matching."""
+    
+    def test_overlapping_matches(self):
+        """Test all overlapping keyword occurrences are found."""
+        automaton = KeywordAutomaton([('he', 1), ('she', 2), ('hers', 3), ('his', 4)])
+        matches = sorted(automaton.iter_matches('ushers'))
+        self.assertEqual(matches, [(1, 4, 2), (2, 4, 1), (2, 6, 3)])
+    
+    def test_add_after_match(self):
+        """Test keywords added after a lookup are picked up."""
+        automaton = KeywordAutomaton([('lint', 'lint')])
+        self.assertEqual(automaton.find_values('eslint lint'), ['lint'])
+        automaton.add('eslint', 'eslint')
+        self.assertEqual(automaton.find_values('eslint lint'), ['eslint', 'lint'])
+
+
+class TestBoundedHistory(unittest.TestCase):
+    """Test ring-buffer history and running aggregates."""
+    
+    def setUp(self):
+        """Create temp directory for spill files."""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Cleanup temp directory."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_bounded_with_lifetime_aggregates(self):
+        """Test buffer stays bounded while aggregates cover every item."""
+        history = BoundedHistory(maxlen=10)
+        for i in range(100):
+            history.append(i)
+            if i % 4 == 0:
+                history.incr('even')
+            history.observe('value', i)
+        
+        self.assertEqual(len(history), 10)
+        self.assertEqual(history[0], 90)
+        self.assertEqual(history.total, 100)
+        self.assertAlmostEqual(history.rate('even'), 0.25)
+        self.assertAlmostEqual(history.mean('value'), 49.5)
+        self.assertGreater(history.ewma('value'), 80)
+    
+    def test_spill_to_jsonl(self):
+        """Test evicted items are written to the sink."""
+        path = os.path.join(self.temp_dir, 'spill.jsonl')
+        history = BoundedHistory(maxlen=2, sink=JsonlSink(path))
+        for i in range(5):
+            history.append({'n': i})
+        with open(path) as f:
+            spilled = [json.loads(line)['n'] for line in f]
+        self.assertEqual(spilled, [0, 1, 2])
+    
+    def test_tool_validator_stats(self):
+        """Test tool stats come from running counters."""
+        validator = ToolValidator(history_size=5)
+        for i in range(20):
+            call = validator.create_call('get_pattern', {'pattern_id': f'p{i}'})
+            validator.execute(call)
+        validator.create_call('get_pattern', {})
+        
+        stats = validator.get_stats()
+        self.assertEqual(len(validator.call_history), 5)
+        self.assertEqual(stats['total_calls'], 21)
+        self.assertEqual(stats['successful'], 20)
+
+
+class TestToolValidator(unittest.TestCase):
+    """Test compiled tool schema validation."""
+    
+    def setUp(self):
+        self.validator = ToolValidator()
+    
+    def tearDown(self):
+        ToolValidator.TOOLS.pop('resize', None)
+    
+    def test_validate(self):
+        """Test required, type and unknown parameter checks."""
+        result = self.validator.validate('cache_set', {'key': 1, 'ttl': 'x', 'extra': 2})
+        self.assertFalse(result.is_valid)
+        self.assertIn("Missing required parameter: value", result.errors)
+        self.assertIn("Parameter key has wrong type. Expected string, got int", result.errors)
+        self.assertIn("Unknown parameter: extra", result.warnings)
+        self.assertEqual(result.sanitized_params, {'key': 1, 'ttl': 'x'})
+        
+        result = self.validator.validate('nope', {})
+        self.assertEqual(result.errors, ["Unknown tool: nope"])
+    
+    def test_security_warnings(self):
+        """Test one scan reports every matching rule in order."""
+        result = self.validator.validate(
+            'get_pattern', {'pattern_id': "../x;-- <SCRIPT>javascript:"}
+        )
+        self.assertTrue(result.is_valid)
+        self.assertEqual(result.warnings, [
+            "Potential XSS detected in pattern_id",
+            "Potential XSS detected in pattern_id",
+            "Potential SQL injection detected in pattern_id",
+            "Path traversal detected in pattern_id",
+        ])
+    
+    def test_register_and_validate_many(self):
+        """Test registered tools are compiled and batches validate."""
+        self.validator.register_tool(ToolDefinition(
+            name='resize',
+            description='Resize an image',
+            parameters={'width': {'type': 'integer'}, 'scale': {'type': 'number'}},
+            required_params=['width'],
+            returns='Image'
+        ))
+        results = self.validator.validate_many([
+            ('resize', {'width': 10, 'scale': 1.5}),
+            ('resize', {'width': '10'}),
+            ('get_pattern', {'pattern_id': 'lazy_init'}),
+        ])
+        self.assertEqual([r.is_valid for r in results], [True, False, True])
+        
+        # Other instances see tools registered through the shared registry
+        self.assertTrue(ToolValidator().validate('resize', {'width': 3}).is_valid)
+
+
+class TestToolCachePolicy(unittest.TestCase):
+    """Test per-tool result caching."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = SkillCache(Path(self.temp_dir) / 'cache.db')
+        self.validator = ToolValidator(cache=self.cache)
+        self.runs = 0
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def executor(self, tool_name, parameters):
+        self.runs += 1
+        return None
+    
+    def run_twice(self, tool_name, parameters):
+        for _ in range(2):
+            call = self.validator.create_call(tool_name, parameters)
+            self.validator.execute(call, self.executor)
+        return call
+    
+    def test_negative_results_cached(self):
+        """Test falsy results are cached when the tool opts in."""
+        call = self.run_twice('get_pattern', {'pattern_id': 'missing'})
+        self.assertEqual(self.runs, 1)
+        self.assertEqual(call.status, ToolStatus.CACHED)
+        self.assertIsNone(call.result)
+    
+    def test_side_effecting_tools_not_cached(self):
+        """Test cache tools and side-effecting tools always execute."""
+        self.run_twice('cache_set', {'key': 'k', 'value': 1})
+        self.run_twice('execute_skill', {'skill_id': 'lint-fixer'})
+        self.assertEqual(self.runs, 4)
+        
+        self.validator.execute(self.validator.create_call('cache_set', {'key': 'k', 'value': 1}))
+        self.assertEqual(
+            self.validator.execute(self.validator.create_call('cache_get', {'key': 'k'})).status,
+            ToolStatus.SUCCESS
+        )
+        # Only the value written by cache_set itself is stored
+        self.assertEqual(self.cache.get_stats()['total_entries'], 1)
+
+
+class TestToolExecutionEngine(unittest.TestCase):
+    """Test concurrent tool execution."""
+    
+    def setUp(self):
+        self.validator = ToolValidator()
+        self.active = 0
+        self.peak = 0
+        self.executed = []
+        self.lock = threading.Lock()
+    
+    def slow_executor(self, tool_name, parameters):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.executed.append(parameters.get('pattern_id'))
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        if parameters['pattern_id'] == 'slow':
+            time.sleep(0.5)
+        return {'pattern': parameters['pattern_id']}
+    
+    def calls(self, ids):
+        return [self.validator.create_call('get_pattern', {'pattern_id': i}) for i in ids]
+    
+    def test_concurrency_limit_and_dedup(self):
+        """Test per-tool concurrency and in-flight dedup."""
+        engine = ToolExecutionEngine(
+            self.validator, max_workers=8, executor=self.slow_executor,
+            limits={'get_pattern': ToolLimits(max_concurrent=2)}
+        )
+        try:
+            results = list(engine.run(self.calls(['a', 'b', 'c', 'd', 'a', 'a'])))
+        finally:
+            engine.shutdown()
+        
+        self.assertEqual(len(results), 6)
+        self.assertTrue(all(c.status == ToolStatus.SUCCESS for c in results))
+        self.assertLessEqual(self.peak, 2)
+        self.assertEqual(sorted(self.executed), ['a', 'b', 'c', 'd'])
+        self.assertEqual(engine.stats['deduplicated'], 2)
+    
+    def test_history_counts_deduplicated_calls(self):
+        """Test each deduplicated call is counted in the validator stats."""
+        engine = ToolExecutionEngine(self.validator, executor=self.slow_executor)
+        try:
+            results = list(engine.run(self.calls(['a', 'a'])))
+        finally:
+            engine.shutdown()
+        
+        self.assertEqual(engine.stats['deduplicated'], 1)
+        self.assertEqual(self.executed, ['a'])
+        self.assertEqual(len(results), 2)
+        stats = self.validator.get_stats()
+        self.assertEqual(stats['total_calls'], 2)
+        self.assertEqual(stats['successful'], 2)
+        self.assertEqual(stats['success_rate'], 1.0)
+    
+    def test_deadline(self):
+        """Test calls past their deadline come back as failed."""
+        engine = ToolExecutionEngine(self.validator, executor=self.slow_executor)
+        try:
+            start = time.monotonic()
+            results = {c.parameters.get('pattern_id'): c for c in engine.run(
+                self.calls(['fast', 'slow']) + [self.validator.create_call('get_pattern', {})],
+                timeout=0.2
+            )}
+            elapsed = time.monotonic() - start
+        finally:
+            engine.shutdown(wait=False)
+        
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(results['fast'].status, ToolStatus.SUCCESS)
+        self.assertEqual(results['slow'].status, ToolStatus.FAILED)
+        self.assertEqual(results[None].status, ToolStatus.INVALID)
+        self.assertIn("Timed out", results['slow'].validation_errors)
+        self.assertEqual(engine.stats['timed_out'], 1)
+    
+    def test_tool_timeout_starts_at_submission(self):
+        """Test queued calls are not charged for time spent waiting on a slot."""
+        def executor(tool_name, parameters):
+            time.sleep(0.3)
+            return {'pattern': parameters['pattern_id']}
+        
+        engine = ToolExecutionEngine(
+            self.validator, executor=executor,
+            limits={'get_pattern': ToolLimits(max_concurrent=1, timeout=0.5)}
+        )
+        try:
+            results = list(engine.run(self.calls(['a', 'b', 'c', 'd'])))
+        finally:
+            engine.shutdown()
+        
+        self.assertEqual([c.status for c in results], [ToolStatus.SUCCESS] * 4)
+        self.assertEqual(engine.stats['timed_out'], 0)
+    
+    def test_waiting_call_sleeps_until_slot_frees(self):
+        """Test a batch waiting on another batch's slot is woken, not polling."""
+        release = threading.Event()
+        
+        def executor(tool_name, parameters):
+            if parameters['pattern_id'] == 'holder':
+                release.wait(5)
+            return {}
+        
+        engine = ToolExecutionEngine(
+            self.validator, executor=executor,
+            limits={'get_pattern': ToolLimits(max_concurrent=1)}
+        )
+        attempts = []
+        dispatch = engine._dispatch
+        
+        def counting_dispatch(call):
+            attempts.append(call.parameters['pattern_id'])
+            return dispatch(call)
+        
+        try:
+            holder = threading.Thread(target=lambda: list(engine.run(self.calls(['holder']))))
+            holder.start()
+            while not engine._active.get('get_pattern'):
+                time.sleep(0.001)
+            engine._dispatch = counting_dispatch
+            threading.Timer(0.2, release.set).start()
+            results = list(engine.run(self.calls(['waiter'])))
+            holder.join(5)
+        finally:
+            engine.shutdown()
+        
+        self.assertEqual(results[0].status, ToolStatus.SUCCESS)
+        self.assertLessEqual(attempts.count('waiter'), 3)
+    
+    def test_token_bucket(self):
+        """Test token bucket refill with an injected clock."""
+        now = [0.0]
+        bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+        self.assertAlmostEqual(bucket.wait_time(), 0.5)
+        now[0] = 0.5
+        self.assertTrue(bucket.try_acquire())
+
+
+class TestQueryClassifier(unittest.TestCase):
+    """Test the shared query classifier."""
+    
+    def setUp(self):
+        """Create classifier."""
+        self.classifier = QueryClassifier()
+    
+    def test_classification(self):
+        """Test query type, intent, entities and skills in one call."""
+        result = self.classifier.classify(
+            "Fix the React lint error react-hooks/exhaustive-deps in Component.tsx"
+        )
+        self.assertEqual(result.query_type, 'lint_fix')
+        self.assertEqual(result.intent, 'lint')
+        self.assertEqual(result.entities, ('Component.tsx', 'react-hooks/exhaustive-deps'))
+        self.assertEqual(result.skills, ('lint-fixer', 'react-patterns'))
+    
+    def test_rule_priority(self):
+        """Test thinking and orchestrator rule tables keep their own order."""
+        result = self.classifier.classify("Write a PDF report")
+        self.assertEqual(result.query_type, 'generate')
+        self.assertEqual(result.intent, 'document')
+        self.assertEqual(self.classifier.classify("hello").intent, 'general')
+    
+    def test_results_are_cached(self):
+        """Test repeated queries reuse the cached classification."""
+        self.assertIs(self.classifier.classify("find docs"), self.classifier.classify("find docs"))
+
+
+class SlowThinking(ProgrammaticThinking):
+    """Thinking engine whose steps sleep and can be told to fail."""
+    
+    def __init__(self, fail=(), delay=0.05, **kwargs):
+        super().__init__(**kwargs)
+        self.fail = set(fail)
+        self.delay = delay
+    
+    def _execute_step(self, action, context=None):
+        time.sleep(self.delay)
+        failed = action['action'] in self.fail
+        return ThinkingStep(
+            id=self._next_step_id(),
+            phase=ThinkingPhase.EXECUTE,
+            description=f"Execute: {action['action']}",
+            action=action['action'],
+            expected_output=None,
+            actual_output={'action': action['action'],
+                           'status': 'failed' if failed else 'completed'},
+            status=ExecutionStatus.FAILED if failed else ExecutionStatus.SUCCESS,
+            confidence=0.85
+        )
+
+
+class TestProgrammaticThinking(unittest.TestCase):
+    """Test the thinking engine."""
+    
+    def test_think_lint_fix(self):
+        """Test a full thinking process succeeds."""
+        result = ProgrammaticThinking().think("Fix the lint error in Component.tsx")
+        self.assertTrue(result.success)
+        executed = [s.action for s in result.steps if s.phase == ThinkingPhase.EXECUTE]
+        self.assertEqual(executed, ['detect_error', 'find_pattern', 'apply_fix', 'validate'])
+    
+    def test_independent_steps_run_concurrently(self):
+        """Test ready steps are scheduled in parallel."""
+        engine = SlowThinking(max_concurrent=4)
+        actions = [{'id': f'a{i}', 'action': f'a{i}', 'depends_on': []} for i in range(4)]
+        start = time.perf_counter()
+        steps, _ = engine._execute_plan(actions)
+        self.assertEqual(len(steps), 4)
+        self.assertLess(time.perf_counter() - start, 0.15)
+    
+    def test_step_pool_is_per_engine_and_lone_steps_run_inline(self):
+        """Test plans reuse one pool and sequential steps skip it."""
+        engine = SlowThinking(delay=0, max_concurrent=2)
+        threads = []
+        engine._execute_step = lambda action, context=None: (
+            threads.append(threading.current_thread()) or
+            ThinkingStep(id=engine._next_step_id(), phase=ThinkingPhase.EXECUTE,
+                         description='', action=action['action'], expected_output=None,
+                         actual_output=None, status=ExecutionStatus.SUCCESS, confidence=0.85)
+        )
+        
+        engine._execute_plan([{'action': 'a'}, {'action': 'b'}])
+        self.assertEqual(threads, [threading.current_thread()] * 2)
+        self.assertIsNone(engine._pool)
+        
+        parallel = [{'id': f'p{i}', 'action': f'p{i}', 'depends_on': []} for i in range(2)]
+        engine._execute_plan(parallel)
+        pool = engine._pool
+        engine._execute_plan(parallel)
+        self.assertIs(engine._pool, pool)
+        engine.close()
+        self.assertIsNone(engine._pool)
+    
+    def test_failure_skips_only_dependent_branch(self):
+        """Test a failed step skips its dependents but not other branches."""
+        engine = SlowThinking(fail={'left'}, delay=0, max_concurrent=2)
+        actions = [
+            {'id': 'left', 'action': 'left', 'depends_on': []},
+            {'id': 'left_next', 'action': 'left_next', 'depends_on': ['left']},
+            {'id': 'right', 'action': 'right', 'depends_on': []},
+            {'id': 'right_next', 'action': 'right_next', 'depends_on': ['right']},
+        ]
+        steps, learnings = engine._execute_plan(actions)
+        self.assertEqual([s.action for s in steps], ['left', 'right', 'right_next'])
+        self.assertIn('Step 1 skipped: dependency failed', learnings)
+    
+    def test_successful_plan_is_reused(self):
+        """Test repeat query shapes skip planning, across engines via cache."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cache = SkillCache(os.path.join(temp_dir, 'test_cache.db'))
+            engine = ProgrammaticThinking(cache=cache)
+            first = engine.think("Fix the lint error in Component.tsx")
+            second = engine.think("please fix this lint bug in Component.tsx")
+            self.assertEqual(first.steps[1].action, 'generate_plan')
+            self.assertEqual(second.steps[1].action, 'load_cached_plan')
+            
+            other = ProgrammaticThinking(cache=cache)
+            third = other.think("Fix the lint error in Component.tsx")
+            self.assertEqual(third.steps[1].action, 'load_cached_plan')
+        finally:
+            shutil.rmtree(temp_dir)
+    
+    def test_plan_memo_is_thread_safe(self):
+        """Test concurrent plan lookups and inserts keep the LRU bounded."""
+        engine = ProgrammaticThinking()
+        engine.PLAN_MEMO_SIZE = 4
+        plan = {'actions': []}
+        
+        def churn(tid):
+            for i in range(500):
+                engine._remember_plan(f"plan:{tid}:{i % 8}", plan)
+                engine._get_cached_plan(f"plan:{(tid + 1) % 8}:{i % 8}")
+        
+        threads = [threading.Thread(target=churn, args=(t,)) for t in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(engine._plan_memo), 4)
+    
+    def test_failed_plan_is_not_recorded(self):
+        """Test plans with failed steps are not memoized."""
+        engine = SlowThinking(fail={'process'}, delay=0)
+        engine.think("hello there")
+        result = engine.think("hello there")
+        self.assertEqual(result.steps[1].action, 'generate_plan')
+    
+    def test_think_stream_yields_steps_then_result(self):
+        """Test the async variant streams every step and the result."""
+        async def collect():
+            return [e async for e in ProgrammaticThinking().think_stream("Generate a doc")]
+        
+        events = asyncio.run(collect())
+        result = events[-1].result
+        self.assertIsNotNone(result)
+        self.assertEqual([e.step for e in events[:-1]], result.steps)
+        self.assertEqual(events[0].step.phase, ThinkingPhase.ANALYZE)
+        self.assertGreater(events[0].step.duration_ns, 0)
+        self.assertGreater(result.total_duration_ms, 0)
+    
+    def test_think_stream_phase_timeout(self):
+        """Test a slow phase raises TimeoutError."""
+        async def run():
+            async for _ in SlowThinking(delay=0.5).think_stream("hello", phase_timeout=0.05):
+                pass
+        
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(run())
+    
+    def test_think_stream_stops_plan_on_timeout_or_cancel(self):
+        """Test abandoned streams let the running step finish and drop the rest."""
+        for mode in ('timeout', 'cancel'):
+            engine = SlowThinking(delay=0.2, max_concurrent=1)
+            actions = [{'id': f'a{i}', 'action': f'a{i}', 'depends_on': []} for i in range(3)]
+            plan = {'actions': actions}
+            engine._plan = lambda query, analysis, tools=None: (engine._cached_plan_step(plan), plan)
+            executed = []
+            slow_step = engine._execute_step
+            engine._execute_step = lambda action, context=None: (
+                executed.append(action['action']) or slow_step(action, context)
+            )
+            
+            async def run():
+                timeout = 0.05 if mode == 'timeout' else None
+                task = asyncio.ensure_future(self._drain(engine.think_stream("hello", phase_timeout=timeout)))
+                if mode == 'cancel':
+                    await asyncio.sleep(0.1)
+                    task.cancel()
+                with self.assertRaises((asyncio.TimeoutError, asyncio.CancelledError)):
+                    await task
+                await asyncio.sleep(0.6)
+            
+            asyncio.run(run())
+            self.assertEqual(executed, ['a0'], mode)
+            engine.close()
+    
+    @staticmethod
+    async def _drain(stream):
+        async for _ in stream:
+            pass
+    
+    def test_actions_without_dependencies_are_sequential(self):
+        """Test legacy plans keep break-on-failure semantics."""
+        engine = SlowThinking(fail={'b'}, delay=0)
+        actions = [{'action': 'a'}, {'action': 'b'}, {'action': 'c'}]
+        steps, _ = engine._execute_plan(actions)
+        self.assertEqual([s.action for s in steps], ['a', 'b'])
+
+
+class TestOrchestrator(unittest.TestCase):
+    """Test orchestrator batch execution."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self._saved_cache = cache_module._cache
+        cache_module._cache = SkillCache(os.path.join(self.temp_dir, 'test_cache.db'))
+        self.orchestrator = UnifiedOrchestrator(str(Path(__file__).parent.parent))
+    
+    def tearDown(self):
+        cache_module._cache = self._saved_cache
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def collect(self, *args, **kwargs):
+        async def run():
+            return [item async for item in self.orchestrator.execute_many(*args, **kwargs)]
+        return asyncio.run(run())
+    
+    def test_route_runs_off_event_loop(self):
+        """Test the orchestrator routes (and hits the usage store) off the loop."""
+        orchestrator = self.orchestrator
+        threads = []
+        route = orchestrator.router.route
+        
+        def recording_route(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return route(*args, **kwargs)
+        
+        orchestrator.router.route = recording_route
+        asyncio.run(orchestrator._execute_uncached("e1", "Fix lint", {}, 0.0, time.time()))
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+    
+    def test_execute_many_ordered_and_cached(self):
+        """Test ordering, in-batch dedup and bulk cache reuse."""
+        requests = [("Fix lint error", {'n': i % 3}) for i in range(6)]
+        items = self.collect(requests, concurrency=2, ordered=True)
+        
+        self.assertEqual([item.index for item in items], list(range(6)))
+        self.assertTrue(all(i.result.status == OrchestratorStatus.SUCCESS for i in items))
+        self.assertEqual(items[0].result.output, items[3].result.output)
+        self.assertEqual(self.orchestrator.cache.get_stats()['total_entries'], 3)
+        
+        again = self.collect(requests)
+        self.assertTrue(all(item.result.cache_hit for item in again))
+        metrics = self.orchestrator.get_metrics()
+        self.assertEqual(metrics['total_executions'], 12)
+        self.assertEqual(metrics['cache_hit_rate'], 0.5)
+        self.assertIn('lint-fixer', metrics['by_skill'])
+        self.assertIn('cacheHitRate', metrics['targets'])
+        self.assertEqual(
+            asyncio.run(self.orchestrator.execute(*requests[1])).status,
+            OrchestratorStatus.CACHED
+        )
+    
+    def test_single_cache_lookup_per_request(self):
+        """Test routing reuses the execute probe instead of reading again."""
+        reads = []
+        get = self.orchestrator.cache.get
+        self.orchestrator.cache.get = lambda key, *args: reads.append(key) or get(key, *args)
+        
+        first = asyncio.run(self.orchestrator.execute("Fix lint error", {'file': 'a.tsx'}))
+        second = asyncio.run(self.orchestrator.execute("Fix lint error", {'file': 'a.tsx'}))
+        
+        self.assertEqual(len(reads), 2)
+        self.assertEqual(first.lookups, {'cache_read': 1, 'cache_write': 1, 'quota_write': 1})
+        self.assertEqual(second.lookups, {'cache_read': 1})
+        self.assertEqual(
+            self.orchestrator.lookup_counts, {'cache_read': 2, 'cache_write': 1, 'quota_write': 1}
+        )
+        self.assertEqual(self.orchestrator.router.route("q", 0.1, cached={'output': 1}).model, 'cache')
+    
+    def test_batch_counts_bulk_operations(self):
+        """Test execute_many counts its bulk read, batched write and quota transactions."""
+        probes = []
+        route = self.orchestrator.router.route
+        
+        def recording_route(query, complexity, cached=None):
+            probes.append(cached)
+            return route(query, complexity, cached)
+        
+        self.orchestrator.router.route = recording_route
+        requests = [("Fix lint error", {'n': i % 3}) for i in range(6)]
+        items = sorted(self.collect(requests), key=lambda item: item.index)
+        
+        self.assertEqual(probes, [None] * 3)
+        self.assertEqual(
+            self.orchestrator.lookup_counts, {'cache_read': 1, 'cache_write': 1, 'quota_write': 3}
+        )
+        self.assertEqual([item.result.lookups for item in items],
+                         [{'quota_write': 1}] * 3 + [{}] * 3)
+    
+    def test_execute_many_bounded_concurrency(self):
+        """Test the semaphore bounds executions and queue time is measured."""
+        state = {'active': 0, 'peak': 0}
+        execute = self.orchestrator._execute_uncached
+        
+        async def slow(*args):
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+            await asyncio.sleep(0.02)
+            state['active'] -= 1
+            return await execute(*args)
+        
+        self.orchestrator._execute_uncached = slow
+        items = self.collect([("generate docs", {'n': i}) for i in range(8)], concurrency=2)
+        
+        self.assertEqual(len(items), 8)
+        self.assertEqual(state['peak'], 2)
+        self.assertGreater(max(item.queue_ms for item in items), 40)
+        self.assertTrue(all(item.execution_ms >= 15 for item in items))
+
+
+class TestFreeTierRouter(unittest.TestCase):
+    """Test quota-aware routing."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'usage.db')
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_usage_persists_and_rolls_over(self):
+        """Test counters are shared through the database and reset daily."""
+        now = [datetime(2026, 1, 1, 23, 0, tzinfo=timezone.utc)]
+        first = UsageStore(self.db_path, clock=lambda: now[0])
+        second = UsageStore(self.db_path, clock=lambda: now[0])
+        
+        self.assertTrue(first.try_consume('gemini', limit=2))
+        self.assertTrue(second.try_consume('gemini', limit=2))
+        self.assertFalse(first.try_consume('gemini', limit=2))
+        self.assertEqual(second.used('gemini'), 2)
+        
+        now[0] = datetime(2026, 1, 2, 0, 30, tzinfo=timezone.utc)
+        self.assertEqual(first.used('gemini'), 0)
+        self.assertTrue(first.try_consume('gemini', limit=2))
+    
+    def test_spillover_near_quota(self):
+        """Test requests spill to the next tier near quota exhaustion."""
+        router = FreeTierRouter(
+            quotas={'gemini': 10}, usage_store=UsageStore(self.db_path),
+            spill_threshold=0.8, burst=100
+        )
+        models = [router.route(f"q{i}", 0.1).model for i in range(10)]
+        
+        self.assertEqual(models, ['gemini'] * 8 + ['deepseek'] * 2)
+        self.assertEqual(router.spillovers, 2)
+        self.assertEqual(router.daily_usage, {'gemini': 8, 'deepseek': 2, 'local': 0})
+        self.assertEqual(router.get_usage()['gemini']['remaining'], 2)
+    
+    def test_token_bucket_smoothing(self):
+        """Test bursts beyond the bucket spill before the quota is reached."""
+        router = FreeTierRouter(quotas={'gemini': 1500}, burst=3)
+        models = [router.route(f"q{i}", 0.1).model for i in range(5)]
+        self.assertEqual(models, ['gemini'] * 3 + ['deepseek'] * 2)
+    
+    def test_quota_refusal_returns_token(self):
+        """Test a request refused by the quota does not spend a bucket token."""
+        router = FreeTierRouter(quotas={'gemini': 2}, spill_threshold=1.0, burst=5)
+        models = [router.route(f"q{i}", 0.1).model for i in range(5)]
+        self.assertEqual(models, ['gemini'] * 2 + ['deepseek'] * 3)
+        self.assertGreaterEqual(router._buckets['gemini'].tokens, 2.99)
+    
+    def test_unlimited_usage_is_batched(self):
+        """Test unlimited tiers skip the store until a flush."""
+        store = UsageStore(self.db_path)
+        router = FreeTierRouter(usage_store=store, flush_every=4, burst=100)
+        with patch.object(store, 'try_consume', wraps=store.try_consume) as consume:
+            for i in range(3):
+                router.route(f"q{i}", 0.9)
+            consume.assert_not_called()
+        self.assertEqual(store.used('local'), 0)
+        router.route("q3", 0.9)
+        self.assertEqual(store.used('local'), 4)
+        router.route("q4", 0.5)
+        self.assertEqual(router.daily_usage['deepseek'], 1)
+        self.assertEqual(store.used('deepseek'), 1)
+    
+    def test_buffered_usage_flushed_on_shutdown(self):
+        """Test counts below flush_every reach the store at close and exit."""
+        store = UsageStore(self.db_path)
+        router = FreeTierRouter(usage_store=store, flush_every=10, burst=100)
+        for i in range(3):
+            router.route(f"q{i}", 0.9)
+        self.assertEqual(store.used('local'), 0)
+        orchestrator_module._flush_routers()
+        self.assertEqual(store.used('local'), 3)
+        
+        router.route("q3", 0.9)
+        router.close()
+        self.assertEqual(store.used('local'), 4)
+    
+    def test_routes_by_expected_latency(self):
+        """Test stub backends with injected latency steer routing."""
+        router = FreeTierRouter(burst=1000)
+        delays = {'gemini': 0.03, 'deepseek': 0.001, 'local': 0.01}
+        for model, delay in delays.items():
+            async def backend(payload, delay=delay):
+                await asyncio.sleep(delay)
+                return payload
+            router.register_backend(model, backend)
+        
+        async def warm_up():
+            for model in delays:
+                await router.call(model, {})
+        asyncio.run(warm_up())
+        
+        self.assertEqual(router.route("q", 0.1).model, 'deepseek')
+        self.assertEqual(router.route("q", 0.9).model, 'local')
+        self.assertGreater(router.get_health()['gemini']['latency_ms'], 20)
+    
+    def test_failed_calls_count_toward_latency(self):
+        """Test slow failures raise expected latency, not just the error rate."""
+        health = BackendHealth(alpha=0.5)
+        health.start()
+        health.finish(10, True)
+        health.start()
+        health.finish(1010, False)
+        self.assertEqual(health.latency_ms, 510)
+        self.assertGreater(health.expected_ms(), 510)
+    
+    def test_cold_backend_uses_prior(self):
+        """Test a backend with no data is not assumed to be instant."""
+        router = FreeTierRouter(burst=1000)
+        router.register_backend('deepseek', lambda payload: payload)
+        asyncio.run(router.call('deepseek', {}))
+        self.assertEqual(router.get_health()['gemini']['latency_ms'], 100.0)
+        self.assertEqual(router.route("q", 0.1).model, 'deepseek')
+    
+    def test_circuit_breaker_ejects_failing_backend(self):
+        """Test a failing backend is skipped until its cooldown passes."""
+        now = [0.0]
+        router = FreeTierRouter(burst=1000, failure_threshold=2)
+        router.health['gemini'].breaker.clock = lambda: now[0]
+        
+        def broken(payload):
+            raise RuntimeError("upstream 500")
+        router.register_backend('gemini', broken)
+        
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                asyncio.run(router.call('gemini', {}))
+        self.assertEqual(router.get_health()['gemini']['circuit'], 'open')
+        self.assertEqual(router.route("q", 0.1).model, 'deepseek')
+        with self.assertRaises(BackendUnavailable):
+            asyncio.run(router.call('gemini', {}))
+        
+        now[0] = 31.0
+        self.assertEqual(router.route("q", 0.1).model, 'gemini')
+        router.register_backend('gemini', lambda payload: 'ok')
+        self.assertEqual(asyncio.run(router.call('gemini', {})), 'ok')
+        self.assertEqual(router.health['gemini'].breaker.state, CircuitState.CLOSED)
+    
+    def test_complexity_estimate(self):
+        """Test complexity comes from request size, not confidence."""
+        small = FreeTierRouter.estimate_complexity("Fix lint error", {'file': 'a.tsx'})
+        large = FreeTierRouter.estimate_complexity("Refactor", {'code': 'x' * 20000})
+        self.assertLess(small, 0.3)
+        self.assertGreaterEqual(large, 0.7)
+
+
+class TestTracing(unittest.TestCase):
+    """Test request tracing."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self._saved_tracer = tracing_module._tracer
+        self._saved_cache = cache_module._cache
+        cache_module._cache = SkillCache(os.path.join(self.temp_dir, 'test_cache.db'))
+        self.tracer = tracing_module._tracer = Tracer()
+    
+    def tearDown(self):
+        tracing_module._tracer = self._saved_tracer
+        cache_module._cache = self._saved_cache
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_disabled_is_noop(self):
+        """Test spans cost nothing and record nothing when disabled."""
+        with span('anything') as s:
+            s.set(ignored=True)
+        self.assertIs(span('a'), span('b'))
+        self.assertEqual(len(self.tracer.spans), 0)
+    
+    def test_orchestrator_breakdown(self):
+        """Test execute records nested stage spans in one trace."""
+        self.tracer.enable()
+        orchestrator = UnifiedOrchestrator(str(Path(__file__).parent.parent))
+        asyncio.run(orchestrator.execute("Fix lint error", {'file': 'a.tsx'}))
+        
+        root = [s for s in self.tracer.spans if s.name == 'orchestrator.execute'][0]
+        names = [s.name for s in self.tracer.trace(root.trace_id)]
+        self.assertEqual(names, [
+            'orchestrator.execute', 'cache.read', 'orchestrator.classify',
+            'orchestrator.select_skill', 'orchestrator.score', 'orchestrator.route',
+            'cache.write'
+        ])
+        children = [s for s in self.tracer.spans if s.parent_id == root.span_id]
+        self.assertEqual(len(children), 6)
+        self.assertEqual(root.attributes['skill'], 'lint-fixer')
+    
+    def test_thinking_steps_nest_across_threads(self):
+        """Test plan steps run in the pool keep their parent span."""
+        self.tracer.enable()
+        ProgrammaticThinking(max_concurrent=2).think("Fix lint error in App.tsx")
+        
+        root = [s for s in self.tracer.spans if s.name == 'thinking.think'][0]
+        steps = [s for s in self.tracer.spans if s.name == 'thinking.step']
+        self.assertGreater(len(steps), 1)
+        self.assertTrue(all(s.parent_id == root.span_id for s in steps))
+    
+    def test_exporters(self):
+        """Test Chrome trace and JSONL export."""
+        chrome_path = os.path.join(self.temp_dir, 'trace.json')
+        self.tracer.enable(ChromeTraceExporter(chrome_path))
+        validator = ToolValidator()
+        validator.execute(validator.create_call('get_pattern', {'pattern_id': 'x'}))
+        self.tracer.close()
+        
+        with open(chrome_path) as f:
+            events = json.load(f)
+        self.assertEqual([e['name'] for e in events], ['tool.call', 'tool.execute'])
+        self.assertTrue(all(e['ph'] == 'X' for e in events))
+        
+        jsonl_path = os.path.join(self.temp_dir, 'trace.jsonl')
+        self.tracer.enable(JsonlSink(jsonl_path))
+        with span('custom', n=1):
+            pass
+        with open(jsonl_path) as f:
+            record = json.loads(f.readline())
+        self.assertEqual(record['name'], 'custom')
+        self.assertEqual(record['attributes'], {'n': 1})
+
+
+class TestExecutionMetrics(unittest.TestCase):
+    """Test rolling execution metrics."""
+    
+    def result(self, skill='LLM', model='gemini', status=OrchestratorStatus.SUCCESS,
+               duration_ms=10, cost=0.0):
+        return ExecutionResult(
+            execution_id='x', skill_id=skill, status=status, output=None,
+            confidence=0.9, cost=cost, duration_ms=duration_ms,
+            cache_hit=status == OrchestratorStatus.CACHED, model_used=model
+        )
+    
+    def test_window_percentiles_and_breakdown(self):
+        """Test percentiles and per-skill/model windows."""
+        metrics = ExecutionMetrics()
+        for ms in range(1, 101):
+            metrics.record(self.result(duration_ms=ms))
+        metrics.record(self.result(skill='docx', model='cache', status=OrchestratorStatus.CACHED))
+        
+        stats = metrics.snapshot()
+        self.assertEqual(stats['count'], 101)
+        self.assertAlmostEqual(stats['p50_ms'], 50, delta=50 * 0.25)
+        self.assertAlmostEqual(stats['p99_ms'], 99, delta=99 * 0.25)
+        self.assertEqual(stats['success_rate'], 1.0)
+        self.assertEqual(metrics.snapshot(skill='docx')['cache_hit_rate'], 1.0)
+        self.assertEqual(set(metrics.breakdown('model')), {'gemini', 'cache'})
+    
+    def test_window_expires(self):
+        """Test old buckets leave the window but not lifetime totals."""
+        now = [0.0]
+        metrics = ExecutionMetrics(window_seconds=60, bucket_seconds=10, clock=lambda: now[0])
+        metrics.record(self.result(status=OrchestratorStatus.FAILED))
+        now[0] = 30
+        metrics.record(self.result())
+        self.assertEqual(metrics.snapshot()['count'], 2)
+        
+        now[0] = 65
+        stats = metrics.snapshot()
+        self.assertEqual((stats['count'], stats['failed']), (1, 0))
+        now[0] = 200
+        self.assertEqual(metrics.snapshot()['count'], 0)
+        self.assertEqual(metrics.lifetime()['total_executions'], 2)
+    
+    def test_targets(self):
+        """Test manifest performance targets are evaluated."""
+        metrics = ExecutionMetrics()
+        metrics.record(self.result(duration_ms=900))
+        report = metrics.check_targets({'cacheHitRate': 0.9, 'responseTimeMs': 500,
+                                        'costPer1kQueries': 0.0})
+        self.assertFalse(report['cacheHitRate']['met'])
+        self.assertFalse(report['responseTimeMs']['met'])
+        self.assertTrue(report['costPer1kQueries']['met'])
+
+
+class TestEnterpriseRAG(unittest.TestCase):
+    """Test the sync and async query API."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self._saved_cache = cache_module._cache
+        cache_module._cache = SkillCache(os.path.join(self.temp_dir, 'test_cache.db'))
+        self.rag = api.EnterpriseRAG()
+        self.rag._orchestrator = UnifiedOrchestrator(str(Path(__file__).parent.parent))
+    
+    def tearDown(self):
+        cache_module._cache = self._saved_cache
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_sync_calls_share_background_loop(self):
+        """Test sync calls reuse one loop instead of one per call."""
+        first = self.rag.query("Fix lint error")
+        loop = api._background_loop.loop
+        second = self.rag.query("Fix lint error")
+        
+        self.assertIs(api._background_loop.loop, loop)
+        self.assertFalse(first.cache_hit)
+        self.assertTrue(second.cache_hit)
+    
+    def test_single_cache_entry_per_request(self):
+        """Test the API projects the orchestrator entry instead of caching twice."""
+        self.rag.query("Fix lint error", {'file': 'a.tsx'})
+        
+        self.assertEqual(self.rag.cache.get_stats()['total_entries'], 1)
+        entry = self.rag.cache.get(request_fingerprint("Fix lint error", {'file': 'a.tsx'}))
+        self.assertEqual(entry['skill_id'], 'lint-fixer')
+        
+        cached = self.rag.query("Fix lint error", {'file': 'a.tsx'})
+        self.assertTrue(cached.cache_hit)
+        self.assertEqual(cached.answer, entry['output'])
+    
+    def test_sync_api_inside_running_loop(self):
+        """Test sync calls work from inside a running loop, async ones natively."""
+        async def caller():
+            sync_result = self.rag.batch_query(["generate docs", "Fix lint error"])
+            async_result = await self.rag.aquery("generate docs")
+            batch = await self.rag.abatch_query(["Fix lint error", "new query"])
+            return sync_result, async_result, batch
+        
+        sync_result, async_result, batch = asyncio.run(caller())
+        self.assertEqual([r.skill_used for r in sync_result], ['LLM', 'lint-fixer'])
+        self.assertTrue(async_result.cache_hit)
+        self.assertEqual([r.cache_hit for r in batch], [True, False])
+
+
+class TestHashing(unittest.TestCase):
+    """Test canonical hashing."""
+    
+    def test_stable_across_dict_order(self):
+        """Test key order does not change the hash."""
+        a = {'file': 'a.tsx', 'meta': {'line': 1, 'col': 2}}
+        b = {'meta': {'col': 2, 'line': 1}, 'file': 'a.tsx'}
+        
+        self.assertEqual(stable_hash("q", a), stable_hash("q", b))
+        self.assertEqual(len(stable_hash("q", a)), 32)
+    
+    def test_distinct_types_and_parts(self):
+        """Test values that print alike hash differently."""
+        self.assertNotEqual(stable_hash("1"), stable_hash(1))
+        self.assertNotEqual(stable_hash("a", "bc"), stable_hash("ab", "c"))
+        self.assertNotEqual(stable_hash("x"), stable_hash(b"x"))
+        self.assertNotEqual(stable_hash(Path("a")), stable_hash("a"))
+    
+    def test_extra_types(self):
+        """Test datetimes, paths, sets and mixed keys encode stably."""
+        when = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        
+        self.assertEqual(
+            stable_hash({'at': when, 'tags': {'b', 'a'}, 'path': Path("src/a.ts")}),
+            stable_hash({'path': Path("src/a.ts"), 'tags': {'a', 'b'}, 'at': when})
+        )
+        self.assertEqual(stable_hash({1: 'a', 'b': 2}), stable_hash({'b': 2, 1: 'a'}))
+        
+        with self.assertRaises(TypeError):
+            stable_hash(object())
+    
+    def test_callers_share_scheme(self):
+        """Test cache and fingerprint keys use the canonical hash."""
+        self.assertEqual(request_fingerprint("q"), stable_hash("q", {}))
+        self.assertEqual(SkillCache.generate_key("q", n=1), stable_hash(("q",), {'n': 1}))
+
+
+class TestRAGServer(unittest.TestCase):
+    """Test the local server and its client."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self._saved_cache = cache_module._cache
+        cache_module._cache = SkillCache(os.path.join(self.temp_dir, 'test_cache.db'))
+        self.rag = api.EnterpriseRAG()
+        self.rag._orchestrator = UnifiedOrchestrator(str(Path(__file__).parent.parent))
+        self.loop = api.BackgroundLoop()
+        self.servers = []
+    
+    def tearDown(self):
+        for server in self.servers:
+            self.loop.run(server.close())
+        self.loop.stop()
+        cache_module._cache = self._saved_cache
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _start(self, **address) -> RAGServer:
+        server = RAGServer(self.rag, **address)
+        self.loop.run(server.start())
+        self.servers.append(server)
+        return server
+    
+    def test_unix_socket_keep_alive(self):
+        """Test queries share one connection and the server's warm cache."""
+        server = self._start(socket_path=os.path.join(self.temp_dir, 'rag.sock'))
+        
+        with RAGClient(socket_path=server.socket_path) as client:
+            first = client.query("Fix lint error", {'file': 'a.tsx'})
+            sock = client._conn.sock
+            second = client.query("Fix lint error", {'file': 'a.tsx'})
+            
+            self.assertIs(client._conn.sock, sock)
+        
+        self.assertEqual(first['skill_used'], 'lint-fixer')
+        self.assertFalse(first['cache_hit'])
+        self.assertTrue(second['cache_hit'])
+        self.assertEqual(server.requests, 2)
+    
+    def test_streamed_batch_over_tcp(self):
+        """Test batch results stream back and reassemble in order."""
+        server = self._start(host='127.0.0.1', port=0)
+        queries = ["Fix lint error", "generate docs", "Fix lint error"]
+        
+        with RAGClient(host='127.0.0.1', port=server.port) as client:
+            streamed = dict(client.stream_batch(queries))
+            results = client.batch_query(queries)
+            health = client.health()
+        
+        self.assertEqual(sorted(streamed), [0, 1, 2])
+        self.assertEqual([r['skill_used'] for r in results], ['lint-fixer', 'LLM', 'lint-fixer'])
+        self.assertEqual(health['requests'], 3)
+    
+    def test_patterns_and_errors(self):
+        """Test pattern round trip and JSON error responses."""
+        server = self._start(host='127.0.0.1', port=0)
+        
+        with RAGClient(host='127.0.0.1', port=server.port) as client:
+            client.add_pattern('srv/lazy', 'const x = lazy()', 'Lazy init')
+            self.assertEqual(client.get_pattern('srv/lazy')['code'], 'const x = lazy()')
+            self.assertIsNone(client.get_pattern('missing'))
+            
+            with self.assertRaises(RAGClientError) as bad:
+                client._json('POST', '/query', {'query': ''})
+            self.assertEqual(bad.exception.status, 400)
+            
+            with self.assertRaises(RAGClientError) as wrong:
+                client._json('GET', '/batch')
+            self.assertEqual(wrong.exception.status, 405)
+            
+            # The connection survives error responses
+            self.assertEqual(client.health()['status'], 'ok')
+    
+    def test_malformed_fields_are_rejected(self):
+        """Test bad field types get a 400 instead of a 500."""
+        server = self._start(host='127.0.0.1', port=0)
+        bad_requests = [
+            ('POST', '/query', {'query': 'q', 'min_confidence': 'high'}),
+            ('POST', '/query', {'query': 'q', 'min_confidence': True}),
+            ('POST', '/query', {'query': 'q', 'min_confidence': 2}),
+            ('POST', '/query', {'query': 'q', 'context': ['file']}),
+            ('POST', '/batch', {'queries': ['q'], 'context': 'file'}),
+            ('PUT', '/patterns/p', {'code': 'x', 'description': 'y', 'confidence': None}),
+            ('PUT', '/patterns/p', {'code': 'x', 'description': 'y', 'tags': 'react'}),
+        ]
+        
+        with RAGClient(host='127.0.0.1', port=server.port) as client:
+            for method, path, payload in bad_requests:
+                with self.assertRaises(RAGClientError) as bad:
+                    client._json(method, path, payload)
+                self.assertEqual(bad.exception.status, 400, (method, path, payload))
+            self.assertIsNone(client.get_pattern('p'))
+    
+    def test_malformed_headers_are_rejected(self):
+        """Test negative lengths and header lines without ':' get a 400."""
+        server = self._start(host='127.0.0.1', port=0)
+        heads = [
+            b'POST /query HTTP/1.1\r\nContent-Length: -5\r\n\r\n',
+            b'GET /health HTTP/1.1\r\nNoColonHere\r\n\r\n',
+        ]
+        
+        for head in heads:
+            with socket.create_connection(('127.0.0.1', server.port), timeout=5) as sock:
+                sock.sendall(head)
+                status_line = sock.makefile('rb').readline()
+            self.assertTrue(status_line.startswith(b'HTTP/1.1 400 '), (head, status_line))
+    
+    def test_close_cancels_idle_connections(self):
+        """Test connection handlers end cancelled, not swallowing the cancel."""
+        server = self._start(host='127.0.0.1', port=0)
+        with RAGClient(host='127.0.0.1', port=server.port) as client:
+            client.health()
+            tasks = list(server._connections)
+            self.loop.run(server.close())
+        
+        self.assertEqual(len(tasks), 1)
+        self.assertTrue(tasks[0].cancelled())
+
+
+class TestBenchmarkRunner(unittest.TestCase):
+    """Test benchmark measurement and regression checks."""
+    
+    def test_measure_reports_per_op_time(self):
+        """Test results are per operation and carry their threshold."""
+        case = Case("noop", lambda: None, ops=4, threshold=0.3)
+        result = measure(case, repeat=3, min_time=0.001)
+        
+        self.assertGreater(result['median_us'], 0)
+        self.assertLessEqual(result['min_us'], result['median_us'])
+        self.assertEqual(result['threshold'], 0.3)
+    
+    def test_compare_flags_regressions_past_threshold(self):
+        """Test only cases slower than baseline * (1 + threshold) regress."""
+        def report(**medians):
+            return {'results': {
+                name: {'median_us': us, 'threshold': 0.25} for name, us in medians.items()
+            }}
+        
+        baseline = report(a=100.0, b=100.0, c=100.0)
+        current = report(a=120.0, b=130.0, new=1.0)
+        
+        self.assertEqual([r['case'] for r in compare(current, baseline)], ['b'])
+        self.assertEqual([r['case'] for r in compare(current, baseline, threshold=0.1)], ['a', 'b'])
+
 
 def run_tests():
     """Run all tests."""
@@ -117,6 +1571,23 @@ def run_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestConfig))
     suite.addTests(loader.loadTestsFromTestCase(TestCache))
     suite.addTests(loader.loadTestsFromTestCase(TestRegistry))
+    suite.addTests(loader.loadTestsFromTestCase(TestContextManager))
+    suite.addTests(loader.loadTestsFromTestCase(TestHallucinationPreventer))
+    suite.addTests(loader.loadTestsFromTestCase(TestKeywordAutomaton))
+    suite.addTests(loader.loadTestsFromTestCase(TestBoundedHistory))
+    suite.addTests(loader.loadTestsFromTestCase(TestToolValidator))
+    suite.addTests(loader.loadTestsFromTestCase(TestToolCachePolicy))
+    suite.addTests(loader.loadTestsFromTestCase(TestToolExecutionEngine))
+    suite.addTests(loader.loadTestsFromTestCase(TestQueryClassifier))
+    suite.addTests(loader.loadTestsFromTestCase(TestProgrammaticThinking))
+    suite.addTests(loader.loadTestsFromTestCase(TestOrchestrator))
+    suite.addTests(loader.loadTestsFromTestCase(TestFreeTierRouter))
+    suite.addTests(loader.loadTestsFromTestCase(TestTracing))
+    suite.addTests(loader.loadTestsFromTestCase(TestExecutionMetrics))
+    suite.addTests(loader.loadTestsFromTestCase(TestEnterpriseRAG))
+    suite.addTests(loader.loadTestsFromTestCase(TestHashing))
+    suite.addTests(loader.loadTestsFromTestCase(TestRAGServer))
+    suite.addTests(loader.loadTestsFromTestCase(TestBenchmarkRunner))
     
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)